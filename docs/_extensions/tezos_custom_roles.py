@@ -18,14 +18,46 @@ def setup(app):
     app.add_role('opam', opam_role)
     app.add_role('src', src_role)
     app.add_role('gl', gitlab_role)
+    # Index the source tree before documents are read, so that parallel
+    # readers, which are forked afterwards, inherit the index.
+    app.connect('builder-inited', lambda _app: index_dot_opams())
+    return {'parallel_read_safe': True}
 
 
-def find_dot_opam(name):
-    for path, _, files in os.walk('..'):
+# Directories that do not contain source packages
+SKIPPED_DIRS = {'_build', '_opam', 'node_modules'}
+
+# Maps package names to the directory of their .opam file
+_DOT_OPAMS = {}
+
+
+def index_dot_opams():
+    """Scan the source tree once for .opam files."""
+    _DOT_OPAMS.clear()
+    for path, dirs, files in os.walk('..'):
+        dirs[:] = [
+            d for d in dirs if d not in SKIPPED_DIRS and not d.startswith('.')
+        ]
         for file in files:
-            if file == name + '.opam':
-                return path.lstrip('../')
-    raise ValueError('opam file ' + name + '.opam does not exist in the odoc')
+            if file.endswith('.opam'):
+                name = file[: -len('.opam')]
+                _DOT_OPAMS.setdefault(name, os.path.relpath(path, '..'))
+
+
+def find_dot_opam(name):
+    # The index is only rebuilt if the tree changed since it was built,
+    # that is if the package is unknown or its .opam file has moved.
+    path = _DOT_OPAMS.get(name)
+    if path is None or not os.path.isfile(
+        os.path.join('..', path, name + '.opam')
+    ):
+        index_dot_opams()
+        path = _DOT_OPAMS.get(name)
+    if path is None:
+        raise ValueError(
+            'opam file ' + name + '.opam does not exist in the odoc'
+        )
+    return path
 
 
 def package_role(
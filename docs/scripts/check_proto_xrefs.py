@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-# Check cross-references within the doc of a given protocol-specific dir
+# Check cross-references within the doc of given protocol-specific dirs
 
 # Overview
 
@@ -8,7 +8,8 @@
 # All these refs must be versioned, i.e. suffixed by _NNN.
 # With option -l, also checks that all defined labels are versioned.
 # You should use this option for all protocols except the active one
-# (which may contain unversioned labels).
+# (which may contain unversioned labels). Option -L DIR checks DIR with
+# labels, so that all protocols can be checked in a single run.
 
 # The script warns about refs to section headings (having the form
 # :ref:`Section Name`), because these ones cannot be versioned (besides being
@@ -17,101 +18,221 @@
 # Implementation details
 
 # In order to distinguish local refs from external refs, we build a symbol
-# table in a first pass over all the .rst files in the protocol-specific
-# dir.
+# table of all the .rst files in the protocol-specific dir.
 
-# A second pass checks only local refs, and complains about unversioned ones.
+# Each file is read once, in a pool of workers, to index both its labels and
+# its refs. The index of a file can be cached (option --cache) and is reused
+# as long as the file's mtime and size are unchanged.
+
+# A second pass over the indexes checks only local refs, and complains about
+# unversioned ones.
 
 import sys
 import re
 import os.path
 import glob
+import json
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 
-parser = argparse.ArgumentParser()
-parser.add_argument(
-    "proto_dir", help="a protocol directory containing its documentation"
-)
-parser.add_argument(
-    "-l",
-    "--labels",
-    action="store_true",
-    help="check that all labels are versioned",
-)
-args = parser.parse_args()
-
-# pylint: disable=superfluous-parens
-if not (m := re.search(r'([^\/]+)\/?$', args.proto_dir)):
-    parser.print_help()
-    sys.exit(1)
-
-proto = m.group(1)
-directory = args.proto_dir
-
-# set of all the defined labels
-labels = set()
-
-if not os.path.isdir(directory):
-    print(f"directory {directory} not found", file=sys.stderr)
-    sys.exit(1)
-
-# First pass: Scan labels: check & register
-def_lbl_pat = re.compile(r' *[.][.]  *_([a-zA-Z0-9_-]*) *:')
-for file in glob.glob(f"{directory}/*.rst"):
-    with open(file, mode="r", encoding="utf-8") as f:
-        while line := f.readline():
-            if m := re.match(def_lbl_pat, line):
-                label = m.group(1)
-                labels.add(label.lower())
-                if args.labels and not label.endswith('_' + proto):
-                    print(
-                        (
-                            f"{file}: unversioned label {label} found, "
-                            + "please remove or rewrite"
-                        ),
-                        file=sys.stderr,
-                    )
-
-# Second pass: Scan refs: check
-ref_pat = re.compile(r':ref:`([^`]+)`', flags=re.DOTALL)
-ref_lbl_desc_pat = re.compile(r'<(.+)>$')
-ref_file_pat = re.compile(r'[.](rst|html)$')
-sphinx_id_pat = re.compile(r'[\w.-]+')
-for file in glob.glob(f"{directory}/*.rst"):
+DEF_LBL_PAT = re.compile(r' *[.][.]  *_([a-zA-Z0-9_-]*) *:')
+REF_PAT = re.compile(r':ref:`([^`]+)`', flags=re.DOTALL)
+REF_LBL_DESC_PAT = re.compile(r'<(.+)>$')
+REF_FILE_PAT = re.compile(r'[.](rst|html)$')
+SPHINX_ID_PAT = re.compile(r'[\w.-]+')
+
+# Version of the format of cached indexes
+CACHE_VERSION = 1
+
+
+def index_file(file):
+    """Return the labels defined in file and the refs it contains"""
     with open(file, mode="r", encoding="utf-8") as f:
         txt = f.read()  # read all file contents
-    for i in re.finditer(ref_pat, txt):
-        ref = i.group(1)
-        start = i.start(0)  # offset in file (unused for now)
-        if m := re.search(ref_lbl_desc_pat, ref):
-            # ref to label with description
-            label = m.group(1)
+    labels = [
+        m.group(1)
+        for line in txt.split('\n')
+        if (m := re.match(DEF_LBL_PAT, line))
+    ]
+    refs = [i.group(1) for i in re.finditer(REF_PAT, txt)]
+    return {'labels': labels, 'refs': refs}
+
+
+def file_stamp(file):
+    stat = os.stat(file)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def load_cache(cache_file):
+    if cache_file is None or not os.path.isfile(cache_file):
+        return {}
+    try:
+        with open(cache_file, mode="r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get('version') != CACHE_VERSION:
+        return {}
+    return cache.get('files', {})
+
+
+def save_cache(cache_file, files):
+    if cache_file is None:
+        return
+    cache_dir = os.path.dirname(cache_file)
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+    with open(cache_file, mode="w", encoding="utf-8") as f:
+        json.dump({'version': CACHE_VERSION, 'files': files}, f)
+
+
+def index_files(files, cache_file, jobs):
+    """Index all files, reusing the cached indexes of unchanged files"""
+    cache = load_cache(cache_file)
+    indexes = {}
+    stale = []
+    for file in files:
+        stamp = file_stamp(file)
+        entry = cache.get(file)
+        if entry is not None and entry['stamp'] == stamp:
+            indexes[file] = entry
         else:
-            # ref with no description
-            label = ref
-
-        # Check the target label:
-        if re.search(ref_file_pat, label):
-            continue  # ref to a file = ok
-        # warn on :ref:`Section Heading`:
-        if not (m := re.fullmatch(sphinx_id_pat, label)):
+            stale.append((file, stamp))
+    if stale:
+        workers = jobs or os.cpu_count() or 1
+        with ProcessPoolExecutor(workers) as executor:
+            chunksize = max(1, len(stale) // (4 * workers))
+            results = executor.map(
+                index_file, [file for file, _ in stale], chunksize=chunksize
+            )
+            for (file, stamp), index in zip(stale, results):
+                indexes[file] = dict(index, stamp=stamp)
+    if stale or set(cache) != set(indexes):
+        save_cache(cache_file, indexes)
+    return indexes
+
+
+def check_labels(proto, files, indexes):
+    """Check that all labels are versioned"""
+    for file in files:
+        for label in indexes[file]['labels']:
+            if not label.endswith('_' + proto):
+                print(
+                    (
+                        f"{file}: unversioned label {label} found, "
+                        + "please remove or rewrite"
+                    ),
+                    file=sys.stderr,
+                )
+
+
+def check_refs(proto, files, indexes):
+    """Check that local refs are versioned"""
+    # set of all the defined labels
+    labels = {
+        label.lower() for file in files for label in indexes[file]['labels']
+    }
+    for file in files:
+        for ref in indexes[file]['refs']:
+            if m := re.search(REF_LBL_DESC_PAT, ref):
+                # ref to label with description
+                label = m.group(1)
+            else:
+                # ref with no description
+                label = ref
+
+            # Check the target label:
+            if re.search(REF_FILE_PAT, label):
+                continue  # ref to a file = ok
+            # warn on :ref:`Section Heading`:
+            if not re.fullmatch(SPHINX_ID_PAT, label):
+                print(
+                    f"{file}: :ref:`{ref}`: rewrite as ref to a label",
+                    file=sys.stderr,
+                )
+                continue
+
+            if label.endswith(f"_{proto}"):
+                continue  # versioned label = ok
+            lclabel = label.lower()
+            # external ref ok:
+            if lclabel not in labels and f"lclabel_{proto}" not in labels:
+                continue
             print(
-                f"{file}: :ref:`{ref}`: rewrite as ref to a label",
+                (
+                    f"{file}: :ref:`{ref}`: label {label} should be"
+                    f"versioned as {label}_{proto}"
+                ),
                 file=sys.stderr,
             )
-            continue
-
-        if label.endswith(f"_{proto}"):
-            continue  # versioned label = ok
-        lclabel = label.lower()
-        # external ref ok:
-        if lclabel not in labels and f"lclabel_{proto}" not in labels:
-            continue
-        print(
-            (
-                f"{file}: :ref:`{ref}`: label {label} should be"
-                f"versioned as {label}_{proto}"
-            ),
-            file=sys.stderr,
-        )
-    # end for ref
+        # end for ref
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "proto_dirs",
+        metavar="proto_dir",
+        nargs="*",
+        help="a protocol directory containing its documentation",
+    )
+    parser.add_argument(
+        "-l",
+        "--labels",
+        action="store_true",
+        help="check that all labels are versioned",
+    )
+    parser.add_argument(
+        "-L",
+        "--labels-dir",
+        metavar="proto_dir",
+        action="append",
+        default=[],
+        help="a protocol directory in which all labels must be versioned",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="number of workers, defaults to the number of CPUs",
+    )
+    parser.add_argument(
+        "--cache",
+        metavar="FILE",
+        default=None,
+        help="cache the index of each file in FILE, by mtime",
+    )
+    args = parser.parse_args()
+
+    # (proto, files, check labels)
+    to_check = []
+    dirs = [(d, args.labels) for d in args.proto_dirs]
+    dirs += [(d, True) for d in args.labels_dir]
+    if not dirs:
+        parser.print_help()
+        sys.exit(1)
+    for directory, labels in dirs:
+        # pylint: disable=superfluous-parens
+        if not (m := re.search(r'([^\/]+)\/?$', directory)):
+            parser.print_help()
+            sys.exit(1)
+        if not os.path.isdir(directory):
+            print(f"directory {directory} not found", file=sys.stderr)
+            sys.exit(1)
+        files = glob.glob(f"{directory}/*.rst")
+        to_check.append((m.group(1), files, labels))
+
+    indexes = index_files(
+        [file for _, files, _ in to_check for file in files],
+        args.cache,
+        args.jobs,
+    )
+    for proto, files, labels in to_check:
+        if labels:
+            check_labels(proto, files, indexes)
+        check_refs(proto, files, indexes)
+
+
+if __name__ == "__main__":
+    main()
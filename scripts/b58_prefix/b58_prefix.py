@@ -1,3 +1,5 @@
+import math
+
 import base58
 import fire
 
@@ -34,6 +36,48 @@ def asciidec(val):
     return word[-1::-1]
 
 
+def version_bytes_interval(target, shift, m):
+    """
+    Compute the interval [lo, hi] of version bytes (as integers) such that
+    any payload of [shift] bits prefixed by a version byte of the interval
+    has a base58 encoding of size m + len(prefix) starting with the prefix
+    whose decimal representation is [target]. The interval is empty if m is
+    too small.
+    """
+    # The first bytes in base58 must be the given target. lo is the version
+    # byte we want to compute.
+    lo = target * 58**m
+    lo = (lo >> shift)
+    # (a >> b) << b == a iff a = 2**b. Then this line is equivalent to add 1
+    # if lo is not a power of 2.
+    lo += (0 if lo == ((lo >> shift) << shift) else 1)
+    # hi will be negative because of the minus if m is not big enough to
+    # encode a payload of [shift] bits.
+    hi = (target + 1) * 58**m - (1 << shift) + 1
+    # if b is negative (i.e. m not big enough to encode a payload of the
+    # given length), b >> a is always strictly negative
+    hi = hi >> shift
+    return lo, hi
+
+
+def check_version_bytes(prefix, length, m, lo):
+    """
+    Check that any sequence of bytes of the given length prefixed by the
+    version bytes [lo] starts with the prefix and has the same length.
+    """
+    to_encode = bytearray(asciidec(lo) + [0] * length)
+    base58_encoded_minimal_value = base58.\
+        b58encode_check(bytes(to_encode))
+    assert base58_encoded_minimal_value.startswith(prefix.encode())
+    assert len(base58_encoded_minimal_value) == m + len(prefix)
+
+    to_encode = bytearray(asciidec(lo) + [255] * length)
+    base58_encoded_maximal_value = base58.\
+        b58encode_check(bytes(to_encode))
+    assert base58_encoded_maximal_value.startswith(prefix.encode())
+    assert len(base58_encoded_maximal_value) == m + len(prefix)
+
+
 def compute_version_bytes(prefix, length, maximal_base58_size=1000):
     """
     Compute the version bytes to add to the class of payloads of the given
@@ -51,39 +95,122 @@ def compute_version_bytes(prefix, length, maximal_base58_size=1000):
     # to encode a payload of the given length (see 1 << shift). The idea is to
     # find an interval of decimal numbers [lo, hi].
     for m in range(1, maximal_base58_size):
-        # The first bytes in base58 must be the given target. lo is the version
-        # byte we want to compute.
-        lo = target * 58**m
-        lo = (lo >> shift)
-        # (a >> b) << b == a iff a = 2**b. Then this line is equivalent to add 1
-        # if lo is not a power of 2.
-        lo += (0 if lo == ((lo >> shift) << shift) else 1)
-        # hi will be negative because of the minus if m is not big enough to
-        # encode a payload of [shift] bits.
-        hi = (target + 1) * 58**m - (1 << shift) + 1
-        # if b is negative (i.e. m not big enough to encode a payload of the
-        # given length), b >> a is always strictly negative
-        hi = hi >> shift
+        lo, hi = version_bytes_interval(target, shift, m)
         if hi >= lo:
-            # We test that any sequence of bytes of the given length starts with
-            # the prefix and has the same length.
-            to_encode = bytearray(asciidec(lo) + [0] * length)
-            base58_encoded_minimal_value = base58.\
-                b58encode_check(bytes(to_encode))
-            assert base58_encoded_minimal_value.startswith(prefix.encode())
-            assert len(base58_encoded_minimal_value) == m + len(prefix)
-
-            to_encode = bytearray(asciidec(lo) + [255] * length)
-            base58_encoded_maximal_value = base58.\
-                b58encode_check(bytes(to_encode))
-            assert base58_encoded_maximal_value.startswith(prefix.encode())
-            assert len(base58_encoded_maximal_value) == m + len(prefix)
+            check_version_bytes(prefix, length, m, lo)
             break
 
     return m + len(prefix), asciidec(lo)
 
 
-def main(prefix, length, maximal_base58_size=1000):
+def solve_version_bytes(prefix, length):
+    """
+    Same as compute_version_bytes, but compute the size of the base58
+    encoding directly instead of trying every size from 1.
+
+    The interval [lo, hi] is empty as long as 58**m < 2**shift, i.e. the
+    smallest suitable m is close to shift / log2(58). We start just below
+    that bound to be robust to floating point rounding, and only the final
+    candidate is checked by encoding it.
+    """
+    length = int(length)
+    target = b58dec(prefix)
+    shift = 8 * (length + 4)
+    m = max(1, math.ceil(shift / math.log2(58)) - 1)
+    lo, hi = version_bytes_interval(target, shift, m)
+    while hi < lo:
+        m += 1
+        lo, hi = version_bytes_interval(target, shift, m)
+    check_version_bytes(prefix, length, m, lo)
+    return m + len(prefix), asciidec(lo)
+
+
+# The base58 prefixes of Tezos, as (name, prefix, payload length), see
+# src/lib_crypto/base58.ml
+TEZOS_PREFIXES = [
+    ("block_hash", "B", 32),
+    ("operation_hash", "o", 32),
+    ("operation_list_hash", "Lo", 32),
+    ("operation_list_list_hash", "LLo", 32),
+    ("protocol_hash", "P", 32),
+    ("context_hash", "Co", 32),
+    ("block_metadata_hash", "bm", 32),
+    ("operation_metadata_hash", "r", 32),
+    ("operation_metadata_list_hash", "Lr", 32),
+    ("operation_metadata_list_list_hash", "LLr", 32),
+    ("ed25519_public_key_hash", "tz1", 20),
+    ("secp256k1_public_key_hash", "tz2", 20),
+    ("p256_public_key_hash", "tz3", 20),
+    ("cryptobox_public_key_hash", "id", 16),
+    ("ed25519_seed", "edsk", 32),
+    ("ed25519_public_key", "edpk", 32),
+    ("secp256k1_secret_key", "spsk", 32),
+    ("p256_secret_key", "p2sk", 32),
+    ("ed25519_encrypted_seed", "edesk", 56),
+    ("secp256k1_encrypted_secret_key", "spesk", 56),
+    ("p256_encrypted_secret_key", "p2esk", 56),
+    ("secp256k1_encrypted_scalar", "seesk", 60),
+    ("secp256k1_public_key", "sppk", 33),
+    ("p256_public_key", "p2pk", 33),
+    ("secp256k1_scalar", "SSp", 33),
+    ("secp256k1_element", "GSp", 33),
+    ("ed25519_secret_key", "edsk", 64),
+    ("ed25519_signature", "edsig", 64),
+    ("secp256k1_signature", "spsig1", 64),
+    ("p256_signature", "p2sig", 64),
+    ("generic_signature", "sig", 64),
+    ("chain_id", "Net", 4),
+    ("sapling_spending_key", "sask", 169),
+    ("sapling_address", "zet1", 43),
+]
+
+
+def compute_version_bytes_table(prefixes):
+    """
+    Compute the version bytes of a list of (name, prefix, payload length)
+    triples. Return a dictionary from names to (prefix, payload length,
+    base58 size, version bytes).
+    """
+    table = {}
+    for name, prefix, length in prefixes:
+        base58_size, version_bytes = solve_version_bytes(prefix, length)
+        table[name] = (prefix, int(length), base58_size, bytes(version_bytes))
+    return table
+
+
+def format_version_bytes_table(table):
+    """
+    Format a table computed by compute_version_bytes_table as a Python
+    module defining a dictionary VERSION_BYTES.
+    """
+    lines = [
+        "# Generated by scripts/b58_prefix/b58_prefix.py, do not edit.",
+        "# name: (prefix, payload length, base58 size, version bytes)",
+        "VERSION_BYTES = {",
+    ]
+    for name, (prefix, length, base58_size, version_bytes) in table.items():
+        lines.append(f"    {name!r}: "
+                     f"({prefix!r}, {length}, {base58_size}, "
+                     f"{version_bytes!r}),")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def main(prefix=None, length=None, maximal_base58_size=1000, table=None):
+    """
+    Print the version bytes of the given prefix and payload length. If
+    [table] is given, write the version bytes of all the Tezos prefixes to
+    that file instead, as an importable Python module ('-' for stdout).
+    """
+    if table is not None:
+        module = format_version_bytes_table(
+            compute_version_bytes_table(TEZOS_PREFIXES))
+        if table == "-":
+            print(module, end="")
+        else:
+            with open(table, "w", encoding="utf-8") as output:
+                output.write(module)
+        return
     base58_size, version_bytes = compute_version_bytes(prefix, length,
                                                        maximal_base58_size)
     print(f"Base58 size: {base58_size}. Version bytes: {version_bytes}")
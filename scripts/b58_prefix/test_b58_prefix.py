@@ -23,3 +23,16 @@ def test_b58dec(word, expected_output):
 def test_asciidec(val, expected_output):
     assert b58_prefix.asciidec(val) == expected_output
 
+
+@pytest.mark.parametrize("name,prefix,length", b58_prefix.TEZOS_PREFIXES)
+def test_solve_version_bytes(name, prefix, length):
+    assert b58_prefix.solve_version_bytes(prefix, length) == \
+        b58_prefix.compute_version_bytes(prefix, length), name
+
+
+def test_format_version_bytes_table():
+    table = b58_prefix.compute_version_bytes_table([("tz1", "tz1", 20)])
+    namespace = {}
+    exec(b58_prefix.format_version_bytes_table(table), namespace)
+    assert namespace["VERSION_BYTES"] == \
+        {"tz1": ("tz1", 20, 36, bytes([6, 161, 159]))}
@@ -5,13 +5,23 @@ merged branch with coverage.
 """
 
 import sys
-from typing import NamedTuple, Union, Optional, Iterator
+from typing import Dict, NamedTuple, Union, Optional, Iterator, Tuple
+import base64
+import io
+import json
 import os
 import re
 import itertools
 import tempfile
-import subprocess
-
+import threading
+import urllib.parse
+import warnings
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import requests.adapters
+import requests.structures
 import gitlab
 from gitlab import Gitlab
 from gitlab.v4.objects import Project, ProjectCommit, ProjectPipelineJob
@@ -26,6 +36,10 @@ class Config(NamedTuple):
     start_commit: str
     # The name of the job from coverage will be fetched.
     coverage_job_name: str
+    # File where the coverage job of inspected commits is cached, if any.
+    cache_file: Optional[str] = None
+    # Number of commits inspected concurrently.
+    concurrency: int = 8
 
 
 DEFAULT_CONFIG = Config(
@@ -34,6 +48,10 @@ DEFAULT_CONFIG = Config(
     coverage_job_name="unified_coverage",
 )
 
+# Pipelines in these states will not get new jobs, hence the coverage
+# job of their commit can be cached.
+FINAL_PIPELINE_STATUSES = {"success", "failed", "canceled", "skipped"}
+
 
 def eprint(*values: object) -> None:
     print(*values, file=sys.stderr)
@@ -68,17 +86,50 @@ def get_project(config: Config, glab: Gitlab) -> Project:
 def download_artifacts_from_job(
     project: Project, job_id: int, outdir: Optional[str] = None
 ) -> None:
-    (zip_file_fd, zip_file_name) = tempfile.mkstemp(suffix=".zip")
     # Hack as per https://forum.gitlab.com/t/25436/3
     job = project.jobs.get(job_id, lazy=True)
-    with open(zip_file_fd, "wb") as zip_file:
-        job.artifacts(streamed=True, action=zip_file.write)
+    # The archive is streamed into memory, as zipfile requires a
+    # seekable file, and extracted in process.
+    archive = io.BytesIO()
+    job.artifacts(streamed=True, action=archive.write)
+    with zipfile.ZipFile(archive) as zip_file:
+        for member in zip_file.infolist():
+            eprint(f"  extracting: {member.filename}")
+            zip_file.extract(member, path=outdir)
 
-    cmd = ["unzip", "-b", zip_file_name]
-    if outdir:
-        cmd += ["-d", outdir]
-    subprocess.run(cmd, check=True)
-    os.unlink(zip_file_name)
+
+class CoverageCache:
+    """Persistent map from commit shas to the id of their coverage job,
+    or None if they have none.
+
+    Only the commits whose last pipeline has finished are cached.
+    """
+
+    def __init__(self, cache_file: Optional[str]):
+        self.cache_file = cache_file
+        self.entries: Dict[str, Optional[int]] = {}
+        self.lock = threading.Lock()
+        if cache_file is not None and os.path.isfile(cache_file):
+            try:
+                with open(cache_file, encoding="utf-8") as handle:
+                    self.entries = json.load(handle)
+            except (OSError, ValueError):
+                eprint(f"Ignoring invalid cache {cache_file}")
+
+    def get(self, sha: str) -> Tuple[bool, Optional[int]]:
+        """Returns whether `sha` is cached, and its coverage job id."""
+        with self.lock:
+            return (sha in self.entries, self.entries.get(sha))
+
+    def add(self, sha: str, job_id: Optional[int]) -> None:
+        with self.lock:
+            self.entries[sha] = job_id
+
+    def save(self) -> None:
+        if self.cache_file is None:
+            return
+        with self.lock, open(self.cache_file, "w", encoding="utf-8") as handle:
+            json.dump(self.entries, handle)
 
 
 def coverage_job_of_commit(
@@ -89,6 +140,49 @@ def coverage_job_of_commit(
     It finds the job `config.coverage_job` in this project, and
     returns its coverage if set. Otherwise, `None` is returned.
 
+    """
+    (coverage_job, _final) = find_coverage_job(config, project, commit)
+    return coverage_job
+
+
+def cached_coverage_job_of_commit(
+    config: Config,
+    project: Project,
+    cache: CoverageCache,
+    commit: ProjectCommit,
+) -> Optional[ProjectPipelineJob]:
+    """
+    As `coverage_job_of_commit`, but first looks up `commit` in `cache`,
+    and records the result in `cache` if the pipeline has finished.
+    """
+    (cached, job_id) = cache.get(commit.id)
+    if cached:
+        if job_id is None:
+            log(commit, "No coverage job (cached)")
+            return None
+        coverage_job = project.jobs.get(job_id)
+        log(
+            commit,
+            f"Coverage {coverage_job.coverage}% found in coverage job "
+            + f"`{coverage_job.name}` "
+            + f"({coverage_job.web_url}) (cached)",
+        )
+        return coverage_job
+    (coverage_job, final) = find_coverage_job(config, project, commit)
+    if final:
+        cache.add(
+            commit.id, coverage_job.id if coverage_job is not None else None
+        )
+    return coverage_job
+
+
+def find_coverage_job(
+    config: Config, project: Project, commit: ProjectCommit
+) -> Tuple[Optional[ProjectPipelineJob], bool]:
+    """
+    As `coverage_job_of_commit`, but also returns whether the latest
+    pipeline of `commit` has finished, i.e. whether the result is final.
+
     """
 
     commit_id = commit.id
@@ -99,14 +193,15 @@ def coverage_job_of_commit(
     )
     if not pipelines:
         log(commit, f"Pipeline not found for commit {commit.web_url}")
-        return None
+        return (None, False)
     last_pipeline = pipelines[0]
+    final = last_pipeline.status in FINAL_PIPELINE_STATUSES
 
     # List of jobs
     jobs = last_pipeline.jobs.list(all=True)
     if not jobs:
         log(commit, f"Jobs not found in pipeline {last_pipeline.web_url}")
-        return None
+        return (None, final)
 
     coverage_job = None
 
@@ -122,7 +217,7 @@ def coverage_job_of_commit(
             + "Found jobs: "
             + ",".join([job.name for job in jobs]),
         )
-        return None
+        return (None, final)
 
     if coverage_job.status != "success":
         log(
@@ -131,7 +226,7 @@ def coverage_job_of_commit(
             + f"({coverage_job.web_url}) was not successful "
             + f" (status: {coverage_job.status}). Ignoring.",
         )
-        return None
+        return (None, final)
 
     if coverage_job.coverage is None:
         log(
@@ -140,7 +235,7 @@ def coverage_job_of_commit(
             + f" `{config.coverage_job_name}` "
             + f"({coverage_job.web_url})",
         )
-        return None
+        return (None, final)
 
     log(
         commit,
@@ -149,7 +244,7 @@ def coverage_job_of_commit(
         + f"({coverage_job.web_url})",
     )
 
-    return coverage_job
+    return (coverage_job, final)
 
 
 def is_merge_commit(commit: ProjectCommit) -> bool:
@@ -197,39 +292,55 @@ def get_ref_coverage_job(
             merge_commit = nextc(commits)
         return merge_commit
 
-    try:
-        # First, attempt to retrieve coverage from the pipelines of the
-        # pred of the first merge commit.
-        merge_commit = next_merge_commit(commits)
-        log(merge_commit, "Skip first merge commit")
-        pred = nextc(commits)
-        assert not is_merge_commit(pred)
-        log(pred, "Check for coverage in merge commit parent")
-        coverage_job = coverage_job_of_commit(config, project, pred)
-
-        if coverage_job is not None:
-            return coverage_job
-
-        # If the most recent merged MR did not contain coverage
-        # information, start looking in earlier the pipelines for merge
-        # commits:
-        while True:
+    def candidates() -> Iterator[ProjectCommit]:
+        """The commits whose coverage is inspected, in order"""
+        try:
+            # First, attempt to retrieve coverage from the pipelines of the
+            # pred of the first merge commit.
             merge_commit = next_merge_commit(commits)
+            log(merge_commit, "Skip first merge commit")
+            pred = nextc(commits)
+            assert not is_merge_commit(pred)
+            log(pred, "Check for coverage in merge commit parent")
+            yield pred
+
+            # If the most recent merged MR did not contain coverage
+            # information, start looking in earlier the pipelines for merge
+            # commits:
+            while True:
+                merge_commit = next_merge_commit(commits)
+                log(merge_commit, "Check for coverage in merge commit")
+                yield merge_commit
+
+        # Is thrown when the iterator is exhausted. Meaning that either
+        # we've reached `commit_limit` or the beginning of history.
+        except StopIteration:
+            return
+
+    # Candidates are inspected by batches of `config.concurrency`
+    # commits, the first of which with coverage is returned.
+    cache = CoverageCache(config.cache_file)
+    candidate_commits = candidates()
+
+    def inspect(commit: ProjectCommit) -> Optional[ProjectPipelineJob]:
+        return cached_coverage_job_of_commit(config, project, cache, commit)
 
-            log(merge_commit, "Check for coverage in merge commit")
-            coverage_job = coverage_job_of_commit(config, project, merge_commit)
-
-            if coverage_job is not None:
-                return coverage_job
-
-    # Is thrown when the iterator is exhausted. Meaning that either
-    # we've reached `commit_limit` or the beginning of history.
-    except StopIteration:
-        eprint(
-            f"No coverage information found in the {commit_count} "
-            + f"most recent commits on {ref_name}"
-        )
-        return None
+    try:
+        with ThreadPoolExecutor(max(1, config.concurrency)) as executor:
+            while batch := list(
+                itertools.islice(candidate_commits, config.concurrency)
+            ):
+                for coverage_job in executor.map(inspect, batch):
+                    if coverage_job is not None:
+                        return coverage_job
+    finally:
+        cache.save()
+
+    eprint(
+        f"No coverage information found in the {commit_count} "
+        + f"most recent commits on {ref_name}"
+    )
+    return None
 
 
 def main() -> None:
@@ -241,6 +352,10 @@ def main() -> None:
         coverage_job_name=os.getenv(
             "COVERAGE_JOB_NAME", DEFAULT_CONFIG.coverage_job_name
         ),
+        cache_file=os.getenv("COVERAGE_CACHE_FILE", DEFAULT_CONFIG.cache_file),
+        concurrency=int(
+            os.getenv("COVERAGE_CONCURRENCY", DEFAULT_CONFIG.concurrency)
+        ),
     )
     glab = get_gitlab()
     project = get_project(config, glab)
@@ -259,8 +374,140 @@ if __name__ == "__main__":
     main()
 
 ### Follows a series of integration tests that can be launched by
-### running `poetry run pytest coverage.py`. Warning: these call the
-### Gitlab API directly.
+### running `poetry run pytest coverage.py`. They run against responses
+### of the Gitlab API stored in coverage_test_responses.json, replayed
+### by `ReplayAdapter`. With COVERAGE_TEST_RECORD=1, they call the Gitlab
+### API directly instead, and its responses are recorded in that file.
+### The stored responses are SYNTHETIC: they were written by hand, not
+### recorded from gitlab.com, and only give the tests the coverage,
+### jobs and artifacts they expect (pipeline ids 4100000xx are made
+### up). The file says so under its SYNTHETIC_KEY entry, which recording
+### drops. Record the responses to check the tests against the actual
+### history.
+
+TEST_RESPONSES = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "coverage_test_responses.json"
+)
+
+# The entry describing stored responses that were not recorded
+SYNTHETIC_KEY = "__synthetic__"
+
+# The response headers python-gitlab relies on, e.g. for pagination
+RECORDED_HEADERS = [
+    "Content-Type",
+    "Link",
+    "X-Next-Page",
+    "X-Page",
+    "X-Per-Page",
+    "X-Total",
+    "X-Total-Pages",
+]
+
+
+def request_key(request: requests.PreparedRequest) -> str:
+    """The method, path and sorted query of `request`"""
+    url = urllib.parse.urlsplit(request.url)
+    query = urllib.parse.urlencode(sorted(urllib.parse.parse_qsl(url.query)))
+    return f"{request.method} {url.path}?{query}"
+
+
+class ReplayAdapter(requests.adapters.BaseAdapter):
+    """Transport adapter answering requests with recorded responses.
+
+    In record mode, requests are sent by a regular HTTP adapter, and
+    their responses are recorded, to be written by `save`.
+    """
+
+    def __init__(
+        self,
+        responses_file: str,
+        record: bool = False,
+        adapter: Optional[requests.adapters.BaseAdapter] = None,
+    ):
+        super().__init__()
+        self.responses_file = responses_file
+        self.record = record
+        self.adapter = adapter or requests.adapters.HTTPAdapter()
+        self.responses: Dict[str, dict] = {}
+        self.lock = threading.Lock()
+        # The description of the stored responses, if not recorded
+        self.synthetic: Optional[str] = None
+        if not record:
+            with open(responses_file, encoding="utf-8") as handle:
+                responses = json.load(handle)
+            self.synthetic = responses.pop(SYNTHETIC_KEY, None)
+            self.responses = responses
+
+    # pylint: disable=too-many-arguments
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+        timeout: Optional[float] = None,
+        verify: Union[bool, str] = True,
+        cert: Optional[str] = None,
+        proxies: Optional[Dict[str, str]] = None,
+    ) -> requests.Response:
+        key = request_key(request)
+        if self.record:
+            response = self.adapter.send(
+                request, stream, timeout, verify, cert, proxies
+            )
+            recorded: dict = {
+                "status": response.status_code,
+                "headers": {
+                    header: response.headers[header]
+                    for header in RECORDED_HEADERS
+                    if header in response.headers
+                },
+            }
+            content = response.content
+            try:
+                recorded["text"] = content.decode("utf-8")
+            except UnicodeDecodeError:
+                recorded["base64"] = base64.b64encode(content).decode()
+            with self.lock:
+                self.responses[key] = recorded
+            return response
+        if key not in self.responses:
+            raise requests.ConnectionError(
+                f"No recorded response to {key}", request=request
+            )
+        recorded = self.responses[key]
+        if "text" in recorded:
+            body = recorded["text"].encode("utf-8")
+        else:
+            body = base64.b64decode(recorded["base64"])
+        response = requests.Response()
+        response.status_code = recorded["status"]
+        response.headers = requests.structures.CaseInsensitiveDict(
+            recorded["headers"]
+        )
+        response.raw = io.BytesIO(body)
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self) -> None:
+        self.adapter.close()
+
+    def save(self) -> None:
+        with open(self.responses_file, "w", encoding="utf-8") as handle:
+            json.dump(self.responses, handle, indent=1, sort_keys=True)
+            handle.write("\n")
+
+
+@pytest.fixture(scope="session")
+def replay_adapter() -> Iterator[ReplayAdapter]:
+    record = os.getenv("COVERAGE_TEST_RECORD") == "1"
+    adapter = ReplayAdapter(TEST_RESPONSES, record=record)
+    if adapter.synthetic is not None:
+        # Hand-written responses must not pass for recorded ones
+        warnings.warn(f"{TEST_RESPONSES}: {adapter.synthetic}")
+    yield adapter
+    if record:
+        adapter.save()
 
 
 @pytest.fixture
@@ -269,8 +516,10 @@ def config() -> Config:
 
 
 @pytest.fixture
-def glab() -> Gitlab:
-    return get_gitlab()
+def glab(replay_adapter: ReplayAdapter) -> Gitlab:
+    glab = get_gitlab()
+    glab.session.mount("https://", replay_adapter)
+    return glab
 
 
 @pytest.fixture
@@ -324,6 +573,20 @@ class Test:
         assert coverage_job is not None
         assert coverage_job.coverage == 66.29
 
+    def test_get_branch_coverage_cached(
+        self, config: Config, project: Project
+    ) -> None:
+        # The second walk is served by the cache
+        cache_file = os.path.join(tempfile.mkdtemp("cache"), "cache.json")
+        config = config._replace(cache_file=cache_file)
+        coverage_job = get_ref_coverage_job(config, project, "cd20c132")
+        assert coverage_job is not None
+        assert os.path.exists(cache_file)
+        cached_coverage_job = get_ref_coverage_job(config, project, "cd20c132")
+        assert cached_coverage_job is not None
+        assert cached_coverage_job.id == coverage_job.id
+        assert cached_coverage_job.coverage == 66.29
+
     def test_get_branch_coverage_no_coverage_job(
         self, config: Config, project: Project
     ) -> None:
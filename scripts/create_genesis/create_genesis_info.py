@@ -13,6 +13,23 @@ import pysodium
 from hashlib import sha256
 import random
 import string
+from multiprocessing import Pool
+
+# Number of dummy wallets derived by a worker at once
+CHUNK_SIZE = 1000
+
+BOOTSTRAP_ACCOUNTS = [
+    [ "edsk4X12XaKRPHgDkgvMe4UWEiygx8AVrt9rpktmhu1uT2GCPU4dp7",
+      "12000000000000" ],
+    [ "edsk46ypB8PztxMDPMdVnEgjQmJhca7zMJvTMDrdwJaJ4mgm4qNmwE",
+      "12000000000000" ],
+    [ "edsk4JsBpWJH5cDtanNADY2D5Ygma1dUtxko8qaM2Af8FHGU52yLcW",
+      "12000000000000" ],
+    [ "edsk3b5GrQdRF1Pt3ccRjvyoNHTFrSXUKZufg2zQYhBumqS8kMfeGC",
+      "12000000000000" ],
+    [ "edsk3T8CRr8YK2vnjsZK2vDzCjpcWpMEUXMAzjeR1GWjmyhGaDHTNV",
+      "12000000000000" ]
+]
 
 def get_keys(mnemonic, email, password):
     salt = unicodedata.normalize(
@@ -23,8 +40,8 @@ def get_keys(mnemonic, email, password):
     pkhb58 = bitcoin.bin_to_b58check(pkh, magicbyte=434591)
     return (sk, pk, pkh, pkhb58)
 
-def random_email():
-    rnd = lambda n: ''.join(random.choice(string.ascii_lowercase) for _ in range(n))
+def random_email(rng=random):
+    rnd = lambda n: ''.join(rng.choice(string.ascii_lowercase) for _ in range(n))
     return '%s.%s@tezos.example.org' % (rnd(8),rnd(8))
 
 def tez_to_int(amount):
@@ -62,69 +79,123 @@ def genesis_commitments(wallets, blind):
         # The redemption code is unique to the public key hash and deterministically
         # constructed using a secret blinding value.
         secret = secret_code(pkh, blind)
-        # The redemption code is used to blind the pkh
-        blinded_pkh = blake2b(pkh, 20, key=secret).digest()
         commitment = {
-            'blinded_pkh': bitcoin.bin_to_b58check(blinded_pkh, magicbyte=16921055),
+            'blinded_pkh': blinded_pkh_b58(pkh, secret),
             'amount': amount
         }
         commitments.append(commitment)
     return commitments
 
-# Generate dummy genesis information for a centralized alphanet faucet
-def make_dummy_wallets(n, blind):
+def blinded_pkh_b58(pkh, secret):
+    # The redemption code is used to blind the pkh
+    blinded_pkh = blake2b(pkh, 20, key=secret).digest()
+    return bitcoin.bin_to_b58check(blinded_pkh, magicbyte=16921055)
+
+def chunk_seed(name, start, blind):
+    # A 32-bit seed derived from the blind, for the chunk starting at start
+    return int(binascii.hexlify(
+        blake2b("%s%d" % (name, start), 4, key=blind).digest()), 16)
+
+def dummy_amounts(start, size, blind):
     # Not a realistic shape, but for an alphanet faucet it's better to
-    # have less variance.
-    amounts = np.random.pareto(10.0, n)
-    amounts = amounts / sum(amounts) * 700e6
-    wallets = {}
-    secrets = {}
-    for i in range(0, n):
-        entropy = blake2b(str(i), 20, key=blind).digest()
+    # have less variance. The amounts of a chunk are drawn from a generator
+    # seeded by the chunk, so that they can be drawn again by a worker.
+    rng = np.random.RandomState(chunk_seed("amounts", start, blind))
+    return rng.pareto(10.0, size)
+
+def make_dummy_wallet_chunk(chunk):
+    # Derive the wallets [start, start + size), whose amounts are
+    # normalized by their total over all chunks. The amounts, passwords
+    # and emails are drawn from generators seeded by the chunk, so the
+    # result only depends on the blind and does not depend on the number
+    # of workers.
+    start, size, total, blind = chunk
+    amounts = dummy_amounts(start, size, blind) / total * 700e6
+    rng = random.Random(blake2b("chunk%d" % start, 20, key=blind).digest())
+    wallets = []
+    for offset, amount in enumerate(amounts):
+        entropy = blake2b(str(start + offset), 20, key=blind).digest()
         mnemonic = bitcoin.mnemonic.entropy_to_words(entropy)
-        password = ''.join(random.choice(string.letters + string.digits) for _ in range(10))
-        email    = random_email()
+        password = ''.join(rng.choice(string.letters + string.digits) for _ in range(10))
+        email    = random_email(rng)
         sk, pk, pkh, pkh_b58 = get_keys(' '.join(mnemonic), email, password)
-        amount = tez_to_int(amounts[i])
-        wallets[pkh_b58] = amount
+        amount = tez_to_int(amount)
         secret = secret_code(pkh, blind)
-        secrets[pkh_b58] = (mnemonic, email, password, amount, binascii.hexlify(secret))
-    return wallets, secrets
+        wallets.append((pkh_b58, mnemonic, email, password, amount,
+                        binascii.hexlify(secret),
+                        blinded_pkh_b58(pkh, secret)))
+    return wallets
+
+class JsonListWriter(object):
+    """Write the elements of a JSON list one at a time."""
+
+    def __init__(self, f, indent=1):
+        self.f = f
+        self.indent = indent
+        self.first = True
+
+    def write(self, element):
+        self.f.write("\n" if self.first else ",\n")
+        self.first = False
+        self.f.write(json.dumps(element, indent=self.indent))
+
+    def close(self):
+        self.f.write("\n]" if not self.first else "]")
+
+def make_dummy_wallets_streaming(n, blind, processes=None, chunk_size=CHUNK_SIZE):
+    # Generate dummy genesis information for a centralized alphanet
+    # faucet. Keys are derived in a pool of workers, by chunks of
+    # chunk_size wallets, and both JSON files are written as results come
+    # in, so that memory usage does not depend on n. The amounts of the
+    # chunks are drawn a first time to compute their total.
+    sizes = [(start, min(chunk_size, n - start))
+             for start in xrange(0, n, chunk_size)]
+    total = sum(dummy_amounts(start, size, blind).sum()
+                for start, size in sizes)
+    chunks = ((start, size, total, blind) for start, size in sizes)
+    pool = Pool(processes)
+    with open('secret_seeds.json', 'w') as seeds_file, \
+         open('commitments.json', 'w') as commitments_file:
+        seeds_file.write("[")
+        seeds = JsonListWriter(seeds_file)
+        commitments_file.write('{\n "bootstrap_accounts": %s,\n "commitments": ['
+                               % json.dumps(BOOTSTRAP_ACCOUNTS))
+        commitments = JsonListWriter(commitments_file, indent=None)
+        for wallets in pool.imap(make_dummy_wallet_chunk, chunks):
+            for (pkh, mnemonic, email, password, amount, secret,
+                 blinded_pkh) in wallets:
+                seeds.write({ "pkh" : pkh,
+                              "mnemonic" : mnemonic,
+                              "email" : email,
+                              "password" : password,
+                              "amount" : str(amount),
+                              "activation_code" : secret })
+                if amount > 0:
+                    commitments.write([blinded_pkh, str(amount)])
+        seeds.close()
+        commitments.close()
+        commitments_file.write(',\n "no_rewards_cycles": 7,'
+                               '\n "security_deposit_ramp_up_cycles": 64\n}')
+    pool.close()
+    pool.join()
 
 if __name__ == '__main__':
     if len(sys.argv) < 3:
-        print "Usage: python create_genesis_info.py /path/to/json blind [dummy]"
+        print "Usage: python create_genesis_info.py /path/to/json blind [dummy [count [processes]]]"
         exit(1)
     blind = sys.argv[2]
-    if len(sys.argv) == 4 and sys.argv[3] == "dummy":
-        wallets, secrets = make_dummy_wallets(30000, blind)
-        with open('secret_seeds.json', 'w') as f:
-            json.dump([ { "pkh" : pkh,
-                          "mnemonic" : mnemonic,
-                          "email" : email,
-                          "password" : password,
-                          "amount" : str(amount),
-                          "activation_code" : secret }
-                        for pkh, (mnemonic, email, password, amount, secret) in secrets.iteritems()], f, indent=1)
-    else:
-        wallets = get_wallets( sys.argv[1] )
+    if len(sys.argv) >= 4 and sys.argv[3] == "dummy":
+        count = int(sys.argv[4]) if len(sys.argv) >= 5 else 30000
+        processes = int(sys.argv[5]) if len(sys.argv) >= 6 else None
+        make_dummy_wallets_streaming(count, blind, processes)
+        exit(0)
 
+    wallets = get_wallets( sys.argv[1] )
     commitments = genesis_commitments(wallets, blind)
 
     with open('commitments.json', 'w') as f:
         json.dump({
-        "bootstrap_accounts": [
-            [ "edsk4X12XaKRPHgDkgvMe4UWEiygx8AVrt9rpktmhu1uT2GCPU4dp7",
-              "12000000000000" ],
-            [ "edsk46ypB8PztxMDPMdVnEgjQmJhca7zMJvTMDrdwJaJ4mgm4qNmwE",
-              "12000000000000" ],
-            [ "edsk4JsBpWJH5cDtanNADY2D5Ygma1dUtxko8qaM2Af8FHGU52yLcW",
-              "12000000000000" ],
-            [ "edsk3b5GrQdRF1Pt3ccRjvyoNHTFrSXUKZufg2zQYhBumqS8kMfeGC",
-              "12000000000000" ],
-            [ "edsk3T8CRr8YK2vnjsZK2vDzCjpcWpMEUXMAzjeR1GWjmyhGaDHTNV",
-              "12000000000000" ]
-        ],
+            "bootstrap_accounts": BOOTSTRAP_ACCOUNTS,
             "commitments": [
                 (commitment['blinded_pkh'], str(commitment['amount']))
                 for commitment in commitments if commitment['amount'] > 0
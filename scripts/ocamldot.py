@@ -1,85 +1,231 @@
-#!/usr/bin/python
+#!/usr/bin/env python3
+"""Print the module dependency graph of OCaml libraries from the
+`.depends.ocamldep-output` files produced by dune.
 
+Each library is a cluster of the graph, and only dependencies between
+modules of the same library are drawn.
+
+The ocamldep outputs are parsed in a pool of workers. With --cache, the
+parsed dependencies of each file are stored and reused as long as the
+file's mtime is unchanged, so that re-running on a large tree only
+re-parses the files that changed.
+
+Example:
+
+    ./scripts/ocamldot.py _build/default/src/proto_alpha | dot -Tsvg
+"""
+
+import argparse
+import json
+import os
 import re
 import sys
-import os
-import argparse
-from sets import Set
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
 
-alldeps={}
-allmodules={}
+EXT = ".depends.ocamldep-output"
 
-def sanitize(s):
-    s=re.sub('.*/','',s)
-    s=re.sub('[^0-9a-zA-Z]+', '_', s)
+# Version of the format of the cache
+CACHE_VERSION = 1
+
+# module -> dependencies
+Deps = Dict[str, List[str]]
+
+
+def sanitize(s: str) -> str:
+    s = re.sub('.*/', '', s)
+    s = re.sub('[^0-9a-zA-Z]+', '_', s)
     return s
 
-def cleanName(s):
+
+def clean_name(s: str) -> str:
     ml = os.path.basename(s)
-    (mod,_) = os.path.splitext(ml)
+    (mod, _) = os.path.splitext(ml)
     return mod.capitalize()
 
-def mangle(f,modulename):
 
-    dictionary = {}
-    for line in open(f):
-        s=line.split();
-        for x in range(2, len(s)):
-            mod = cleanName(s[0])
-            dep = sanitize(s[x])
-            if mod in dictionary :
-                dictionary[mod].append(dep)
-            else :
-                dictionary[mod] = [dep]
-            allmodules.update({mod : modulename})
+def parse(path: str) -> Deps:
+    """Parse an ocamldep output, whose lines are `file: dep1 dep2...`"""
+    dictionary: Deps = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            s = line.split()
+            if len(s) <= 2:
+                continue
+            deps = dictionary.setdefault(clean_name(s[0]), [])
+            for x in s[2:]:
+                dep = sanitize(x)
+                if dep not in deps:
+                    deps.append(dep)
+    return dictionary
+
+
+def find_depends(directories: List[str]) -> List[Tuple[str, str]]:
+    """Return the (library name, path) of all ocamldep outputs"""
+    res = []
+    for directory in directories:
+        for root, _, files in os.walk(directory):
+            for f in sorted(files):
+                if f.endswith(EXT):
+                    res.append((f[: -len(EXT)], os.path.join(root, f)))
+    return res
+
 
-    alldeps[modulename] = dictionary
+def load_cache(cache_file: Optional[str]) -> dict:
+    if cache_file is None or not os.path.isfile(cache_file):
+        return {}
+    try:
+        with open(cache_file, encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get('version') != CACHE_VERSION:
+        return {}
+    return cache.get('files', {})
 
-def cleanup(alldeps):
+
+def save_cache(cache_file: Optional[str], files: dict) -> None:
+    if cache_file is None:
+        return
+    with open(cache_file, mode="w", encoding="utf-8") as f:
+        json.dump({'version': CACHE_VERSION, 'files': files}, f)
+
+
+def scan(
+    directories: List[str],
+    cache_file: Optional[str] = None,
+    jobs: Optional[int] = None,
+) -> Dict[str, Deps]:
+    """Return the dependencies of the modules of each library found in
+    `directories`, restricted to modules of the scanned libraries."""
+    depends = find_depends(directories)
+    cache = load_cache(cache_file)
+    index = {}
+    stale = []
+    for _, path in depends:
+        mtime = os.stat(path).st_mtime_ns
+        entry = cache.get(path)
+        if entry is not None and entry['mtime'] == mtime:
+            index[path] = entry
+        else:
+            stale.append((path, mtime))
+    if stale:
+        with ProcessPoolExecutor(jobs) as executor:
+            results = executor.map(parse, [path for path, _ in stale])
+            for (path, mtime), deps in zip(stale, results):
+                index[path] = {'mtime': mtime, 'deps': deps}
+        save_cache(cache_file, index)
+
+    alldeps: Dict[str, Deps] = {}
+    allmodules: Set[str] = set()
+    for name, path in depends:
+        alldeps[name] = index[path]['deps']
+        allmodules.update(alldeps[name])
     # remove references to external libraries
-    for (name,dictionary) in alldeps.iteritems() :
-        for (mod,deps) in dictionary.iteritems() :
-            dictionary[mod] = [x for x in deps if x in allmodules]
-        alldeps[name] = dictionary
-    return alldeps
+    return {
+        name: {
+            mod: [x for x in deps if x in allmodules]
+            for (mod, deps) in dictionary.items()
+        }
+        for (name, dictionary) in alldeps.items()
+    }
+
+
+def transitive_reduction(dictionary: Deps) -> Deps:
+    """Remove the dependencies implied by other dependencies.
+
+    Only dependencies within the library are considered."""
+
+    def reachable(start: str) -> Set[str]:
+        seen: Set[str] = set()
+        todo = [start]
+        while todo:
+            mod = todo.pop()
+            for dep in dictionary.get(mod, []):
+                if dep not in seen:
+                    seen.add(dep)
+                    todo.append(dep)
+        return seen
 
-def print_graph(alldeps):
+    reach = {mod: reachable(mod) for mod in dictionary}
+    res = {}
+    for (mod, deps) in dictionary.items():
+        local = [dep for dep in deps if dep in dictionary and dep != mod]
+        res[mod] = [
+            dep
+            for dep in local
+            if not any(
+                dep in reach[other] for other in local if other != dep
+            )
+        ]
+    return res
+
+
+def print_dot(alldeps: Dict[str, Deps]) -> None:
     print("strict digraph G {")
     print('graph [fontsize=10 fontname="Verdana"];')
     print('node [shape=record fontsize=10 fontname="Verdana" compound=true];')
-    counter = 0
-    l = { x: i for i,x in enumerate(alldeps.keys())}
-    for (name,dictionary) in alldeps.iteritems() :
-        names = ['"%s"' % mod for mod in dictionary.keys()]
-        if len(names) > 0 :
-            print ('subgraph cluster_%i { label = "%s"; color=blue; node [style=filled];' % (l[name],name))
-            counter += 1
-            for (mod,deps) in dictionary.iteritems() :
-                for dep in deps :
-                    if dep in dictionary :
-                        print ('"%s" -> "%s";' % (mod,dep))
-            print "}"
-            # for (mod,deps) in dictionary.iteritems() :
-                # for dep in deps :
-                    # if dep not in dictionary :
-                        # print ('"%s" -> "%s" [ltail=cluster_%i lhead=cluster_%i];' % (mod,dep,l[name],l[allmodules[dep]]))
-    print "}"
-
-def scan(directories):
-    ext = ".depends.ocamldep-output"
-    for directory in directories:
-        for root, dirs, files in os.walk(directory):
-            for f in files:
-                if f.endswith(ext):
-                     mangle(os.path.join(root, f),f[:-len(ext)])
-    print_graph(cleanup(alldeps))
+    for (i, (name, dictionary)) in enumerate(alldeps.items()):
+        if dictionary:
+            print(
+                f'subgraph cluster_{i} {{ label = "{name}"; color=blue; '
+                'node [style=filled];'
+            )
+            for (mod, deps) in dictionary.items():
+                for dep in deps:
+                    if dep in dictionary:
+                        print(f'"{mod}" -> "{dep}";')
+            print("}")
+    print("}")
+
+
+def print_json(alldeps: Dict[str, Deps]) -> None:
+    json.dump(alldeps, sys.stdout, indent=2, sort_keys=True)
+    print()
+
 
 def main():
     parser = argparse.ArgumentParser(description='OcamlDep Dependency Tree')
-    parser.add_argument('inputdirs', type=str, nargs='*', help="directories to scan")
+    parser.add_argument(
+        'inputdirs', type=str, nargs='*', help="directories to scan"
+    )
+    parser.add_argument(
+        '--format',
+        choices=['dot', 'json'],
+        default='dot',
+        help="output format, default=dot",
+    )
+    parser.add_argument(
+        '--reduce',
+        action='store_true',
+        help="only draw dependencies not implied by other dependencies",
+    )
+    parser.add_argument(
+        '--cache',
+        metavar='FILE',
+        default=None,
+        help="cache parsed dependencies in FILE, by mtime",
+    )
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        type=int,
+        default=None,
+        help="number of workers, defaults to the number of CPUs",
+    )
     args = parser.parse_args()
 
-    scan(args.inputdirs)
+    alldeps = scan(args.inputdirs, args.cache, args.jobs)
+    if args.reduce:
+        alldeps = {
+            name: transitive_reduction(dictionary)
+            for (name, dictionary) in alldeps.items()
+        }
+    if args.format == 'json':
+        print_json(alldeps)
+    else:
+        print_dot(alldeps)
+
 
 if __name__ == '__main__':
     main()
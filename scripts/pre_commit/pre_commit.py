@@ -28,6 +28,14 @@ For the moment this script:
 The first three points are blocking, if the corresponding check fails
 the commit is aborted.
 
+Python tests and tezt tests are each executed by a single invocation, and
+run concurrently with the python linters. A stage is skipped if it
+succeeded before on exactly the same files, with the same content of the
+whole worktree (as its results also depend on conftest, tools, other
+modules...) and, for tests, the same tezos-* binaries: the keys of
+successful stages are recorded in .git/pre_commit_cache.json. The time
+taken by each stage is reported at the end.
+
 Installation: `ln -sr scripts/pre_commit/pre_commit.py .git/hooks/pre-commit`
 
 You can pass "--lint-only" to avoid calling `pytest` and executing tezt tests,
@@ -46,16 +54,34 @@ to make sure an upcoming call to `git commit` will succeed:
 
 You can pass "--test-itself" for the precommit to test itself. This is
 used in the CI.
+
+You can pass "--no-cache" to run all stages, even those whose inputs
+are unchanged since their last successful run.
 """
 
+import concurrent.futures
+import glob
+import hashlib
+import json
 import os
 import re
 import subprocess
 import sys
-from typing import List, Optional, Tuple
+import time
+from typing import Callable, Dict, List, Optional, Tuple
 _LINT_ONLY = "--lint-only"
 _TEST_ITSELF = "--test-itself"
 _UNSTAGED = "--unstaged"
+_NO_CACHE = "--no-cache"
+_CACHE_FILE = "pre_commit_cache.json"
+# Number of successful stage runs remembered by the cache
+_CACHE_SIZE = 1000
+# The stages whose results also depend on the built binaries
+_TEST_STAGES = ["pytest", "tezt"]
+
+# A stage of the hook: its name, the files it checks, and a function
+# running it and returning its return code and output
+Stage = Tuple[str, List[str], Callable[[], Tuple[int, str]]]
 
 
 def _git_diff(staged_or_modified: bool, extension: str) -> List[str]:
@@ -189,36 +215,51 @@ def _ocamlformat_check(files: List[str]) -> bool:
     return result
 
 
-def _call_pytest(tests_python_path: str, files: List[str]) -> int:
+def _run(cmd: List[str], cwd: Optional[str] = None,
+         env: Optional[Dict[str, str]] = None) -> Tuple[int, str]:
+    """
+    Args:
+        cmd (list(str)): The command to execute
+        cwd (str): The directory where to execute it
+        env (dict): The environment of the command
+    Returns:
+        The return code of the command and its output, with stdout and
+        stderr interleaved, prefixed by the command itself
+    """
+    prompt = f"{cwd}> " if cwd else "> "
+    res = subprocess.run(cmd, cwd=cwd, env=env, check=False, text=True,
+                         stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    return res.returncode, prompt + " ".join(cmd) + "\n" + res.stdout
+
+
+def _call_pytest(tests_python_path: str,
+                 files: List[str]) -> Tuple[int, str]:
     """
     Args:
         tests_python_path: the path of the directory `tezos/tests_python`
         files (list(str)): The files on which to call pytest
     Returns:
-        The maximum of return codes of calls to pytest on `files`
+        The return code of a single call to pytest on all `files`,
+        and its output
     """
     tests_python_basename = os.path.basename(tests_python_path)
-    result = 0
-    for file_ in files:
-        # trim "tests_python/" from start of path
-        # because we execute within tests_python
-        file_ = file_[len(tests_python_basename) + len(os.sep):]
-        cmd = ["poetry", "run", "pytest", file_]
-        print(f"{tests_python_basename}> " + " ".join(cmd))
-        py_test_result = subprocess.run(cmd,
-                                        cwd=tests_python_basename,
-                                        check=False)
-        result = max(result, py_test_result.returncode)
-    return result
+    # trim "tests_python/" from start of paths
+    # because we execute within tests_python
+    files = [file_[len(tests_python_basename) + len(os.sep):]
+             for file_ in files]
+    cmd = ["poetry", "run", "pytest"] + files
+    return _run(cmd, cwd=tests_python_basename)
 
 
-def _call_py_linters(tests_python_path: str, files: List[str]) -> int:
+def _call_py_linters(tests_python_path: str,
+                     files: List[str]) -> Tuple[int, str]:
     """
     Args:
         tests_python_path: the path of the directory `tezos/tests_python`
         files (list(str)): The files to lint
     Returns:
-        The return code of calling linters, stopping at first failure
+        The return code of calling linters, stopping at first failure,
+        and their output
     """
     tests_python_basename = os.path.basename(tests_python_path)
     # Filter out files that are not under tests_python since this is the scope
@@ -231,35 +272,28 @@ def _call_py_linters(tests_python_path: str, files: List[str]) -> int:
         ]
     )
     if not target_files:
-        return 0  # Nothing to do
+        return 0, ""  # Nothing to do
     # Run all analyses defined in Makefile for this hook
     cmd = ["make", "pre_commit_targets"]
     # We use the SRCS environment variable to pass the filenames that have
     # changed as our analyses targets
-    completed_process = subprocess.run(
-        cmd,
-        cwd=tests_python_basename,
-        check=False,
-        env=dict(os.environ, SRCS=target_files),
-    )
-    return completed_process.returncode
+    return _run(cmd, cwd=tests_python_basename,
+                env=dict(os.environ, SRCS=target_files))
 
 
-def _call_tezt(files: List[str], staged_or_modified: bool) -> int:
+def _get_tezt_files(files: List[str]) -> Optional[List[str]]:
     """
     Args:
-        files (list(str)): All {ml,mli} files to consider. Filtering
-                           for tezt has NOT been done yet.
-        staged_or_modified (bool) Whether staged files are considered (True)
-                                  or modified ones (False)
+        files (list(str)): All {ml,mli} files to consider.
     Returns:
-        The maximum of return codes
+        The files among `files` that register tezt tests, or None if
+        the tezt directory cannot be found
     """
     tezt_test_dir = "tezt/tests"
     if not os.path.isdir(tezt_test_dir):
         print(f"Unexpectedly, {tezt_test_dir} directory cannot be found",
               file=sys.stderr)
-        return 1
+        return None
 
     tezt_files = []
     for file_ in files:
@@ -272,50 +306,231 @@ def _call_tezt(files: List[str], staged_or_modified: bool) -> int:
             match = re.search(pattern, handle.read())
             if match is None:
                 continue
-        to_add = file_[len(tezt_test_dir) + len(os.sep):]  # remove tezt/tests/
-        tezt_files.append(to_add)
+        tezt_files.append(file_)
+    return tezt_files
 
-    adjective = "staged" if staged_or_modified else "modified"
 
-    if not tezt_files:
-        print(f"No {adjective} file relevant to tezt found")
-        return 0
+def _call_tezt(tezt_files: List[str]) -> Tuple[int, str]:
+    """
+    Args:
+        tezt_files (list(str)): The tezt files to execute, as
+                                returned by `_get_tezt_files`
+    Returns:
+        The return code of a single call to tezt on all files,
+        and its output
+    """
+    tezt_test_dir = "tezt/tests"
+    cmd = ["dune", "exec", "tezt/tests/main.exe", "--"]
+    for tezt_file in tezt_files:
+        # remove tezt/tests/
+        cmd += ["--file", tezt_file[len(tezt_test_dir) + len(os.sep):]]
+    return _run(cmd)
 
-    return_code = 0
 
-    for tezt_file in tezt_files:
-        cmd = ["dune", "exec", "tezt/tests/main.exe", "--", "--file",
-               tezt_file]
-        print("> " + " ".join(cmd))
-        cmd_result = subprocess.run(cmd, check=False)
-        return_code = max(return_code, cmd_result.returncode)
+def _git_dir() -> Optional[str]:
+    """
+    Returns: The path of the .git directory, or None if not in a repository
+    """
+    res = subprocess.run(["git", "rev-parse", "--git-dir"],
+                         stdout=subprocess.PIPE, universal_newlines=True,
+                         check=False)
+    return res.stdout.strip() if res.returncode == 0 else None
+
 
+def _content_hashes(files: List[str],
+                    staged_or_modified: bool) -> Dict[str, str]:
+    """
+    Args:
+        files (list(str)): Versioned files
+        staged_or_modified (bool) Whether to hash the staged content (True)
+                                  or the content of the worktree (False)
+    Returns: A dictionary from files to the git object hash of their content
+    """
+    if not files:
+        return {}
+    if staged_or_modified:
+        # Lines are "<mode> <object> <stage>\t<file>"
+        res = subprocess.run(["git", "ls-files", "--stage", "--"] + files,
+                             stdout=subprocess.PIPE, universal_newlines=True,
+                             check=True)
+        return {line.split("\t", 1)[1]: line.split()[1]
+                for line in res.stdout.split("\n") if line}
+    res = subprocess.run(["git", "hash-object", "--"] + files,
+                         stdout=subprocess.PIPE, universal_newlines=True,
+                         check=True)
+    return dict(zip(files, res.stdout.split()))
+
+
+def _worktree_hash() -> Optional[str]:
+    """
+    Returns: A hash of the content of the worktree: the tree of the index,
+             and the content of the files that differ from the index or
+             are untracked. None if the index cannot be written as a tree,
+             e.g. during a merge
+    """
+    res = subprocess.run(["git", "write-tree"], stdout=subprocess.PIPE,
+                         stderr=subprocess.DEVNULL, universal_newlines=True,
+                         check=False)
+    if res.returncode != 0:
+        return None
+    key = hashlib.sha256(res.stdout.strip().encode())
+    dirty = set()
+    for cmd in [["git", "diff", "--name-only"],
+                ["git", "ls-files", "--others", "--exclude-standard"]]:
+        res = subprocess.run(cmd, stdout=subprocess.PIPE,
+                             universal_newlines=True, check=True)
+        dirty.update(file_ for file_ in res.stdout.split("\n") if file_)
+    # Deleted files are hashed as empty
+    existing = sorted(file_ for file_ in dirty if os.path.isfile(file_))
+    hashes = _content_hashes(existing, False)
+    for file_ in sorted(dirty):
+        key.update(f"\0{file_}\0{hashes.get(file_, '')}".encode())
+    return key.hexdigest()
+
+
+def _binaries_hash() -> str:
+    """
+    Returns: A hash of the content of the tezos-* executables at the root
+             of the repository, which tests run
+    """
+    key = hashlib.sha256()
+    for binary in sorted(glob.glob("tezos-*")):
+        if not os.path.isfile(binary) or not os.access(binary, os.X_OK):
+            continue
+        key.update(f"\0{binary}\0".encode())
+        with open(binary, mode="rb") as handle:
+            for block in iter(lambda: handle.read(1 << 20), b""):
+                key.update(block)
+    return key.hexdigest()
+
+
+def _stage_key(name: str, hashes: Dict[str, str], context: str) -> str:
+    """
+    Args:
+        name (str): The name of the stage
+        hashes (dict): The content hashes of the files checked by the stage
+        context (str): A hash of everything else the stage depends on
+    Returns: A key identifying a stage run on files with given content
+    """
+    key = hashlib.sha256(f"{name}\0{context}".encode())
+    for file_ in sorted(hashes):
+        key.update(f"\0{file_}\0{hashes[file_]}".encode())
+    return key.hexdigest()
+
+
+class _Cache:
+    """
+    The keys of stages that succeeded, stored in the .git directory
+    """
+
+    def __init__(self, enabled: bool):
+        git_dir = _git_dir() if enabled else None
+        self.path = os.path.join(git_dir, _CACHE_FILE) if git_dir else None
+        self.keys: Dict[str, float] = {}
+        if self.path and os.path.isfile(self.path):
+            try:
+                with open(self.path, encoding="utf-8") as handle:
+                    self.keys = json.load(handle)
+            except (OSError, ValueError):
+                self.keys = {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.keys
+
+    def add(self, key: str) -> None:
+        self.keys[key] = time.time()
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        # Keep the most recent entries only
+        recent = sorted(self.keys.items(), key=lambda item: item[1])
+        with open(self.path, mode="w", encoding="utf-8") as handle:
+            json.dump(dict(recent[-_CACHE_SIZE:]), handle)
+
+
+def _run_stages(stages: List[Stage], staged_or_modified: bool,
+                use_cache: bool) -> int:
+    """
+    Runs stages concurrently, skipping those that already succeeded on
+    the same content, and prints their output and timings.
+
+    Args:
+        stages (list(Stage)): The stages to run
+        staged_or_modified (bool) Whether staged files are considered (True)
+                                  or modified ones (False)
+        use_cache (bool): Whether to skip stages whose inputs are unchanged
+    Returns:
+        The maximum of return codes
+    """
+    worktree = _worktree_hash() if use_cache and stages else None
+    cache = _Cache(worktree is not None)
+    all_files = sorted({file_ for _, files, _ in stages for file_ in files})
+    hashes = _content_hashes(all_files, staged_or_modified)
+    binaries = None
+    if worktree and any(name in _TEST_STAGES for name, _, _ in stages):
+        binaries = _binaries_hash()
+    timings: List[Tuple[str, str]] = []
+    return_code = 0
+
+    def _timed(run: Callable[[], Tuple[int, str]]) -> Tuple[int, str, float]:
+        start = time.monotonic()
+        stage_rc, output = run()
+        return stage_rc, output, time.monotonic() - start
+
+    with concurrent.futures.ThreadPoolExecutor(len(stages) or 1) as executor:
+        futures = []
+        for name, files, run in stages:
+            context = f"{worktree}\0{binaries if name in _TEST_STAGES else ''}"
+            key = _stage_key(name,
+                             {file_: hashes.get(file_, "") for file_ in files},
+                             context)
+            if key in cache:
+                print(f"{name}: inputs unchanged since last success, skipped")
+                timings.append((name, "cached"))
+                continue
+            futures.append((name, key, executor.submit(_timed, run)))
+        for name, key, future in futures:
+            stage_rc, output, duration = future.result()
+            if output:
+                print(output, end="" if output.endswith("\n") else "\n")
+            if stage_rc == 0:
+                cache.add(key)
+            timings.append((name, f"{duration:.1f}s"
+                            + ("" if stage_rc == 0 else " (failed)")))
+            return_code = max(return_code, stage_rc)
+
+    cache.save()
+    if timings:
+        print("Stage timings:")
+        for name, timing in timings:
+            print(f"  {name}: {timing}")
     return return_code
 
 
-def _main_py_files(staged_or_modified: bool, adjective: str,
-                   pytest: bool) -> int:
+def _py_stages(staged_or_modified: bool, adjective: str,
+               pytest: bool) -> Optional[List[Stage]]:
     """
     Args:
         staged_or_modified (bool): Whether staged files are considered (True)
                                    or modified ones (False)
         adjective (str)
         pytest (bool): whether `pytest` should be called
-    Returns: A return code
+    Returns: The stages checking python files, or None in case of error
     """
-    return_code = 0
+    stages: List[Stage] = []
 
     tests_python_path = _get_tests_python_path()
     if not tests_python_path:
-        return 1
+        return None
 
     if pytest:
         relevant_pytest_files = _get_py_files(tests_python_path,
                                               staged_or_modified, True)
         if relevant_pytest_files:
-            return_code = max(return_code,
-                              _call_pytest(tests_python_path,
-                                           relevant_pytest_files))
+            stages.append(("pytest", relevant_pytest_files,
+                           lambda: _call_pytest(tests_python_path,
+                                                relevant_pytest_files)))
         else:
             print(f"No {adjective} *.py file relevant to pytest found")
     else:
@@ -324,13 +539,13 @@ def _main_py_files(staged_or_modified: bool, adjective: str,
     relevant_pylint_files = _get_py_files(tests_python_path,
                                           staged_or_modified, False)
     if relevant_pylint_files:
-        return_code = max(
-            return_code,
-            _call_py_linters(tests_python_path, relevant_pylint_files))
+        stages.append(("python linters", relevant_pylint_files,
+                       lambda: _call_py_linters(tests_python_path,
+                                                relevant_pylint_files)))
     else:
         print(f"No {adjective} *.py file to lint")
 
-    return return_code
+    return stages
 
 
 def _main_test_itself() -> int:
@@ -346,18 +561,20 @@ def _main_test_itself() -> int:
 
 
 # I don't use argsparse to avoid adding a non-system dependency
-def _parse_arguments() -> Tuple[bool, bool, bool]:
+def _parse_arguments() -> Tuple[bool, bool, bool, bool]:
     """
-    Returns: A tuple with three Booleans:
+    Returns: A tuple with four Booleans:
         1/ Whether staged (True) or modified (False) files should be considered
         2/ Whether --lint-only was passed
         3/ Whether the hook should test itself instead of doing its normal
            operations
+        4/ Whether stages whose inputs are unchanged can be skipped
     """
     staged = _UNSTAGED not in sys.argv
     lint_only = _LINT_ONLY in sys.argv
     test_itself = _TEST_ITSELF in sys.argv
-    return (staged, lint_only, test_itself)
+    use_cache = _NO_CACHE not in sys.argv
+    return (staged, lint_only, test_itself, use_cache)
 
 
 def _print_help():
@@ -367,12 +584,15 @@ def _print_help():
     print("Usage: ./scripts/pre_commit/pre_commit.py [-h|--help]"
           f" [{_LINT_ONLY}]"
           f" [{_TEST_ITSELF}]"
-          f" [{_UNSTAGED}]")
+          f" [{_UNSTAGED}]"
+          f" [{_NO_CACHE}]")
     print(f"""This hooks does the following:
 1/ Executes python tests of staged *.py files (disable by passing {_LINT_ONLY})
 2/ Lints staged *.py files
 3/ Formats staged *{{ml,mli}} files
    (and update the commit if possible with formatting changes)
+Python tests, tezt tests and linters run concurrently, and are skipped
+if they succeeded before on the same content (disable by passing {_NO_CACHE})
 Pass {_TEST_ITSELF} for the hook to test itself (used by CI)
 Pass {_UNSTAGED} to do all this on unstaged files""")
     sys.exit(0)
@@ -382,13 +602,17 @@ def main() -> int:
     """ The main """
     _print_help()
 
-    staged, lint_only, test_itself = _parse_arguments()
+    staged, lint_only, test_itself, use_cache = _parse_arguments()
     if test_itself:
         print(f"Recognized {_TEST_ITSELF}")
         return _main_test_itself()
     adjective = "staged" if staged else "modified"
 
-    return_code = _main_py_files(staged, adjective, not lint_only)
+    return_code = 0
+    stages = _py_stages(staged, adjective, not lint_only)
+    if stages is None:
+        return_code = 1
+        stages = []
 
     ml_extensions = ["ml", "mli"]
     relevant_ocaml_files = _git_diff_many(staged, ml_extensions)
@@ -398,13 +622,19 @@ def main() -> int:
         if lint_only:
             print(f"{_LINT_ONLY} passed: not calling tezt")
         else:
-            tezt_rc = _call_tezt(relevant_ocaml_files, staged)
-            return_code = max(return_code, tezt_rc)
+            tezt_files = _get_tezt_files(relevant_ocaml_files)
+            if tezt_files is None:
+                return_code = 1
+            elif tezt_files:
+                stages.append(("tezt", tezt_files,
+                               lambda: _call_tezt(tezt_files)))
+            else:
+                print(f"No {adjective} file relevant to tezt found")
     else:
         extensions = "{" + ",".join(ml_extensions) + "}"
         print(f"No {adjective} *.{extensions} relevant file found")
 
-    return return_code
+    return max(return_code, _run_stages(stages, staged, use_cache))
 
 
 if __name__ == "__main__":
@@ -8,11 +8,15 @@ import sys
 import tempfile
 import time
 import urllib.request
-from typing import Any, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, List, Mapping, Optional, Tuple
 
 from process.process_utils import format_command
 from . import client_output
 
+if TYPE_CHECKING:
+    from tools.rpc_trace import RpcRecorder
+    from tools.typecheck_cache import TypecheckCache
+
 
 class Client:
     """Client to a Tezos node.
@@ -35,6 +39,10 @@ class Client:
           - this works for the current tests but should be more generic
     """
 
+    # Recorder of the RPCs of the commands of all clients, if any (see
+    # tools/rpc_trace.py)
+    rpc_recorder = None  # type: Optional[RpcRecorder]
+
     def __init__(
         self,
         client_path: str,
@@ -110,8 +118,13 @@ class Client:
         admin_client.extend(connectivity_options)
 
         self._client = client
+        # Path of the client binary
+        self.client_path = client_path
         self._admin_client = admin_client
+        self.mode = 'client' if mode is None else mode
         self.rpc_port = rpc_port
+        # Cache of the outputs of `typecheck`, if any
+        self.typecheck_cache = None  # type: Optional[TypecheckCache]
 
         if endpoint is not None:
             self.endpoint = endpoint
@@ -149,7 +162,8 @@ class Client:
         Fails with `CalledProcessError` if command fails
         """
         client = self._admin_client if admin else self._client
-        trace_opt = ['-l'] if trace else []
+        recorder = None if admin else Client.rpc_recorder
+        trace_opt = ['-l'] if trace or recorder is not None else []
         cmd = client + trace_opt + params
 
         print(format_command(cmd))
@@ -159,28 +173,34 @@ class Client:
             new_env.update(env_change)
         if self._disable_disclaimer:
             new_env["TEZOS_CLIENT_UNSAFE_DISABLE_DISCLAIMER"] = "Y"
-        process = subprocess.Popen(
-            cmd,
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            env=new_env,
-        )
-        outstream, errstream = process.communicate(input=stdin.encode())
-        stdout = outstream.decode('utf-8')
-        stderr = errstream.decode('utf-8')
+        if recorder is not None:
+            (stdout, stderr, returncode) = recorder.run(
+                cmd, params, self.mode, stdin, new_env, keep_trace=trace
+            )
+        else:
+            process = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                env=new_env,
+            )
+            outstream, errstream = process.communicate(input=stdin.encode())
+            stdout = outstream.decode('utf-8')
+            stderr = errstream.decode('utf-8')
+            returncode = process.returncode
         if stdout:
             print(stdout)
         if stderr:
             print(stderr, file=sys.stderr)
         if check:
-            if process.returncode != 0:
+            if returncode != 0:
                 raise subprocess.CalledProcessError(
-                    process.returncode, cmd, stdout, stderr
+                    returncode, cmd, stdout, stderr
                 )
         # `+ ""` makes pylint happy. It can't infer stdout/stderr can't
         # be `None` thanks to the `capture_output=True` option.
-        return (stdout + "", stderr + "", process.returncode)
+        return (stdout + "", stderr + "", returncode)
 
     def run(
         self,
@@ -193,6 +213,14 @@ class Client:
         (stdout, _, _) = self.run_generic(params, admin, check, trace)
         return stdout
 
+    def replay(self, params: List[str], stdout: str) -> str:
+        """Like 'run' for a successful command whose output `stdout` is
+        known, e.g. cached, without running it."""
+        print(format_command(self._client + params) + ' (cached)')
+        if stdout:
+            print(stdout)
+        return stdout
+
     def rpc(
         self, verb: str, path: str, data: Any = None, params: List[str] = None
     ) -> Any:
@@ -259,6 +287,8 @@ class Client:
             params += ['--legacy']
         if details:
             params += ['--details']
+        if self.typecheck_cache is not None and file:
+            return self.typecheck_cache.run(self, contract, params)
         return self.run(params)
 
     def typecheck_data(self, data: str, typ: str, legacy=False) -> str:
@@ -420,7 +450,7 @@ class Client:
     def activate_protocol_json(
         self,
         protocol: str,
-        parameters: dict,
+        parameters: Mapping[str, Any],
         fitness: str = '1',
         key: str = 'activator',
         timestamp: str = None,
@@ -429,7 +459,7 @@ class Client:
         if delay is None:
             delay = datetime.timedelta(seconds=0)
         with tempfile.NamedTemporaryFile(mode='w+', delete=False) as params:
-            param_json = json.dumps(parameters)
+            param_json = json.dumps(dict(parameters))
             params.write(param_json)
             params.close()
             return self.activate_protocol(
@@ -18,12 +18,20 @@ from pytest_regtest import (
     _std_conversion,
 )
 from launchers.sandbox import Sandbox
-from tools import constants, paths, utils
+from tools import constants, contract_index, paths, utils
 from tools.client_regression import ClientRegression
 from tools.utils import bake
 from client.client import Client
 
-pytest_plugins = ("pytest_plugins.job_selection",)
+pytest_plugins = (
+    "pytest_plugins.harness_profile",
+    "pytest_plugins.job_selection",
+    "pytest_plugins.mockup_backend",
+    "pytest_plugins.regtest_store",
+    "pytest_plugins.rpc_bench",
+    "pytest_plugins.rpc_trace",
+    "pytest_plugins.shared_tests",
+)
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -46,6 +54,23 @@ def singleprocess(request) -> Iterator[bool]:
     yield request.config.getoption("--singleprocess")
 
 
+@pytest.fixture(scope="session")
+def resource_sampling(request) -> Optional[float]:
+    """Retrieve user-provided interval of sampling of the resources used
+    by nodes and daemons on the command line."""
+    return request.config.getoption("--resource-sampling")
+
+
+@pytest.fixture(scope="session")
+def typecheck_cache_dir(request) -> Optional[str]:
+    """The directory of the cache of typecheck outputs (see
+    tools/typecheck_cache.py), in the pytest cache, or None if disabled."""
+    cache = getattr(request.config, "cache", None)
+    if cache is None or request.config.getoption("--no-typecheck-cache"):
+        return None
+    return str(cache.makedir("typecheck"))
+
+
 @pytest.fixture(scope="class")
 def session() -> Iterator[dict]:
     """Dictionary to store data between tests."""
@@ -76,17 +101,23 @@ You can investigate daemon logs by running this test using the
 
 
 @pytest.fixture(scope="class")
-def sandbox(log_dir: Optional[str], singleprocess: bool) -> Iterator[Sandbox]:
+def sandbox(
+    log_dir: Optional[str],
+    singleprocess: bool,
+    resource_sampling: Optional[float],
+) -> Iterator[Sandbox]:
     """Sandboxed network of nodes.
 
     Nodes, bakers and endorsers are added/removed dynamically."""
     # log_dir is None if not provided on command-line
     # singleprocess is false if not provided on command-line
+    # resource_sampling is None if not provided on command-line
     with Sandbox(
         paths.TEZOS_HOME,
         constants.IDENTITIES,
         log_dir=log_dir,
         singleprocess=singleprocess,
+        resource_sampling=resource_sampling,
     ) as sandbox:
         yield sandbox
         assert sandbox.are_daemons_alive(), DEAD_DAEMONS_WARN
@@ -137,6 +168,11 @@ def client_regtest_custom_scrubber(
     deregister_converter_pre(scrubber)
 
 
+def pytest_sessionfinish(session) -> None:
+    # pylint: disable=unused-argument
+    contract_index.save_all()
+
+
 def pytest_collection_modifyitems(config, items):
     """Adapted from pytest-fixture-marker: adds the regression marker
     to all tests that use the regtest fixture.
@@ -199,3 +235,17 @@ def pytest_addoption(parser: _pytest.config.argparsing.Parser) -> None:
         help="the node validates blocks using only one process,\
             useful for debugging",
     )
+    parser.addoption(
+        "--resource-sampling",
+        action="store",
+        type=float,
+        metavar="SECONDS",
+        help="sample the CPU, memory, file descriptors and disk I/O of "
+        "nodes and daemons every SECONDS, and save them in the log directory",
+    )
+    parser.addoption(
+        "--no-typecheck-cache",
+        action='store_true',
+        default=False,
+        help="typecheck contracts even if their output is in the pytest cache",
+    )
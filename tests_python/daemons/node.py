@@ -271,3 +271,10 @@ class Node:
     def poll(self):
         assert self._process
         return self._process.poll()
+
+    @property
+    def pid(self) -> Optional[int]:
+        """The pid of the node process, if it was run and not reaped"""
+        if self._process is None or self._process.returncode is not None:
+            return None
+        return self._process.pid
@@ -1,12 +1,14 @@
 import os
 import time
-from typing import Callable, Dict, List, Tuple
+from subprocess import Popen
+from typing import Callable, Dict, List, Mapping, Tuple
 
 from client.client import Client
 from daemons.baker import Baker
 from daemons.endorser import Endorser
 from daemons.accuser import Accuser
 from daemons.node import Node
+from process.resource_sampler import ResourceSampler
 
 NODE = 'tezos-node'
 CLIENT = 'tezos-client'
@@ -15,6 +17,36 @@ BAKER = 'tezos-baker'
 ENDORSER = 'tezos-endorser'
 ACCUSER = 'tezos-accuser'
 
+# The content and mode of files, by name
+_Files = Dict[str, Tuple[bytes, int]]
+
+# A client binary and a set of identities, as (alias, secret key) pairs
+_WalletKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+# The files written in a fresh client base dir by the import of a set of
+# identities, by client binary and set of identities. See
+# `Sandbox.init_wallet`.
+_WALLET_TEMPLATES: Dict[_WalletKey, _Files] = {}
+
+
+def _read_files(directory: str) -> _Files:
+    """The content and mode of the files of `directory`, by name"""
+    files = {}
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if os.path.isfile(path):
+            with open(path, 'rb') as stream:
+                files[name] = (stream.read(), os.stat(path).st_mode)
+    return files
+
+
+def _write_files(directory: str, files: _Files) -> None:
+    for name, (content, mode) in files.items():
+        path = os.path.join(directory, name)
+        with open(path, 'wb') as stream:
+            stream.write(content)
+        os.chmod(path, mode)
+
 
 class Sandbox:
     """A Sandbox manages a set of clients, nodes and daemons running in
@@ -59,6 +91,7 @@ class Sandbox:
         num_peers: int = 45,
         log_dir: str = None,
         singleprocess: bool = False,
+        resource_sampling: float = None,
     ):
         """
         Args:
@@ -69,6 +102,8 @@ class Sandbox:
             p2p (int): base P2P port
             num_peers (int): max number of peers
             log_dir (str): optional log directory for node/daemons logs
+            resource_sampling (float): optional interval, in seconds, at
+                which the resources used by nodes and daemons are sampled
 
         Binaries contained in `binaries_path` are supposed to follow the
         naming conventions used in the Tezos codebase. For instance,
@@ -97,6 +132,11 @@ class Sandbox:
         self.counter = 0
         self.logs = []  # type: List[str]
         self.singleprocess = singleprocess
+        # Resources used by nodes and daemons, sampled in the background
+        # if `resource_sampling` is given, exported with the logs
+        self.resources = ResourceSampler(self.daemon_pids)
+        if resource_sampling is not None:
+            self.resources.start(resource_sampling)
 
     def __enter__(self):
         return self
@@ -244,7 +284,7 @@ class Sandbox:
             branch=branch,
             client_factory=client_factory,
         )
-        self.init_client(client, node, config_client)
+        self.init_client(client, node, config_client, branch)
         return client
 
     def register_client(
@@ -278,10 +318,18 @@ class Sandbox:
             node.snapshot_import(snapshot, params)
 
     def init_client(
-        self, client, node: Node = None, config_client: bool = True
+        self,
+        client,
+        node: Node = None,
+        config_client: bool = True,
+        branch: str = "",
     ):
         """Initialize client with bootstrap keys. If node object is provided,
-        check whether the node is running and responsive"""
+        check whether the node is running and responsive
+
+        The identities are imported once per client binary (see `branch`)
+        and set of identities. The wallet files this writes are then
+        copied to the base dir of other clients."""
 
         if node is not None and not client.check_node_listening():
             node_id = node.rpc_port - self.rpc
@@ -291,8 +339,41 @@ class Sandbox:
 
         client.run(['-w', 'none', 'config', 'update'])
         if config_client:
-            for name, iden in self.identities.items():
-                client.import_secret_key(name, iden['secret'])
+            self.init_wallet(client, branch)
+
+    def import_identities(self, client: Client) -> None:
+        """Import the identities of the sandbox in the wallet of client"""
+        for name, iden in self.identities.items():
+            client.import_secret_key(name, iden['secret'])
+
+    def init_wallet(self, client: Client, branch: str = "") -> None:
+        """Initialize the wallet of client with the identities of the
+        sandbox, as `import_identities` does, copying the wallet files of
+        a previous import if possible."""
+        key = (
+            self._wrap_path(CLIENT, branch),
+            tuple(
+                (name, iden['secret']) for name, iden in self.identities.items()
+            ),
+        )
+        template = _WALLET_TEMPLATES.get(key)
+        before = _read_files(client.base_dir)
+        # The output of imports is recorded by regression clients
+        recorded = getattr(client, 'regtest', None) is not None
+        if template is not None and not recorded:
+            if not any(name in before for name in template):
+                _write_files(client.base_dir, template)
+                return
+        self.import_identities(client)
+        if template is None and not recorded:
+            written = {
+                name: file
+                for name, file in _read_files(client.base_dir).items()
+                if before.get(name) != file
+            }
+            # Only the files of an import in a fresh wallet are a template
+            if not any(name in before for name in written):
+                _WALLET_TEMPLATES[key] = written
 
     def add_node(
         self,
@@ -372,7 +453,7 @@ class Sandbox:
             client_factory=client_factory,
         )
 
-        self.init_client(client, node, config_client)
+        self.init_client(client, node, config_client, branch)
 
     def add_baker(
         self,
@@ -588,6 +669,12 @@ class Sandbox:
 
     def cleanup(self):
         """Kill all daemons and cleanup temp dirs."""
+        self.resources.stop()
+        if self.log_dir and self.resources.series:
+            resources_file = f'{self.log_dir}/resources_{self.counter}.json'
+            self.resources.write_json(resources_file)
+            self.logs.append(resources_file)
+            self.counter += 1
         for node in self.nodes.values():
             node.terminate_or_kill()
             node.cleanup()
@@ -600,6 +687,25 @@ class Sandbox:
         for client in self.clients.values():
             client.cleanup()
 
+    def daemon_pids(self) -> Dict[str, int]:
+        """Returns the pids of the running nodes and daemons, by name,
+        e.g. `node0` or `baker-alpha_0`."""
+        pids = {}
+        for (node_id, node) in list(self.nodes.items()):
+            if node.pid is not None:
+                pids[f'node{node_id}'] = node.pid
+        daemons_by_kind = [
+            ('baker', self.bakers),
+            ('endorser', self.endorsers),
+            ('accuser', self.accusers),
+        ]  # type: List[Tuple[str, Mapping[str, Mapping[int, Popen]]]]
+        for (kind, daemons) in daemons_by_kind:
+            for (proto, by_node) in list(daemons.items()):
+                for (node_id, daemon) in list(by_node.items()):
+                    if daemon.returncode is None:
+                        pids[f'{kind}-{proto}_{node_id}'] = daemon.pid
+        return pids
+
     def are_daemons_alive(self) -> bool:
         """Returns True iff all started daemons/nodes are still alive.
 
@@ -655,6 +761,7 @@ class SandboxMultiBranch(Sandbox):
         num_peers: int = 45,
         log_dir: str = None,
         singleprocess: bool = False,
+        resource_sampling: float = None,
     ):
         """Same semantics as Sandbox class, plus a `branch_map` parameter"""
         super().__init__(
@@ -665,6 +772,7 @@ class SandboxMultiBranch(Sandbox):
             num_peers,
             log_dir,
             singleprocess,
+            resource_sampling,
         )
         self._branch_map = branch_map
         for branch in list(branch_map.values()):
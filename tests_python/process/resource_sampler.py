@@ -0,0 +1,168 @@
+"""Sampling of the resources used by processes, read from `/proc`.
+
+A `ResourceSampler` periodically samples, in a background thread, the
+CPU time, resident memory, open file descriptors and disk I/O of a set
+of named processes, e.g. the nodes and daemons of a sandbox. The set is
+given as a function returning the pids of the processes by name, which
+is called at each sampling, so that processes may come and go.
+
+Samples are stored as a time series by name of process. They can be
+exported as JSON, one list per field, and used to check resource
+budgets, e.g.
+
+    assert sandbox.resources.peak('node0', 'rss') < 2 * 1024 ** 3
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+_CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+
+
+class Sample(NamedTuple):
+    """The resources used by a process at some time"""
+
+    # Seconds since the start of the sampler
+    time: float
+    pid: int
+    # User and system CPU time, in seconds
+    cpu: float
+    # Resident set size, in bytes
+    rss: int
+    # Number of open file descriptors
+    fds: int
+    # Bytes read from and written to storage, None if not readable
+    read_bytes: Optional[int]
+    write_bytes: Optional[int]
+
+
+def read_proc(pid: int, timestamp: float = 0.0) -> Optional[Sample]:
+    """The resources used by the process `pid`, or None if it is not
+    running (anymore)"""
+    try:
+        with open(f'/proc/{pid}/stat') as stream:
+            stat = stream.read()
+        fds = len(os.listdir(f'/proc/{pid}/fd'))
+    except OSError:
+        return None
+    # The fields following the command name, which may contain spaces,
+    # starting with the state of the process
+    fields = stat[stat.rfind(')') + 2 :].split()
+    if fields[0] in ('Z', 'X'):
+        return None
+    io_counters = {}  # type: Dict[str, int]
+    try:
+        with open(f'/proc/{pid}/io') as stream:
+            for line in stream:
+                (key, value) = line.split(':')
+                io_counters[key] = int(value)
+    except OSError:
+        pass
+    return Sample(
+        time=timestamp,
+        pid=pid,
+        cpu=(int(fields[11]) + int(fields[12])) / _CLOCK_TICKS,
+        rss=int(fields[21]) * _PAGE_SIZE,
+        fds=fds,
+        read_bytes=io_counters.get('read_bytes'),
+        write_bytes=io_counters.get('write_bytes'),
+    )
+
+
+class ResourceSampler:
+    """Time series of the resources used by named processes"""
+
+    def __init__(self, processes: Callable[[], Dict[str, int]]):
+        """
+        Args:
+            processes: returns the pids of the processes to sample, by
+                name
+        """
+        self._processes = processes
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None  # type: Optional[threading.Thread]
+        self._start_time = time.monotonic()
+        self.interval = None  # type: Optional[float]
+        self.series = {}  # type: Dict[str, List[Sample]]
+
+    def _now(self) -> float:
+        return round(time.monotonic() - self._start_time, 3)
+
+    def sample(self) -> None:
+        """Sample all processes once"""
+        timestamp = self._now()
+        for (name, pid) in self._processes().items():
+            sample = read_proc(pid, timestamp)
+            if sample is not None:
+                with self._lock:
+                    self.series.setdefault(name, []).append(sample)
+
+    def _run(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.sample()
+            except RuntimeError:
+                # The processes changed while being enumerated
+                continue
+
+    def start(self, interval: float) -> None:
+        """Sample all processes every `interval` seconds, until `stop`"""
+        assert interval > 0, 'sampling interval must be positive'
+        assert self._thread is None, 'sampler already started'
+        self.interval = interval
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(interval,), daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def current(self, name: str) -> Sample:
+        """Sample the process `name` now, and return its sample"""
+        pid = self._processes().get(name)
+        assert pid is not None, f'no process {name}'
+        sample = read_proc(pid, self._now())
+        assert sample is not None, f'process {name} is not running'
+        with self._lock:
+            self.series.setdefault(name, []).append(sample)
+        return sample
+
+    def peak(self, name: str, field: str) -> float:
+        """The maximum of `field` over the samples of the process `name`"""
+        assert field in Sample._fields, f'unknown field {field}'
+        with self._lock:
+            values = [
+                getattr(sample, field)
+                for sample in self.series.get(name, [])
+                if getattr(sample, field) is not None
+            ]
+        assert values, f'no sample of {field} for process {name}'
+        return max(values)
+
+    def to_json(self) -> dict:
+        """The time series, as a list of values by field, by process"""
+        with self._lock:
+            return {
+                name: {
+                    field: [getattr(sample, field) for sample in samples]
+                    for field in Sample._fields
+                }
+                for (name, samples) in self.series.items()
+            }
+
+    def write_json(self, path: str) -> None:
+        with open(path, 'w') as stream:
+            json.dump(
+                {'interval': self.interval, 'processes': self.to_json()},
+                stream,
+            )
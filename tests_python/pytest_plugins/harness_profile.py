@@ -0,0 +1,118 @@
+"""Harness profile
+
+Break down the wall-clock time of tests (see `tools.harness_profile`).
+
+With `--harness-profile=REPORT`, the time of each test, including its
+set-up and tear-down, is broken down into the time spent
+
+- spawning processes: `Client.run_generic`, `Codec.run` and
+  `daemons.node._run_and_print`,
+- sleeping: `time.sleep`, which includes the sleeps of `utils.retry`,
+- making RPCs: `Client.rpc`, `Client.rpc_raw` and `utils.rpc`,
+- setting up fixtures,
+
+and the rest. The breakdown of each test is written to the JSON file
+REPORT, by test node id, and the longest tests are printed at the end
+of the session.
+
+The durations of a report can be used to balance the jobs of
+`job_selection`, with `--prev-harness-profile=REPORT`.
+"""
+
+import json
+import time
+from typing import Optional
+
+import pytest
+import _pytest
+
+from client.client import Client
+from codec.codec import Codec
+from daemons import node
+from tools import utils
+from tools.harness_profile import HarnessProfile
+
+# The instrumented call sites: owner, name of the function and category
+CALL_SITES = [
+    (Client, 'run_generic', 'spawn'),
+    (Codec, 'run', 'spawn'),
+    (node, '_run_and_print', 'spawn'),
+    (time, 'sleep', 'sleep'),
+    (Client, 'rpc', 'rpc'),
+    (Client, 'rpc_raw', 'rpc'),
+    (utils, 'rpc', 'rpc'),
+]
+
+_PROFILE: Optional[HarnessProfile] = None
+
+
+def pytest_addoption(parser: _pytest.config.argparsing.Parser) -> None:
+    group = parser.getgroup("harness profile", "Profiling of the harness")
+    group.addoption(
+        "--harness-profile",
+        metavar="REPORT",
+        default=None,
+        help="break down the time of tests into process spawns, sleeps, "
+        "RPCs and fixture set-ups and write it to the JSON file REPORT",
+    )
+
+
+def pytest_configure(config) -> None:
+    global _PROFILE  # pylint: disable=global-statement
+    if config.getoption("--harness-profile") is not None:
+        _PROFILE = HarnessProfile()
+        for (owner, name, category) in CALL_SITES:
+            _PROFILE.instrument(owner, name, category)
+
+
+def pytest_unconfigure(config) -> None:
+    # pylint: disable=unused-argument
+    global _PROFILE  # pylint: disable=global-statement
+    if _PROFILE is not None:
+        _PROFILE.restore()
+        _PROFILE = None
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_logstart(nodeid, location) -> None:
+    # pylint: disable=unused-argument
+    if _PROFILE is not None:
+        _PROFILE.test = nodeid
+
+
+def pytest_runtest_logfinish(nodeid, location) -> None:
+    # pylint: disable=unused-argument
+    if _PROFILE is not None:
+        _PROFILE.test = None
+
+
+def pytest_runtest_logreport(report) -> None:
+    if _PROFILE is not None:
+        _PROFILE.add_duration(report.nodeid, report.duration)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef, request):
+    # pylint: disable=unused-argument
+    if _PROFILE is None:
+        yield
+    else:
+        with _PROFILE.timing('fixture'):
+            yield
+
+
+def pytest_sessionfinish(session) -> None:
+    report = session.config.getoption("--harness-profile")
+    if report is not None and _PROFILE is not None:
+        with open(report, 'w') as stream:
+            json.dump(_PROFILE.tests, stream, indent=2, sort_keys=True)
+
+
+def pytest_terminal_summary(terminalreporter, config) -> None:
+    if _PROFILE is None:
+        return
+    terminalreporter.section("Harness profile, longest tests")
+    for line in _PROFILE.summary():
+        terminalreporter.write_line(line)
+    report = config.getoption("--harness-profile")
+    terminalreporter.write_line(f"Breakdown by test written to {report}")
@@ -5,8 +5,9 @@ Support for load balanced batching of tests.
 
 import os
 import re
+import json
 import argparse
-from typing import Dict, List, Tuple, Any, Callable, Sequence
+from typing import Dict, List, Tuple, Any, Callable, Optional, Sequence
 import xml.etree.ElementTree as ET
 from operator import itemgetter
 from datetime import timedelta
@@ -83,6 +84,51 @@ def read_prev_timings(junit_report_path: str) -> Dict[str, float]:
     return group_prev_timings(tree.getroot())
 
 
+def read_prev_profile_timings(
+    config: _pytest.config.Config, profile_path: str
+) -> Dict[str, float]:
+    """Read the harness profile in `profile_path`, as written by
+    `--harness-profile`, and returns its timings grouped by class name.
+    """
+    with open(profile_path) as stream:
+        profile = json.load(stream)
+
+    timings: Dict[str, float] = {}
+    for (nodeid, breakdown) in profile.items():
+        classname = classname_of_nodeid(config, nodeid)
+        timings[classname] = timings.get(classname, 0.0) + float(
+            breakdown['duration']
+        )
+
+    return timings
+
+
+def read_prev_source_timings(
+    config: _pytest.config.Config,
+    prev_junit_xml: Optional[str],
+    prev_profile: Optional[str],
+) -> Dict[str, float]:
+    """Read the timings grouped by class name of the JUnit XML report
+    `prev_junit_xml` or of the harness profile `prev_profile`, whichever
+    is given, or none if neither is.
+    """
+    if prev_junit_xml is not None:
+        if not os.path.isfile(prev_junit_xml):
+            pytest.exit(
+                f'The file {prev_junit_xml} given to '
+                + '--prev-junit-xml does not exist'
+            )
+        return read_prev_timings(prev_junit_xml)
+    if prev_profile is not None:
+        if not os.path.isfile(prev_profile):
+            pytest.exit(
+                f'The file {prev_profile} given to '
+                + '--prev-harness-profile does not exist'
+            )
+        return read_prev_profile_timings(config, prev_profile)
+    return {}
+
+
 def knapsack(items: List[Tuple[Any, float]], bag_count: int) -> List[Bag]:
     """A greedy solution to the knapsack problem.
 
@@ -149,6 +195,12 @@ def pytest_addoption(parser: _pytest.config.argparsing.Parser) -> None:
         action="store",
         help="previous timings in JUnit XML report used for balancing",
     )
+    group.addoption(
+        "--prev-harness-profile",
+        action="store",
+        help="previous timings in harness profile (see --harness-profile) "
+        + "used for balancing, instead of --prev-junit-xml",
+    )
     group.addoption(
         "--jobs-dry-run",
         action='store_true',
@@ -359,11 +411,23 @@ def pytest_collection_modifyitems(
 ) -> None:
     job_config = config.getoption('--job')
     prev_junit_xml = config.getoption('--prev-junit-xml')
+    prev_profile = config.getoption('--prev-harness-profile')
     dry_run = config.getoption('--jobs-dry-run')
 
     if prev_junit_xml is not None and job_config is None:
         pytest.exit('Cannot give the `--prev-junit-xml` flag without `--job`')
 
+    if prev_profile is not None and job_config is None:
+        pytest.exit(
+            'Cannot give the `--prev-harness-profile` flag without `--job`'
+        )
+
+    if prev_profile is not None and prev_junit_xml is not None:
+        pytest.exit(
+            'Cannot give both the `--prev-junit-xml` and '
+            + '`--prev-harness-profile` flags'
+        )
+
     if dry_run and job_config is None:
         pytest.exit('Cannot give the `--jobs-dry-run` flag without `--jobs`')
 
@@ -382,20 +446,13 @@ def pytest_collection_modifyitems(
             'Job index out of bounds ' + f'(--job-config {job_config.group(0)})'
         )
 
-    if prev_junit_xml is not None:
-        if not os.path.isfile(prev_junit_xml):
-            pytest.exit(
-                f'The file {prev_junit_xml} given to '
-                + '--prev-junit-xml does not exist'
-            )
-        else:
-            prev_timings = read_prev_timings(prev_junit_xml)
-    else:
-        prev_timings = {}
-
+    prev_timings = read_prev_source_timings(
+        config, prev_junit_xml, prev_profile
+    )
+    prev_source = prev_junit_xml if prev_profile is None else prev_profile
     print(
         f"(job selection: {job_current+1}/{jobs_total} with"
-        + f" {len(prev_timings)} timings from {prev_junit_xml})"
+        + f" {len(prev_timings)} timings from {prev_source})"
     )
 
     job_selection(config, items, prev_timings, jobs_total, job_current, dry_run)
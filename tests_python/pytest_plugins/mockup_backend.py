@@ -0,0 +1,110 @@
+"""Mockup backend
+
+Run node-less test classes against a mockup instead of a node.
+
+Many test classes only use their `client` to typecheck or run scripts,
+hash data or expand macros, which requires no node. The `client` and
+`client_regtest_bis` fixtures of the protocol directories give the test
+classes marked with `mockup_backend` a client in mockup mode, whose base
+dir is created once per session by the `mockup_base_dir` fixture of the
+protocol directory, instead of a client of a freshly started node.
+
+The mockup is created with the chain id of the sandboxed nodes and
+with the limits and costs of their protocol parameters, so that CHAIN_ID
+and gas consumption are the same with both backends. The state of its
+chain is not that of a sandboxed node, though: e.g. its head is forged at
+level 0, whereas a node is at level 1 once the protocol is activated,
+and its bootstrap accounts are those of the mockup, not of the sandbox.
+Tests whose outputs may depend on that state, e.g. through LEVEL,
+BALANCE or VOTING_POWER, are kept out of marked classes (see
+`TestContractOpcodesChainState`).
+
+Regression outputs are recorded against a node. A class is only marked
+once it passed, regression outputs included, both when run as marked and
+when run with `--no-mockup-backend`, which runs marked classes against a
+node. Only classes that compare the client with itself and have no
+regression outputs, e.g. `TestMicheline`, are marked for now.
+
+Tests of marked classes must not change the state of the chain: the
+mockup is shared by all of them.
+"""
+
+import json
+import os
+import tempfile
+from typing import Any, Callable, Mapping
+
+import _pytest.config.argparsing
+
+from launchers.sandbox import CLIENT, CLIENT_ADMIN, Sandbox
+from client.client import Client
+from client.client_output import CreateMockupResult
+from tools import paths
+
+MARKER = 'mockup_backend'
+
+# The chain id of sandboxed nodes, i.e. of the default genesis block
+SANDBOX_CHAIN_ID = 'NetXdQprcVkpaWU'
+
+# Protocol parameters the interpretation of scripts depends on
+MOCKUP_CONSTANTS = [
+    'hard_gas_limit_per_operation',
+    'hard_gas_limit_per_block',
+    'hard_storage_limit_per_operation',
+    'cost_per_byte',
+    'origination_size',
+]
+
+
+def pytest_addoption(parser: _pytest.config.argparsing.Parser) -> None:
+    parser.addoption(
+        "--no-mockup-backend",
+        action='store_true',
+        default=False,
+        help="run test classes marked with mockup_backend against a node",
+    )
+
+
+def selected(request) -> bool:
+    """Whether the mockup backend is used for the requesting test class"""
+    return request.node.get_closest_marker(
+        MARKER
+    ) is not None and not request.config.getoption("--no-mockup-backend")
+
+
+def create_mockup(
+    base_dir: str, protocol: str, parameters: Mapping[str, Any]
+) -> None:
+    """Create a mockup of `protocol` in `base_dir`, with the chain id of
+    sandboxed nodes and the limits and costs of `parameters`."""
+    client = Client(
+        os.path.join(paths.TEZOS_HOME, CLIENT),
+        os.path.join(paths.TEZOS_HOME, CLIENT_ADMIN),
+        base_dir=base_dir,
+        endpoint=None,
+    )
+    constants = {
+        key: parameters[key] for key in MOCKUP_CONSTANTS if key in parameters
+    }
+    constants['chain_id'] = SANDBOX_CHAIN_ID
+    with tempfile.NamedTemporaryFile(
+        prefix='tezos-custom-constants', mode='w+t'
+    ) as json_file:
+        json.dump(constants, json_file)
+        json_file.flush()
+        res = client.create_mockup(
+            protocol=protocol, protocol_constants_file=json_file.name
+        ).create_mockup_result
+    assert res == CreateMockupResult.OK, f'cannot create mockup of {protocol}'
+
+
+def client(
+    sandbox: Sandbox, request, client_factory: Callable = Client
+) -> Client:
+    """A client of the session's mockup of the protocol of the requesting
+    test class"""
+    base_dir = request.getfixturevalue('mockup_base_dir')
+    assert os.path.isdir(base_dir)
+    return sandbox.create_client(
+        base_dir=base_dir, mode='mockup', client_factory=client_factory
+    )
@@ -0,0 +1,98 @@
+"""Regression store
+
+Check the output recorded by the `regtest` fixture against a compressed,
+deduplicated store (see `tools.regression_store`) instead of the
+`_regtest_outputs` directories of pytest-regtest.
+
+With `--regtest-store`, the output of each regression test, after the
+registered conversions, is compared with the `_regtest_store` shared by
+the test directories, ignoring trailing whitespaces unless
+`--regtest-regard-line-endings` is passed, as pytest-regtest does. With
+`--regtest-reset` in addition, only the outputs that changed are written
+to the store, whose index is then written once, at the end of the
+session.
+"""
+
+from typing import Dict, Optional
+
+import pytest
+import _pytest
+
+from tools.regression_store import (
+    OUTPUT_EXT,
+    RegressionStore,
+    key_of_output,
+    store_dir_of_test_dir,
+)
+
+# Stores of the test directories, by directory, loaded on demand
+_STORES: Dict[str, RegressionStore] = {}
+
+
+def pytest_addoption(parser: _pytest.config.argparsing.Parser) -> None:
+    group = parser.getgroup(
+        "regtest store", "Compressed storage of regression outputs"
+    )
+    group.addoption(
+        "--regtest-store",
+        action='store_true',
+        default=False,
+        help="check regression outputs against the _regtest_store "
+        "of test directories",
+    )
+
+
+def store_of_test_dir(test_dir: str) -> RegressionStore:
+    store_dir = store_dir_of_test_dir(test_dir)
+    if store_dir not in _STORES:
+        _STORES[store_dir] = RegressionStore(store_dir)
+    return _STORES[store_dir]
+
+
+def regtest_key(regtest) -> str:
+    """The key of a regtest fixture: its directory and pytest-regtest
+    output file name, without extension"""
+    return key_of_output(
+        regtest.test_folder, regtest.output_file_name[: -len(OUTPUT_EXT)]
+    )
+
+
+@pytest.hookimpl(hookwrapper=True, tryfirst=True)
+def pytest_runtest_makereport(item, call):
+    regtest = None
+    if item.config.getoption("--regtest-store") and call.when == "call":
+        # Hide the fixture from pytest-regtest, whose hook is run
+        # within this one, so that it does not check it
+        regtest = getattr(item, "funcargs", {}).pop("regtest", None)
+
+    outcome = yield
+    if regtest is None:
+        return
+    report = outcome.get_result()
+    if not report.passed:
+        return
+
+    store = store_of_test_dir(regtest.test_folder)
+    key = regtest_key(regtest)
+    current = regtest.current
+    if item.config.getoption("--regtest-reset"):
+        store.put(key, current)
+        return
+
+    ignore_line_endings = not item.config.getoption(
+        "--regtest-regard-line-endings"
+    )
+    diff: Optional[list] = store.diff(key, current, ignore_line_endings)
+    if diff is not None:
+        xfail = item.get_closest_marker("xfail") is not None
+        report.outcome = "skipped" if xfail else "failed"
+        report.longrepr = "\n".join(
+            [f"regression test output differences for {item.nodeid}:", ""]
+            + diff
+        )
+
+
+def pytest_sessionfinish(session) -> None:
+    # pylint: disable=unused-argument
+    for store in _STORES.values():
+        store.save()
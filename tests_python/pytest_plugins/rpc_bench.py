@@ -0,0 +1,124 @@
+"""RPC benchmark
+
+Benchmark the latency of the RPCs made by the test classes marked with
+`rpc_bench` (see `tools.rpc_bench`).
+
+With `--rpc-bench=REPORT`, the RPCs made through `Client.rpc` by each
+test of a marked class, e.g. `TestRPCsExistence`, are recorded. Once the
+test has passed, each of its RPCs is run again `--rpc-bench-repeat`
+times, by `--rpc-bench-concurrency` at a time, on the same chain: over
+HTTP against the node of the client if it is in client mode, and with
+the same client otherwise, e.g. in proxy mode. The latency percentiles
+and response size of each RPC are written to the JSON file REPORT, to be
+compared with the report of other binaries with
+`scripts/compare_rpc_bench.py`.
+"""
+
+from typing import Optional
+
+import pytest
+import _pytest
+
+from client.client import Client
+from tools.rpc_bench import RpcBenchmark
+
+MARKER = 'rpc_bench'
+
+_BENCHMARK: Optional[RpcBenchmark] = None
+
+
+def pytest_addoption(parser: _pytest.config.argparsing.Parser) -> None:
+    group = parser.getgroup("rpc bench", "Benchmark of RPC latencies")
+    group.addoption(
+        "--rpc-bench",
+        metavar="REPORT",
+        default=None,
+        help="benchmark the RPCs of the test classes marked with rpc_bench "
+        "and write their latencies to the JSON file REPORT",
+    )
+    group.addoption(
+        "--rpc-bench-repeat",
+        type=int,
+        default=20,
+        help="number of runs of each RPC, default=20",
+    )
+    group.addoption(
+        "--rpc-bench-concurrency",
+        type=int,
+        default=4,
+        help="number of concurrent runs of each RPC, default=4",
+    )
+
+
+def pytest_configure(config) -> None:
+    global _BENCHMARK  # pylint: disable=global-statement
+    if config.getoption("--rpc-bench") is not None:
+        _BENCHMARK = RpcBenchmark(
+            config.getoption("--rpc-bench-repeat"),
+            config.getoption("--rpc-bench-concurrency"),
+        )
+
+
+def pytest_unconfigure(config) -> None:
+    # pylint: disable=unused-argument
+    global _BENCHMARK  # pylint: disable=global-statement
+    _BENCHMARK = None
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    benchmark = _BENCHMARK
+    if benchmark is None or item.get_closest_marker(MARKER) is None:
+        yield
+        return
+    rpc = Client.rpc
+    # Bound here, as mypy does not narrow `benchmark` in the closure
+    record = benchmark.record
+
+    def recording_rpc(client, verb, path, data=None, params=None):
+        result = rpc(client, verb, path, data, params)
+        if not params:
+            record(client, verb, path, data, item.nodeid)
+        return result
+
+    Client.rpc = recording_rpc  # type: ignore
+    try:
+        outcome = yield
+    finally:
+        Client.rpc = rpc  # type: ignore
+    calls = benchmark.take_calls()
+    if outcome.excinfo is None:
+        for call in calls:
+            benchmark.bench(call)
+
+
+def pytest_sessionfinish(session) -> None:
+    report = session.config.getoption("--rpc-bench")
+    if report is not None and _BENCHMARK is not None:
+        _BENCHMARK.write_json(report)
+
+
+def pytest_terminal_summary(terminalreporter, config) -> None:
+    if _BENCHMARK is None:
+        return
+    rows = _BENCHMARK.rows()
+    terminalreporter.section("RPC latencies, slowest p95")
+    terminalreporter.write_line(
+        f"{'mode':<8} {'path':<60} {'p50':>8} {'p95':>8} {'p99':>8}"
+    )
+    ranked = sorted(
+        (row for row in rows if row['p95'] is not None),
+        key=lambda row: row['p95'],
+        reverse=True,
+    )
+    for row in ranked[:20]:
+        terminalreporter.write_line(
+            f"{row['mode']:<8} {row['path'][:60]:<60} "
+            + ' '.join(
+                f"{row[pct] * 1000:>6.1f}ms" for pct in ['p50', 'p95', 'p99']
+            )
+        )
+    report = config.getoption("--rpc-bench")
+    terminalreporter.write_line(
+        f"Latencies of {len(rows)} RPCs written to {report}"
+    )
@@ -0,0 +1,73 @@
+"""RPC trace
+
+Profile the RPCs made by the client commands of a test session (see
+`tools.rpc_trace`).
+
+With `--rpc-trace=REPORT`, the commands of all clients, but not of
+admin clients, are run with `-l`. The RPCs they make are aggregated by
+test, client mode, command and RPC path into the CSV file REPORT. A
+summary by client mode and command, sorted by `--rpc-trace-sort`, is
+printed at the end of the session, so as to spot the commands making
+many or redundant RPCs.
+
+The traces are removed from the standard error of the commands, so
+that tests see the same outputs with and without tracing.
+"""
+
+import pytest
+import _pytest
+
+from client.client import Client
+from tools.rpc_trace import SORT_KEYS, RpcRecorder
+
+
+def pytest_addoption(parser: _pytest.config.argparsing.Parser) -> None:
+    group = parser.getgroup("rpc trace", "Profiling of client RPCs")
+    group.addoption(
+        "--rpc-trace",
+        metavar="REPORT",
+        default=None,
+        help="trace the RPCs of client commands and write their "
+        "statistics to the CSV file REPORT",
+    )
+    group.addoption(
+        "--rpc-trace-sort",
+        choices=SORT_KEYS,
+        default='rpcs',
+        help="column by which the summary of RPCs is sorted, default=rpcs",
+    )
+
+
+def pytest_configure(config) -> None:
+    if config.getoption("--rpc-trace") is not None:
+        Client.rpc_recorder = RpcRecorder()
+
+
+def pytest_unconfigure(config) -> None:
+    # pylint: disable=unused-argument
+    Client.rpc_recorder = None
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_logstart(nodeid, location) -> None:
+    # pylint: disable=unused-argument
+    if Client.rpc_recorder is not None:
+        Client.rpc_recorder.test = nodeid
+
+
+def pytest_sessionfinish(session) -> None:
+    report = session.config.getoption("--rpc-trace")
+    if report is not None and Client.rpc_recorder is not None:
+        Client.rpc_recorder.write_csv(report)
+
+
+def pytest_terminal_summary(terminalreporter, config) -> None:
+    recorder = Client.rpc_recorder
+    if recorder is None:
+        return
+    sort = config.getoption("--rpc-trace-sort")
+    terminalreporter.section(f"RPCs of client commands, by {sort}")
+    for line in recorder.summary(sort):
+        terminalreporter.write_line(line)
+    report = config.getoption("--rpc-trace")
+    terminalreporter.write_line(f"Statistics by test written to {report}")
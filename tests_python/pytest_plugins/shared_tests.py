@@ -0,0 +1,158 @@
+"""Shared tests
+
+Support for test modules shared by several protocol directories.
+
+Test modules that are identical in several `tests_<protocol>`
+directories are kept once in `tests_common`. Each protocol directory
+running such a module contains a stub of the same name, whose first line
+points to the shared module:
+
+    # shared-test-module: test_multisig.py
+
+The stub is collected as the shared module, imported as a submodule of
+the protocol package, so that its relative imports (e.g. `from . import
+protocol`) resolve to the protocol directory. Node ids, fixtures and
+regression outputs are those of the stub, hence the same as for a copy
+of the shared module in the protocol directory.
+
+The shared module is parsed and its assertions are rewritten once, and
+the rewritten code is cached in a single pyc for all protocols.
+"""
+
+import ast
+import functools
+import importlib.util
+import os
+import sys
+import traceback
+from types import ModuleType
+from typing import Dict, Optional
+
+import pytest
+from _pytest.assertion.rewrite import AssertionRewritingHook
+
+from tools import paths
+
+SHARED_TESTS_DIR = os.path.join(
+    paths.TEZOS_HOME, 'tests_python', 'tests_common'
+)
+
+STUB_MARKER = '# shared-test-module: '
+
+# Stubs are tiny, hence only their beginning is read
+STUB_MAX_SIZE = 1024
+
+
+def shared_module_of_stub(path: str) -> Optional[str]:
+    """The path of the shared module of `path`, if it is a stub"""
+    if os.path.getsize(path) > STUB_MAX_SIZE:
+        return None
+    with open(path, encoding='utf-8') as stub:
+        first_line = stub.readline()
+    if not first_line.startswith(STUB_MARKER):
+        return None
+    shared_name = first_line[len(STUB_MARKER) :].strip()
+    return os.path.join(SHARED_TESTS_DIR, shared_name)
+
+
+@functools.lru_cache(maxsize=None)
+def class_first_lines(shared_path: str) -> Dict[str, int]:
+    """The first line (0-based, decorators included) of the top-level
+    classes of the module at `shared_path`, as `inspect.findsource`
+    computes them"""
+    with open(shared_path, encoding='utf-8') as stream:
+        tree = ast.parse(stream.read(), shared_path)
+    first_lines = {}
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            first = node.decorator_list[0] if node.decorator_list else node
+            first_lines[node.name] = first.lineno - 1
+    return first_lines
+
+
+def import_shared_module(shared_path: str, name: str) -> ModuleType:
+    """Import the module at `shared_path` under the qualified `name`."""
+    if name in sys.modules:
+        return sys.modules[name]
+    # Use pytest's assertion rewriting loader, if enabled
+    loader = next(
+        (
+            finder
+            for finder in sys.meta_path
+            if isinstance(finder, AssertionRewritingHook)
+        ),
+        None,
+    )
+    spec = importlib.util.spec_from_file_location(
+        name, shared_path, loader=loader
+    )
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)  # type: ignore
+    except BaseException:
+        del sys.modules[name]
+        raise
+    # pytest locates test classes with `inspect.findsource`, which parses
+    # the whole module for each class. Instead, the classes of shared
+    # modules are located once for all protocols, and their location is
+    # given through the attribute pytest reads for nose compatibility.
+    # `compat_co_firstlineno` is a pytest internal, read by
+    # `PyobjMixin.reportinfo` in the pinned pytest 6.2.5.
+    for (class_name, first_line) in class_first_lines(shared_path).items():
+        cls = module.__dict__.get(class_name)
+        if isinstance(cls, type) and cls.__module__ == name:
+            setattr(cls, 'compat_co_firstlineno', first_line)
+    return module
+
+
+class SharedModuleError(pytest.File):
+    """A stub whose shared module cannot be imported, reported as a
+    collection error of the stub"""
+
+    error = ''
+
+    def collect(self):
+        raise self.CollectError(self.error)
+
+
+def pytest_ignore_collect(path) -> Optional[bool]:
+    # Shared modules are only collected through their stubs
+    if str(path) == SHARED_TESTS_DIR:
+        return True
+    return None
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pycollect_makemodule(path, parent) -> Optional[pytest.File]:
+    """Collects a stub as its shared module, imported under the name of
+    the stub and given to pytest as the object of the collected module"""
+    stub = str(path)
+    package_dir = os.path.dirname(stub)
+    if not os.path.isfile(os.path.join(package_dir, 'protocol.py')):
+        return None
+    shared_path = shared_module_of_stub(stub)
+    if shared_path is None:
+        return None
+    assert os.path.isfile(
+        shared_path
+    ), f'{stub}: shared test module {shared_path} does not exist'
+    package = os.path.basename(package_dir)
+    name = os.path.splitext(os.path.basename(stub))[0]
+    # The protocol package is imported first, as for any test module
+    importlib.import_module(package)
+    try:
+        obj = import_shared_module(shared_path, f'{package}.{name}')
+    except Exception:  # pylint: disable=broad-except
+        # Reported when the stub is collected, not by its directory
+        error = SharedModuleError.from_parent(parent, fspath=path)
+        error.error = (
+            f'error while importing shared test module {shared_path}:\n'
+            + traceback.format_exc()
+        )
+        return error
+    parent.config.pluginmanager.consider_module(obj)
+    module = pytest.Module.from_parent(parent, fspath=path)
+    module.obj = obj
+    return module
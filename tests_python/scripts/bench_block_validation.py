@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Benchmark how fast a node validates and applies blocks of K operations,
+over a sweep of K and of kinds of operations, and write the results to
+a JSON report.
+
+The sandbox runs two nodes. For each kind of operation and each K, K
+funded and revealed accounts each inject an operation in the mempool of
+node 0, node 0 bakes a block of them, and node 1 validates it as
+received from its peer. The time of validation and application of the
+block by each node is read from its logs, where the block validator
+reports it at the debug level. Node 0 validates the block it has just
+preapplied to bake it, and may reuse the result of the preapplication,
+so the figure of interest is the validation time of node 1. The time of
+the preapplication by node 0, the duration of the `bake for` command and
+the time until node 1 reports the block as its head are reported too.
+
+Kinds of operations:
+- transfer: a transfer between implicit accounts,
+- call: a call to the identity contract `attic/id.tz`.
+
+Run from the tests_python directory:
+
+    poetry run python -m scripts.bench_block_validation \
+        --operations 1,10,100 --kinds transfer,call --rounds 3 \
+        --report validation.json
+"""
+import argparse
+import concurrent.futures
+import functools
+import json
+import os
+import re
+import statistics
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from client.client import Client
+from launchers.sandbox import Sandbox
+from tools import constants, paths, utils
+from tests_alpha import contract_paths, protocol
+
+KINDS = ['transfer', 'call']
+
+# The block validator reports validation times at the debug level
+NODE_LOG_LEVELS = {
+    'external_block_validator': 'debug',
+    'sequential_block_validator': 'debug',
+}
+
+# Events of the block validator, in the external validator process and in
+# the node (with --singleprocess). Block hashes may be shortened.
+_VALIDATION_RES = [
+    re.compile(r'completion of block validation (\w+) for chain \w+ in (\S+)'),
+    re.compile(r'block (\w+) successfully validated in (\S+)'),
+]
+_PREAPPLY_RE = re.compile(
+    r'completion of preapply block ontop of (\w+) for chain \w+ in (\S+)'
+)
+
+# The units of the durations printed by the node, in seconds
+_SPAN_UNITS = {
+    'd': 86400.0,
+    'h': 3600.0,
+    'min': 60.0,
+    's': 1.0,
+    'ms': 1e-3,
+    'us': 1e-6,
+    'μs': 1e-6,
+    'ns': 1e-9,
+}
+_SPAN_RE = re.compile(r'(\d+(?:\.\d+)?)(min|ms|us|μs|ns|d|h|s)')
+
+CONTRACT = 'bench_id'
+
+# Seconds to wait for operations to reach the mempool and for blocks to
+# reach node 1
+TIMEOUT = 60
+
+
+def parse_span(span: str) -> float:
+    """The duration printed by the node as `span`, e.g. `1min2.5s` or
+    `12.3ms`, in seconds"""
+    parts = _SPAN_RE.findall(span)
+    assert parts, f'cannot parse duration {span}'
+    return sum(float(value) * _SPAN_UNITS[unit] for (value, unit) in parts)
+
+
+def read_node_log(log_file: str) -> Dict[str, Dict[str, float]]:
+    """The validation times of blocks and the preapplication times of
+    blocks on top of their predecessors, by (maybe shortened) block hash,
+    reported in the log of a node"""
+    times: Dict[str, Dict[str, float]] = {'validate': {}, 'preapply': {}}
+    with open(log_file, errors='replace') as stream:
+        for line in stream:
+            match = _PREAPPLY_RE.search(line)
+            if match is not None:
+                times['preapply'][match.group(1)] = parse_span(match.group(2))
+                continue
+            for regex in _VALIDATION_RES:
+                match = regex.search(line)
+                if match is not None:
+                    seconds = parse_span(match.group(2))
+                    times['validate'][match.group(1)] = seconds
+    return times
+
+
+def lookup(times: Dict[str, float], block_hash: str) -> Optional[float]:
+    """The time of `block_hash` in `times`, whose keys may be shortened
+    block hashes"""
+    for (key, seconds) in times.items():
+        if block_hash.startswith(key):
+            return seconds
+    return None
+
+
+def summary(values: List[float]) -> Optional[Dict[str, float]]:
+    if not values:
+        return None
+    return {
+        'mean': round(statistics.mean(values), 6),
+        'median': round(statistics.median(values), 6),
+        'min': round(min(values), 6),
+        'max': round(max(values), 6),
+    }
+
+
+def run_concurrently(commands, concurrency: int) -> None:
+    with concurrent.futures.ThreadPoolExecutor(concurrency) as executor:
+        for future in [executor.submit(command) for command in commands]:
+            future.result()
+
+
+def setup_accounts(
+    client: Client, num_accounts: int, concurrency: int
+) -> List[str]:
+    """Generate, fund and reveal `num_accounts` accounts"""
+    accounts = [f'bench{i}' for i in range(num_accounts)]
+    for account in accounts:
+        client.gen_key(account)
+    # Fund the accounts by batches, each in an operation of bootstrap1
+    for start in range(0, num_accounts, 50):
+        json_ops = json.dumps(
+            [
+                {
+                    'destination': client.show_address(account).hash,
+                    'amount': '1000',
+                }
+                for account in accounts[start : start + 50]
+            ]
+        )
+        client.run(
+            client.cmd_batch('bootstrap1', json_ops) + ['--burn-cap', '10']
+        )
+        utils.bake(client)
+    reveals = [
+        functools.partial(client.reveal, account) for account in accounts
+    ]
+    run_concurrently(reveals, concurrency)
+    utils.bake(client)
+    return accounts
+
+
+def inject(
+    client: Client, kind: str, accounts: List[str], concurrency: int
+) -> None:
+    """Inject an operation of `kind` from each of `accounts`, and wait for
+    all of them to be applied in the mempool"""
+    if kind == 'transfer':
+        params = ['transfer', '1', 'to', 'bootstrap1']
+    else:
+        params = ['transfer', '0', 'to', CONTRACT, '--arg', '"bench"']
+
+    def command(account: str):
+        return lambda: client.run(
+            params[:2] + ['from', account] + params[2:] + ['--burn-cap', '1']
+        )
+
+    run_concurrently([command(account) for account in accounts], concurrency)
+    deadline = time.monotonic() + TIMEOUT
+    while len(client.get_mempool()['applied']) < len(accounts):
+        assert time.monotonic() < deadline, 'operations not in mempool'
+        time.sleep(0.1)
+
+
+def bench_round(
+    sandbox: Sandbox, kind: str, accounts: List[str], concurrency: int
+) -> dict:
+    """Bake a block of an operation of `kind` from each of `accounts` on
+    node 0, and wait for node 1 to have it as head"""
+    client = sandbox.client(0)
+    inject(client, kind, accounts, concurrency)
+    start = time.perf_counter()
+    utils.bake(client)
+    bake_time = time.perf_counter() - start
+    block = client.rpc('get', '/chains/main/blocks/head/header')
+    operations = client.rpc('get', '/chains/main/blocks/head/operations')
+    deadline = time.monotonic() + TIMEOUT
+    while sandbox.client(1).get_level() < block['level']:
+        assert time.monotonic() < deadline, 'block not received by node 1'
+        time.sleep(0.01)
+    return {
+        'block': block['hash'],
+        'predecessor': block['predecessor'],
+        'included': len(operations[3]),
+        'bake': bake_time,
+        'propagation': time.perf_counter() - start - bake_time,
+    }
+
+
+def bench(
+    sandbox: Sandbox,
+    kinds: List[str],
+    sweep: List[int],
+    rounds: int,
+    concurrency: int,
+) -> List[dict]:
+    """Run all rounds of the benchmark, and return their results by kind
+    and number of operations"""
+    client = sandbox.client(0)
+    accounts = setup_accounts(client, max(sweep), concurrency)
+    if 'call' in kinds:
+        contract = os.path.join(contract_paths.CONTRACT_PATH, 'attic', 'id.tz')
+        client.originate(
+            CONTRACT,
+            0,
+            'bootstrap1',
+            contract,
+            ['--init', '"tezos"', '--burn-cap', '10'],
+        )
+        utils.bake(client)
+    results = []
+    for kind in kinds:
+        for num_operations in sweep:
+            runs = [
+                bench_round(
+                    sandbox, kind, accounts[:num_operations], concurrency
+                )
+                for _ in range(rounds)
+            ]
+            results.append(
+                {'kind': kind, 'operations': num_operations, 'runs': runs}
+            )
+    return results
+
+
+def add_log_times(results: List[dict], log_files: List[str]) -> None:
+    """Add the times of the nodes, read from their logs, to `results`"""
+    (baker_times, validator_times) = [read_node_log(log) for log in log_files]
+    for result in results:
+        for run in result['runs']:
+            run['preapply'] = lookup(
+                baker_times['preapply'], run['predecessor']
+            )
+            run['validate_baker'] = lookup(
+                baker_times['validate'], run['block']
+            )
+            run['validate'] = lookup(validator_times['validate'], run['block'])
+        for key in [
+            'validate',
+            'validate_baker',
+            'preapply',
+            'bake',
+            'propagation',
+        ]:
+            result[key] = summary(
+                [run[key] for run in result['runs'] if run[key] is not None]
+            )
+
+
+def scenario(args, log_dir: str) -> dict:
+    with Sandbox(
+        paths.TEZOS_HOME,
+        constants.IDENTITIES,
+        log_dir=log_dir,
+        singleprocess=args.singleprocess,
+    ) as sandbox:
+        for node_id in [0, 1]:
+            sandbox.add_node(
+                node_id,
+                params=constants.NODE_PARAMS,
+                log_levels=NODE_LOG_LEVELS,
+            )
+        parameters = protocol.get_parameters()
+        parameters['consensus_threshold'] = 0
+        protocol.activate(
+            sandbox.client(0),
+            parameters=parameters,
+            activate_in_the_past=True,
+        )
+        utils.bake(sandbox.client(0))
+        results = bench(
+            sandbox,
+            args.kinds,
+            args.operations,
+            args.rounds,
+            args.concurrency,
+        )
+        log_files = [sandbox.node(node_id).log_file for node_id in [0, 1]]
+        version = sandbox.client(0).run(['--version']).strip()
+    # The logs are complete once the nodes are terminated
+    add_log_times(results, log_files)
+    return {
+        'version': version,
+        'singleprocess': args.singleprocess,
+        'rounds': args.rounds,
+        'results': results,
+    }
+
+
+def comma_separated(convert):
+    return lambda arg: [convert(value) for value in arg.split(',')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument(
+        '--operations',
+        type=comma_separated(int),
+        default=[1, 10, 100],
+        help='comma-separated numbers of operations per block, '
+        'default=1,10,100',
+    )
+    parser.add_argument(
+        '--kinds',
+        type=comma_separated(str),
+        default=KINDS,
+        help=f'comma-separated kinds of operations among {",".join(KINDS)}, '
+        f'default={",".join(KINDS)}',
+    )
+    parser.add_argument(
+        '--rounds',
+        type=int,
+        default=3,
+        help='number of blocks per kind and number of operations, default=3',
+    )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=8,
+        help='number of operations injected concurrently, default=8',
+    )
+    parser.add_argument(
+        '--singleprocess',
+        action='store_true',
+        help='validate blocks in the node process rather than in an '
+        'external validator process',
+    )
+    parser.add_argument(
+        '--log-dir',
+        help='directory of the logs of the nodes, default=a temporary one',
+    )
+    parser.add_argument(
+        '--report',
+        default='block_validation.json',
+        help='JSON report, default=block_validation.json',
+    )
+    args = parser.parse_args()
+    for kind in args.kinds:
+        assert kind in KINDS, f'unknown kind of operation {kind}'
+    if args.log_dir is None:
+        with tempfile.TemporaryDirectory(prefix='tezos-bench-') as log_dir:
+            report = scenario(args, log_dir)
+    else:
+        assert os.path.isdir(args.log_dir), f'{args.log_dir} is not a dir'
+        report = scenario(args, args.log_dir)
+    with open(args.report, 'w') as stream:
+        json.dump(report, stream, indent=2)
+    for result in report['results']:
+        validate = result['validate']
+        median = 'n/a' if validate is None else f"{validate['median']:.4f}s"
+        print(
+            f"{result['kind']:<10} {result['operations']:>6} operations: "
+            f"validation {median} (median)"
+        )
+    print(f'Report written to {args.report}')
+
+
+if __name__ == "__main__":
+    main()
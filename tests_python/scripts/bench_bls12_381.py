@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark the scalar multiplications of tools.bls12_381 against the
+plain double-and-add of py_ecc, and check that both agree.
+
+Run from the tests_python directory:
+
+    poetry run python -m scripts.bench_bls12_381 --iterations 20
+"""
+import argparse
+import random
+import time
+from typing import Callable, List
+
+from py_ecc import optimized_bls12_381 as bls12_381
+
+from tools.bls12_381 import G1, G2, Fr
+
+
+def timed(func: Callable[[], List]) -> tuple:
+    start = time.perf_counter()
+    res = func()
+    return res, time.perf_counter() - start
+
+
+def bench_group(group, scalars: List[int]) -> None:
+    # Build the generator table outside of the timed section, as it is
+    # computed once per session.
+    group.mul_generator(1)
+    point = group.mul_generator(scalars[0])
+    cases = [
+        (
+            'fixed-base',
+            lambda: [bls12_381.multiply(group.one, n) for n in scalars],
+            lambda: [group.mul_generator(n) for n in scalars],
+        ),
+        (
+            'wNAF',
+            lambda: [bls12_381.multiply(point, n) for n in scalars],
+            lambda: [group.mul(point, n) for n in scalars],
+        ),
+    ]
+    for name, baseline, optimized in cases:
+        expected, baseline_time = timed(baseline)
+        actual, optimized_time = timed(optimized)
+        assert group.to_hex_many(expected) == group.to_hex_many(
+            actual
+        ), f'{group.name} {name}: results differ from py_ecc'
+        print(
+            f'{group.name} {name:<10} '
+            f'py_ecc: {baseline_time:8.3f}s  '
+            f'tools: {optimized_time:8.3f}s  '
+            f'speedup: {baseline_time / optimized_time:6.2f}x'
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--iterations',
+        type=int,
+        default=10,
+        help='number of random scalars per group, default=10',
+    )
+    parser.add_argument(
+        '--seed', type=int, default=0, help='random seed, default=0'
+    )
+    args = parser.parse_args()
+    gen = random.Random(args.seed)
+    scalars = [Fr.random(gen) for _ in range(args.iterations)]
+    for group in [G1, G2]:
+        bench_group(group, scalars)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark the collection of the test suite with shared test modules
+(see pytest_plugins/shared_tests.py) against the same suite where each
+stub is replaced by a copy of its shared module, as before modules were
+shared, and check that both layouts collect the same tests.
+
+The copies are written in place of the stubs for the duration of the
+benchmark, and the stubs are restored afterwards.
+
+Run from the tests_python directory:
+
+    poetry run python -m scripts.bench_collection --runs 3 --cold
+"""
+import argparse
+import contextlib
+import glob
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, Iterator, List, Tuple
+
+from pytest_plugins.shared_tests import shared_module_of_stub
+from tools import paths
+
+TESTS_PYTHON = os.path.join(paths.TEZOS_HOME, 'tests_python')
+
+
+def find_stubs() -> Dict[str, str]:
+    """Maps the stubs of all protocol directories to their shared module"""
+    stubs = {}
+    for stub in glob.glob(os.path.join(TESTS_PYTHON, 'tests_*', 'test_*.py')):
+        shared_path = shared_module_of_stub(stub)
+        if shared_path is not None:
+            stubs[stub] = shared_path
+    return stubs
+
+
+@contextlib.contextmanager
+def expanded(stubs: Dict[str, str]) -> Iterator[None]:
+    """Replace stubs by copies of their shared module"""
+    contents = {}
+    try:
+        for stub, shared_path in stubs.items():
+            with open(stub, encoding='utf-8') as stream:
+                contents[stub] = stream.read()
+            shutil.copyfile(shared_path, stub)
+        yield
+    finally:
+        for stub, content in contents.items():
+            with open(stub, 'w', encoding='utf-8') as stream:
+                stream.write(content)
+
+
+def clear_pycaches() -> None:
+    """Remove the bytecode, and rewritten bytecode, of test modules"""
+    for directory in glob.glob(os.path.join(TESTS_PYTHON, 'tests_*')):
+        shutil.rmtree(os.path.join(directory, '__pycache__'), True)
+
+
+def collect(args: List[str], cold: bool) -> Tuple[float, List[str]]:
+    if cold:
+        clear_pycaches()
+    cmd = [
+        sys.executable,
+        '-m',
+        'pytest',
+        '--collect-only',
+        '-qq',
+        '-p',
+        'no:cacheprovider',
+    ] + args
+    start = time.perf_counter()
+    process = subprocess.run(
+        cmd,
+        cwd=TESTS_PYTHON,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        universal_newlines=True,
+        check=False,
+    )
+    duration = time.perf_counter() - start
+    node_ids = [line for line in process.stdout.splitlines() if '::' in line]
+    return duration, sorted(node_ids)
+
+
+def bench(
+    name: str, args: List[str], runs: int, cold: bool
+) -> Tuple[float, List[str]]:
+    durations = []
+    node_ids: List[str] = []
+    for _ in range(runs):
+        duration, node_ids = collect(args, cold)
+        durations.append(duration)
+    print(
+        f'{name:<8} {len(node_ids):6} tests  '
+        f'min: {min(durations):7.3f}s  '
+        f'mean: {statistics.mean(durations):7.3f}s'
+    )
+    return min(durations), node_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--runs',
+        type=int,
+        default=3,
+        help='number of collections per layout, default=3',
+    )
+    parser.add_argument(
+        '--cold',
+        action='store_true',
+        help='remove the bytecode of test modules before each collection',
+    )
+    parser.add_argument(
+        'pytest_args',
+        nargs='*',
+        help='arguments passed to pytest, e.g. test directories',
+    )
+    args = parser.parse_args()
+    stubs = find_stubs()
+    print(f'{len(stubs)} stubs of {len(set(stubs.values()))} shared modules')
+    shared_time, shared_ids = bench(
+        'shared', args.pytest_args, args.runs, args.cold
+    )
+    with expanded(stubs):
+        copies_time, copies_ids = bench(
+            'copies', args.pytest_args, args.runs, args.cold
+        )
+    assert shared_ids == copies_ids, 'layouts collect different tests'
+    print(f'speedup: {copies_time / shared_time:6.2f}x')
+    if args.cold:
+        clear_pycaches()
+
+
+if __name__ == "__main__":
+    main()
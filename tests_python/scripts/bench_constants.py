@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark the import time of tools.constants, whose protocol parameters
+are read on first access, against importing it and reading the
+parameters of all protocols, as every import used to.
+
+Each measure is the wall time of a fresh interpreter.
+
+Run from the tests_python directory:
+
+    poetry run python -m scripts.bench_constants --runs 20
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from typing import Tuple
+
+from tools import paths
+
+LAZY = 'import tools.constants'
+
+EAGER = (
+    'import tools.constants as c\n'
+    'for p in [c.ALPHA_PARAMETERS, c.HANGZHOU_PARAMETERS, '
+    'c.ITHACA_PARAMETERS]:\n'
+    '    p.copy()\n'
+)
+
+BASELINE = 'import tools.paths'
+
+
+def run(code: str, runs: int) -> Tuple[float, float]:
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, '-c', code],
+            cwd=f'{paths.TEZOS_HOME}/tests_python',
+            check=True,
+        )
+        durations.append(time.perf_counter() - start)
+    return min(durations), statistics.mean(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--runs',
+        type=int,
+        default=10,
+        help='number of interpreters per case, default=10',
+    )
+    args = parser.parse_args()
+    results = {}
+    for (name, code) in [
+        ('interpreter', BASELINE),
+        ('lazy', LAZY),
+        ('eager', EAGER),
+    ]:
+        results[name] = run(code, args.runs)
+        (best, mean) = results[name]
+        print(
+            f'{name:<12} min: {best * 1000:8.2f}ms  '
+            f'mean: {mean * 1000:8.2f}ms'
+        )
+    base = results['interpreter'][0]
+    lazy = results['lazy'][0] - base
+    eager = results['eager'][0] - base
+    print(
+        f'import tools.constants: {lazy * 1000:.2f}ms, '
+        f'with all parameters: {eager * 1000:.2f}ms'
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+Benchmark the admission of operations in the mempool of nodes, injected
+at increasing rates, and write the results to a JSON report.
+
+The sandbox runs one or more nodes, connected to each other. At each
+step, transfers from many funded and revealed accounts, forged and
+signed beforehand, are injected in node 0 through the injection RPC, at
+a given rate, for a given duration. The mempool accepts a single
+operation per manager and per block, so each account injects at most
+one transfer per step: there must be at least as many accounts as the
+highest rate times the duration, which is the default.
+
+Each node is monitored through the `monitor_operations` RPC, which
+streams the operations entering its mempool with their classification:
+applied, refused, branch_refused, branch_delayed or outdated. The
+admission latency of an operation by a node is the time from the start
+of its injection to its appearance as applied in the stream of the
+node, and its throughput is the rate of applied operations. Operations
+of other classifications are only counted. Between steps, the applied
+operations are baked, and the operations left in the mempools of the
+nodes are banned, so that they do not clash with those of the next step.
+
+The saturation point is the lowest rate at which node 0 applies less
+than `--saturation-ratio` of the offered rate, or applies operations
+with a 95th percentile latency above `--max-latency`.
+
+Run from the tests_python directory:
+
+    poetry run python -m scripts.bench_mempool --nodes 3 \
+        --rates 10,20,50,100,200 --duration 5 --report mempool.json
+"""
+import argparse
+import codecs
+import concurrent.futures
+import json
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+from client.client import Client
+from launchers.sandbox import Sandbox
+from scripts.bench_block_validation import comma_separated, setup_accounts
+from tools import constants, paths, utils
+from tools.rpc_bench import percentile
+from tests_alpha import protocol
+
+CLASSIFICATIONS = [
+    'applied',
+    'refused',
+    'branch_refused',
+    'branch_delayed',
+    'outdated',
+]
+
+# The classification of an operation by the kind of its first error
+_CLASSIFICATION_OF_ERROR = {
+    'permanent': 'refused',
+    'branch': 'branch_refused',
+    'temporary': 'branch_delayed',
+    'outdated': 'outdated',
+}
+
+MONITOR_PATH = (
+    '/chains/main/mempool/monitor_operations?applied=true&refused=true'
+    '&branch_refused=true&branch_delayed=true'
+)
+
+# Seconds the last injected operations are given to reach all nodes
+GRACE = 10
+
+# Fee of the injected operations, above the default minimal fees
+FEE = '1000'
+
+RECEIVER = 'bootstrap2'
+
+
+def classify(operation: dict) -> str:
+    errors = operation.get('error')
+    if not errors:
+        return 'applied'
+    return _CLASSIFICATION_OF_ERROR.get(errors[0].get('kind'), 'refused')
+
+
+class Monitor:
+    """The operations streamed by the `monitor_operations` RPC of a node,
+    with the time they were first received and their classification"""
+
+    def __init__(self, port: int):
+        self.seen: Dict[str, Tuple[float, str]] = {}
+        self._response = requests.get(
+            f'http://localhost:{port}{MONITOR_PATH}', stream=True
+        )
+        self._response.raise_for_status()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        decoder = json.JSONDecoder()
+        utf8 = codecs.getincrementaldecoder('utf-8')()
+        buffer = ''
+        try:
+            for chunk in self._response.iter_content(chunk_size=None):
+                received = time.perf_counter()
+                buffer += utf8.decode(chunk)
+                while True:
+                    buffer = buffer.lstrip()
+                    try:
+                        (operations, end) = decoder.raw_decode(buffer)
+                    except json.JSONDecodeError:
+                        break
+                    buffer = buffer[end:]
+                    for operation in operations:
+                        self.seen.setdefault(
+                            operation['hash'], (received, classify(operation))
+                        )
+        except Exception:  # pylint: disable=broad-except
+            # The stream is closed by `stop`
+            pass
+
+    def stop(self) -> None:
+        self._response.close()
+        self._thread.join(timeout=5)
+
+
+class Source:
+    """An account injecting operations, with its secret key"""
+
+    def __init__(self, client: Client, alias: str):
+        address = client.show_address(alias, show_secret=True)
+        self.address = address.hash
+        secret_key = address.secret_key
+        assert secret_key is not None and secret_key.startswith(
+            'unencrypted:'
+        ), f'{alias}: no unencrypted secret key'
+        self.secret_key = secret_key[len('unencrypted:') :]
+
+
+def estimate_gas(session: requests.Session, url: str, source: Source) -> str:
+    """The gas limit of a transfer of `source`, simulated"""
+    counter = session.get(
+        f'{url}/chains/main/blocks/head/context/contracts/'
+        f'{source.address}/counter'
+    ).json()
+    operation = {
+        'branch': session.get(f'{url}/chains/main/blocks/head/hash').json(),
+        'contents': [transfer(source, int(counter) + 1, '1040000')],
+        'signature': (
+            'edsigtkpiSSschcaCt9pUVrpNPf7TTcgvgDEDD6NCEHMy8NNQJCGnMfL'
+            'ZzYoQj74yLjo9wx6MPVV29CvVzgi7qEcEUok3k7AuMg'
+        ),
+    }
+    chain_id = session.get(f'{url}/chains/main/chain_id').json()
+    res = session.post(
+        f'{url}/chains/main/blocks/head/helpers/scripts/run_operation',
+        json={'operation': operation, 'chain_id': chain_id},
+    ).json()
+    milligas = res['contents'][0]['metadata']['operation_result'][
+        'consumed_milligas'
+    ]
+    return str(math.ceil(int(milligas) / 1000) + 100)
+
+
+def transfer(source: Source, counter: int, gas_limit: str) -> dict:
+    return {
+        'kind': 'transaction',
+        'source': source.address,
+        'fee': FEE,
+        'counter': str(counter),
+        'gas_limit': gas_limit,
+        'storage_limit': '0',
+        'amount': '1',
+        'destination': constants.IDENTITIES[RECEIVER]['identity'],
+    }
+
+
+def forge_operations(
+    session: requests.Session,
+    url: str,
+    sources: List[Source],
+    num_operations: int,
+    gas_limit: str,
+) -> List[str]:
+    """Forge and sign `num_operations` transfers, one from each of the
+    first `num_operations` `sources`, as the mempool rejects a second
+    operation of a manager until the first one is baked"""
+    assert num_operations <= len(sources), (
+        f'{num_operations} operations for {len(sources)} sources: '
+        'a source injects at most one operation per step'
+    )
+    branch = session.get(f'{url}/chains/main/blocks/head/hash').json()
+    operations = []
+    for source in sources[:num_operations]:
+        counter = session.get(
+            f'{url}/chains/main/blocks/head/context/contracts/'
+            f'{source.address}/counter'
+        ).json()
+        operation = {
+            'branch': branch,
+            'contents': [transfer(source, int(counter) + 1, gas_limit)],
+        }
+        forged = session.post(
+            f'{url}/chains/main/blocks/head/helpers/forge/operations',
+            json=operation,
+        ).json()
+        operations.append(utils.sign_operation(forged, source.secret_key))
+    return operations
+
+
+def inject_at_rate(
+    url: str, operations: List[str], rate: float, workers: int
+) -> List[Tuple[Optional[str], float]]:
+    """Inject `operations` at `rate` operations per second, and return
+    their hashes, None if the injection failed, and the times their
+    injection started"""
+    sessions = threading.local()
+    start = time.perf_counter() + 0.1
+
+    def inject(index: int) -> Tuple[Optional[str], float]:
+        if not hasattr(sessions, 'session'):
+            sessions.session = requests.Session()
+        delay = start + index / rate - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        sent = time.perf_counter()
+        res = sessions.session.post(
+            f'{url}/injection/operation?async', json=operations[index]
+        )
+        return (res.json() if res.ok else None, sent)
+
+    with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+        return list(executor.map(inject, range(len(operations))))
+
+
+def node_statistics(
+    monitor: Monitor, injected: List[Tuple[Optional[str], float]]
+) -> dict:
+    """The admission of the `injected` operations by the node of
+    `monitor`: the throughput and latencies of applied operations, and
+    the number of operations of each classification"""
+    latencies = []
+    counts = dict.fromkeys(CLASSIFICATIONS + ['missing'], 0)
+    last_seen: Optional[float] = None
+    for (operation_hash, sent) in injected:
+        if operation_hash is None:
+            continue
+        if operation_hash not in monitor.seen:
+            counts['missing'] += 1
+            continue
+        (seen, classification) = monitor.seen[operation_hash]
+        counts[classification] += 1
+        if classification != 'applied':
+            continue
+        latencies.append(seen - sent)
+        last_seen = seen if last_seen is None else max(last_seen, seen)
+    stats: dict = {'classifications': counts, 'throughput': None}
+    if latencies and last_seen is not None:
+        first_sent = min(sent for (_, sent) in injected)
+        stats['throughput'] = round(
+            len(latencies) / max(last_seen - first_sent, 1e-6), 3
+        )
+    for pct in [50, 95, 99]:
+        stats[f'latency_p{pct}'] = (
+            round(percentile(latencies, pct), 6) if latencies else None
+        )
+    return stats
+
+
+def empty_mempool(sandbox: Sandbox, nodes: int) -> None:
+    """Bake the applied operations of the mempool of node 0, then ban the
+    operations left in the mempools of the `nodes` first nodes, e.g.
+    branch_delayed ones"""
+    client = sandbox.client(0)
+    for _ in range(10):
+        if not client.get_mempool()['applied']:
+            break
+        utils.bake(client)
+    level = client.get_level()
+    for node_id in range(nodes):
+        client = sandbox.client(node_id)
+        assert utils.check_level_greater_than(client, level)
+        mempool = client.get_mempool()
+        for classification in mempool:
+            for operation in mempool[classification]:
+                # Applied operations are objects, others pairs of their
+                # hash and the operation
+                operation_hash = (
+                    operation['hash']
+                    if isinstance(operation, dict)
+                    else operation[0]
+                )
+                client.rpc(
+                    'post',
+                    '/chains/main/mempool/ban_operation',
+                    data=operation_hash,
+                )
+
+
+def bench_step(
+    sandbox: Sandbox,
+    sources: List[Source],
+    gas_limit: str,
+    rate: float,
+    args,
+) -> dict:
+    url = f'http://localhost:{sandbox.node(0).rpc_port}'
+    session = requests.Session()
+    operations = forge_operations(
+        session, url, sources, int(rate * args.duration), gas_limit
+    )
+    monitors = [
+        Monitor(sandbox.node(node_id).rpc_port) for node_id in range(args.nodes)
+    ]
+    injected = inject_at_rate(url, operations, rate, args.workers)
+    hashes = [operation_hash for (operation_hash, _) in injected]
+    deadline = time.monotonic() + GRACE
+    while time.monotonic() < deadline and not all(
+        operation_hash in monitor.seen
+        for monitor in monitors
+        for operation_hash in hashes
+        if operation_hash is not None
+    ):
+        time.sleep(0.1)
+    for monitor in monitors:
+        monitor.stop()
+    sent = [sent for (_, sent) in injected]
+    step = {
+        'rate': rate,
+        'operations': len(operations),
+        'injection_rate': round(
+            len(sent) / max(max(sent) - min(sent), 1e-6), 3
+        ),
+        'injection_failures': hashes.count(None),
+        'nodes': [node_statistics(monitor, injected) for monitor in monitors],
+    }
+    empty_mempool(sandbox, args.nodes)
+    return step
+
+
+def saturated(step: dict, args) -> bool:
+    stats = step['nodes'][0]
+    if stats['throughput'] is None:
+        return True
+    return (
+        stats['throughput'] < args.saturation_ratio * step['rate']
+        or stats['latency_p95'] > args.max_latency
+    )
+
+
+def scenario(args) -> dict:
+    with Sandbox(paths.TEZOS_HOME, constants.IDENTITIES) as sandbox:
+        for node_id in range(args.nodes):
+            sandbox.add_node(node_id, params=constants.NODE_PARAMS)
+        parameters = protocol.get_parameters()
+        parameters['consensus_threshold'] = 0
+        protocol.activate(
+            sandbox.client(0),
+            parameters=parameters,
+            activate_in_the_past=True,
+        )
+        client = sandbox.client(0)
+        utils.bake(client)
+        aliases = setup_accounts(client, args.sources, args.workers)
+        sources = [Source(client, alias) for alias in aliases]
+        url = f'http://localhost:{sandbox.node(0).rpc_port}'
+        gas_limit = estimate_gas(requests.Session(), url, sources[0])
+        steps = []
+        saturation = None
+        for rate in args.rates:
+            step = bench_step(sandbox, sources, gas_limit, rate, args)
+            steps.append(step)
+            if saturation is None and saturated(step, args):
+                saturation = rate
+        version = client.run(['--version']).strip()
+    return {
+        'version': version,
+        'nodes': args.nodes,
+        'sources': args.sources,
+        'duration': args.duration,
+        'saturation': saturation,
+        'steps': steps,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument(
+        '--nodes',
+        type=int,
+        default=1,
+        help='number of nodes, default=1',
+    )
+    parser.add_argument(
+        '--rates',
+        type=comma_separated(float),
+        default=[10.0, 20.0, 50.0, 100.0, 200.0],
+        help='comma-separated injection rates, in operations per second, '
+        'default=10,20,50,100,200',
+    )
+    parser.add_argument(
+        '--duration',
+        type=float,
+        default=5.0,
+        help='duration of the injection at each rate, in seconds, default=5',
+    )
+    parser.add_argument(
+        '--sources',
+        type=int,
+        default=None,
+        help='number of accounts injecting operations, at least the '
+        'highest rate times the duration, which is the default',
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=16,
+        help='number of concurrent injections, default=16',
+    )
+    parser.add_argument(
+        '--saturation-ratio',
+        type=float,
+        default=0.9,
+        help='ratio of the rate below which a node is saturated, '
+        'default=0.9',
+    )
+    parser.add_argument(
+        '--max-latency',
+        type=float,
+        default=1.0,
+        help='95th percentile of admission latency, in seconds, above '
+        'which a node is saturated, default=1',
+    )
+    parser.add_argument(
+        '--report',
+        default='mempool.json',
+        help='JSON report, default=mempool.json',
+    )
+    args = parser.parse_args()
+    assert args.nodes >= 1
+    # One operation per source and per step
+    needed = max(int(rate * args.duration) for rate in args.rates)
+    if args.sources is None:
+        args.sources = max(needed, 1)
+    elif args.sources < needed:
+        parser.error(
+            f'--sources {args.sources}: at least {needed} sources are needed '
+            f'to inject at {max(args.rates)}/s for {args.duration}s, as a '
+            'source injects at most one operation per step'
+        )
+    report = scenario(args)
+    with open(args.report, 'w') as stream:
+        json.dump(report, stream, indent=2)
+    for step in report['steps']:
+        stats = step['nodes'][0]
+        print(
+            f"rate {step['rate']:>7.1f}/s: applied {stats['throughput']}/s, "
+            f"p95 latency {stats['latency_p95']}s, "
+            f"{stats['classifications']}"
+        )
+    print(f"Saturation: {report['saturation']}")
+    print(f'Report written to {args.report}')
+
+
+if __name__ == "__main__":
+    main()
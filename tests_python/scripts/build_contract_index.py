@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Build the index of the contracts of `contracts_<protocol>` directories
+(see tools/contract_index.py) with a mockup of the protocol of the
+corresponding test directory, e.g. `tests_alpha` for `contracts_alpha`.
+
+Run from the tests_python directory:
+
+    poetry run python -m scripts.build_contract_index contracts_alpha
+"""
+import argparse
+import importlib
+import os
+import tempfile
+from typing import Any
+
+from client.client import Client
+from launchers.sandbox import CLIENT, CLIENT_ADMIN
+from pytest_plugins import mockup_backend
+from tools import contract_index, paths
+
+
+def build_index(contracts_dir: str) -> contract_index.ContractIndex:
+    """Build the index of the contracts directory `contracts_dir`"""
+    contract_path = os.path.join(
+        paths.TEZOS_HOME, 'tests_python', contracts_dir
+    )
+    suffix = os.path.basename(os.path.normpath(contract_path))
+    suffix = suffix[len('contracts_') :]
+    protocol: Any = importlib.import_module(f'tests_{suffix}.protocol')
+    index = contract_index.of_path(contract_path)
+    # The contracts of the test classes, which are all well-formed
+    contracts = [
+        contract
+        for contract in paths.all_contracts(contract_path)
+        if contract.endswith('.tz')
+    ]
+    with tempfile.TemporaryDirectory(prefix='tezos-client.') as base_dir:
+        mockup_backend.create_mockup(
+            base_dir, protocol.HASH, protocol.PARAMETERS
+        )
+        client = Client(
+            os.path.join(paths.TEZOS_HOME, CLIENT),
+            os.path.join(paths.TEZOS_HOME, CLIENT_ADMIN),
+            base_dir=base_dir,
+            mode='mockup',
+        )
+        index.build(client, contracts)
+    index.save()
+    return index
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Build the indexes of contracts directories'
+    )
+    parser.add_argument(
+        'contracts_dirs',
+        nargs='+',
+        help='contracts directories, e.g. contracts_alpha',
+    )
+    args = parser.parse_args()
+    for contracts_dir in args.contracts_dirs:
+        index = build_index(contracts_dir)
+        print(f'{index.index_path}: {len(index.contracts)} contracts')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Compare two reports of the RPC benchmark (see pytest_plugins/rpc_bench.py),
+e.g. of the binaries of two branches, and list the RPCs whose latency
+regressed. Exits with code 1 if there is any.
+
+Run from the tests_python directory:
+
+    poetry run pytest tests_alpha/test_rpc.py -k TestRPCsExistence \
+        --rpc-bench=old.json
+    # switch binaries
+    poetry run pytest tests_alpha/test_rpc.py -k TestRPCsExistence \
+        --rpc-bench=new.json
+    poetry run python -m scripts.compare_rpc_bench old.json new.json
+"""
+import argparse
+import json
+import sys
+
+from tools.rpc_bench import PERCENTILES, compare
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('old', help='reference report')
+    parser.add_argument('new', help='report to check')
+    parser.add_argument(
+        '--metric',
+        choices=[f'p{pct}' for pct in PERCENTILES] + ['mean'],
+        default='p95',
+        help='latency compared, default=p95',
+    )
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=0.2,
+        help='relative increase of latency considered a regression, '
+        'default=0.2',
+    )
+    args = parser.parse_args()
+    with open(args.old) as stream:
+        old = json.load(stream)
+    with open(args.new) as stream:
+        new = json.load(stream)
+    print(f"old: {old['versions']}")
+    print(f"new: {new['versions']}")
+    regressions = compare(old, new, args.metric, args.threshold)
+    for regression in regressions:
+        print(regression)
+    print(f'{len(regressions)} regressions of {len(new["rpcs"])} RPCs')
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -425,9 +425,12 @@ def accounts(node, num_nodes):
     return [f'bootstrap{i}' for i in range(start, end)]
 
 
-def scenario(round_duration, num_nodes, log_dir):
+def scenario(round_duration, num_nodes, log_dir, resource_sampling):
     with Sandbox(
-        paths.TEZOS_HOME, constants.IDENTITIES, log_dir=log_dir
+        paths.TEZOS_HOME,
+        constants.IDENTITIES,
+        log_dir=log_dir,
+        resource_sampling=resource_sampling,
     ) as sandbox:
         for i in range(num_nodes):
             sandbox.add_node(
@@ -488,6 +491,16 @@ def main():
         required=False,
         default=None,
     )
+    parser.add_argument(
+        '--resource-sampling',
+        dest='resource_sampling',
+        metavar='TIME',
+        help='interval (seconds) of sampling of the resources used by '
+        'nodes and bakers, saved in the log dir, default=none',
+        required=False,
+        type=float,
+        default=None,
+    )
     args = parser.parse_args()
     log_dir = args.log_dir
     if not (log_dir is None or os.path.isdir(log_dir)):
@@ -496,6 +509,7 @@ def main():
         int(args.round_duration),
         int(args.num_nodes),
         args.log_dir,
+        args.resource_sampling,
     )
 
 
@@ -1,8 +1,7 @@
 from os import path
-import random
-from hashlib import blake2b
 import pytest
 
+from tools import bls12_381_vectors
 from tools.bls12_381 import G1, G2, Fr, pairing_check
 from tools.utils import assert_run_failure
 from .contract_paths import MINI_SCENARIOS_CONTRACT_PATH, OPCODES_CONTRACT_PATH
@@ -72,6 +71,9 @@ def check_pairing_check(client, args):
 # Setting this higher makes things rather slow
 RANDOM_ITERATIONS = range(10)
 
+# Use the precomputed expected results, if they have been generated
+bls12_381_vectors.install(bls12_381_vectors.TEST_SEED)
+
 STORE_CLASSES = [G1, G2, Fr]
 CURVES = [G1, G2]
 ADD_CLASSES = [G1, G2, Fr]
@@ -85,10 +87,7 @@ NEG_CLASSES = [G1, G2, Fr]
 class TestBls12_381:
 
     # Fix the random seed to ensure reproducibility
-    h = blake2b()
-    h.update(b'seed')
-    gen = random.Random()
-    gen.seed(bytes.fromhex(h.hexdigest()))
+    gen = bls12_381_vectors.seeded_random(bls12_381_vectors.TEST_SEED)
 
     # Store
     @pytest.mark.parametrize("cls", STORE_CLASSES)
@@ -643,11 +643,6 @@ class TestContractOpcodes:
             # Exec concat contract
             ('exec_concat.tz', '"?"', '""', '"_abc"'),
             ('exec_concat.tz', '"?"', '"test"', '"test_abc"'),
-            # Get the current balance of the contract
-            ('balance.tz', '111', 'Unit', '4000000000000'),
-            # Get the current level of the block
-            # Test the produced variable annotation
-            ('level.tz', '111', 'Unit', '1'),
             # Test addition and subtraction on tez
             (
                 'tez_add_sub.tz',
@@ -985,13 +980,6 @@ class TestContractOpcodes:
             ('self_address.tz', 'Unit', 'Unit', 'Unit'),
             # Test UNPAIR
             ('unpair.tz', 'Unit', 'Unit', 'Unit'),
-            # Test VOTING_POWER
-            (
-                'voting_power.tz',
-                '(Pair 0 0)',
-                f'"{PUBLIC_KEY}"',
-                '(Pair 500 2500)',
-            ),
             # Test KECCAK
             (
                 'keccak.tz',
@@ -1903,3 +1891,49 @@ class TestContractOpcodes:
         contract = path.join(OPCODES_CONTRACT_PATH, contract)
         run_script_res = client.run_script(contract, storage, param)
         assert run_script_res.storage == expected
+
+
+@pytest.mark.slow
+@pytest.mark.contract
+@pytest.mark.regression
+class TestContractOpcodesChainState:
+    """Tests for individual opcodes that read the state of the chain.
+
+    The head of a mockup is not that of a sandboxed node, e.g. it is at
+    level 0 instead of 1, hence these tests are not run against a mockup
+    (see pytest_plugins/mockup_backend.py)."""
+
+    @pytest.mark.parametrize(
+        "contract,param,storage,expected",
+        [  # FORMAT: assert_output contract_file storage input expected_result
+            # Get the current balance of the contract
+            ('balance.tz', '111', 'Unit', '4000000000000'),
+            # Get the current level of the block
+            # Test the produced variable annotation
+            ('level.tz', '111', 'Unit', '1'),
+            # Test VOTING_POWER
+            (
+                'voting_power.tz',
+                '(Pair 0 0)',
+                f'"{PUBLIC_KEY}"',
+                '(Pair 500 2500)',
+            ),
+        ],
+    )
+    def test_contract_input_output(
+        self,
+        client_regtest: ClientRegression,
+        contract: str,
+        param: str,
+        storage: str,
+        expected: str,
+    ):
+        client = client_regtest
+        assert contract.endswith(
+            '.tz'
+        ), "test contract should have .tz extension"
+        contract = path.join(OPCODES_CONTRACT_PATH, contract)
+        run_script_res = client.run_script(
+            contract, param, storage, trace_stack=True
+        )
+        assert run_script_res.storage == expected
@@ -63,6 +63,7 @@ def sandbox(request, sandbox: Sandbox, contract_name, session: dict):
 @pytest.mark.mempool
 @pytest.mark.multinode
 @pytest.mark.slow
+@pytest.mark.rpc_bench
 class TestRPCsExistence:
     """
     Tests the existence of RPCs. It does not check the output!
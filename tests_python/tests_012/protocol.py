@@ -1,16 +1,15 @@
 import datetime
 from enum import Enum, auto
 from typing import Optional
-from copy import deepcopy
 from tools import constants, utils
 
 HASH = constants.ITHACA
 DAEMON = constants.ITHACA_DAEMON
 PARAMETERS = constants.ITHACA_PARAMETERS
 
-TENDERBAKE_PARAMETERS = deepcopy(PARAMETERS)
-TENDERBAKE_PARAMETERS['consensus_threshold'] = 45
-TENDERBAKE_PARAMETERS['consensus_committee_size'] = 67
+TENDERBAKE_PARAMETERS = PARAMETERS.updated(
+    {'consensus_threshold': 45, 'consensus_committee_size': 67}
+)
 
 FOLDER = constants.ITHACA_FOLDER
 
@@ -45,12 +44,12 @@ def get_parameters(protocol: Optional[Protocol] = Protocol.CURRENT):
     Returns:
       A fresh copy of the protocol parameters w.r.t to protocol
     """
-    # deepcopy call prevents any unforeseen and unwanted side effects
-    # on the array parameters
+    # the copy is deep, which prevents any unforeseen and unwanted side
+    # effects on the array parameters
     # e.g., bootstrap_accounts, commitments, endorsement_reward
-    return deepcopy(
-        dict((PARAMETERS if protocol is Protocol.CURRENT else PREV_PARAMETERS))
-    )
+    return (
+        PARAMETERS if protocol is Protocol.CURRENT else PREV_PARAMETERS
+    ).copy()
 
 
 def get_now(client) -> str:
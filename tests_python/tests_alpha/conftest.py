@@ -8,17 +8,38 @@ from tools import constants, utils
 from tools.client_regression import ClientRegression
 from client.client import Client
 from client.client_output import CreateMockupResult
+from pytest_plugins import mockup_backend
 
 from . import protocol
 
 
+@pytest.fixture(scope="session")
+def mockup_base_dir() -> Iterator[str]:
+    """The base dir of a mockup with protocol alpha, shared by the test
+    classes marked with `mockup_backend`.
+
+    See pytest_plugins/mockup_backend.py.
+    """
+    with tempfile.TemporaryDirectory(prefix='tezos-client.') as base_dir:
+        mockup_backend.create_mockup(
+            base_dir, protocol.HASH, protocol.PARAMETERS
+        )
+        yield base_dir
+
+
 @pytest.fixture(scope="class")
-def client(sandbox: Sandbox) -> Iterator[Client]:
+def client(sandbox: Sandbox, request) -> Iterator[Client]:
     """One node with protocol alpha.
 
     Activate protocol alpha one year in the past. This avoids waiting
     when baking blocks manually from the client using `bake for`
+
+    Test classes marked with `mockup_backend` get a mockup client instead
+    (see fixture mockup_base_dir).
     """
+    if mockup_backend.selected(request):
+        yield mockup_backend.client(sandbox, request)
+        return
     sandbox.add_node(0, params=constants.NODE_PARAMS)
     client = sandbox.client(0)
     parameters = protocol.get_parameters()
@@ -28,7 +49,7 @@ def client(sandbox: Sandbox) -> Iterator[Client]:
 
 
 @pytest.fixture(scope="class")
-def client_regtest_bis(sandbox: Sandbox) -> Iterator[Client]:
+def client_regtest_bis(sandbox: Sandbox, request) -> Iterator[Client]:
     """One node with protocol alpha, regression test enabled.
 
     Activate protocol alpha one year in the past. (see fixture client).
@@ -58,6 +79,11 @@ def client_regtest_bis(sandbox: Sandbox) -> Iterator[Client]:
         )
         return client
 
+    if mockup_backend.selected(request):
+        yield mockup_backend.client(
+            sandbox, request, client_factory=reg_client_factory
+        )
+        return
     sandbox.add_node(
         1, client_factory=reg_client_factory, params=constants.NODE_PARAMS
     )
@@ -37,6 +37,8 @@ MINIMAL_BLOCK_DELAY = 1
 DELAY_INCREMENT_PER_ROUND = 1
 MAX_LEVEL_DURATION = 6  # that is, decision expected in at most 3 rounds
 EXPECTED_LEVEL = TEST_DURATION // MAX_LEVEL_DURATION
+# Maximal resident memory of a node at the end of the test, in bytes
+NODE_RSS_BUDGET = 1024 ** 3
 
 
 def random_op(client: Client) -> None:
@@ -182,6 +184,11 @@ class TestAllDaemonsWithOperations:
             heads_hash.add(block_hash)
         assert len(heads_hash) == 1
 
+    def test_node_memory(self, sandbox: Sandbox):
+        for node_id in sandbox.nodes:
+            sample = sandbox.resources.current(f'node{node_id}')
+            assert sample.rss < NODE_RSS_BUDGET, f'node{node_id} uses too much'
+
 
 @pytest.mark.baker
 @pytest.mark.multinode
@@ -235,3 +242,6 @@ class TestAllDaemonsWithOperationsRingTopo(TestAllDaemonsWithOperations):
 
     def test_check_operations(self, sandbox: Sandbox):
         super().test_check_operations(sandbox)
+
+    def test_node_memory(self, sandbox: Sandbox):
+        super().test_node_memory(sandbox)
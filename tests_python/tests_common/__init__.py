@@ -0,0 +1,12 @@
+"""Test modules shared by several protocol directories.
+
+These modules are not collected from this directory, but from the stubs
+of the same name in the `tests_<protocol>` directories that run them,
+as submodules of these directories' packages (see
+pytest_plugins/shared_tests.py). Hence, they must not contain anything
+specific to a protocol, which must be taken from the `protocol` and
+`contract_paths` modules of the protocol directory instead.
+
+To make a shared module specific to a protocol, replace the stub of that
+protocol by a copy of the shared module.
+"""
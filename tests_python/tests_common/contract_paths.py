@@ -0,0 +1,5 @@
+"""For static analysis only: shared test modules import the
+`contract_paths` module of the protocol directory they are collected
+for."""
+# pylint: disable=wildcard-import,unused-wildcard-import
+from tests_alpha.contract_paths import *  # noqa: F401,F403
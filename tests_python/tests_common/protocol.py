@@ -0,0 +1,4 @@
+"""For static analysis only: shared test modules import the `protocol`
+module of the protocol directory they are collected for."""
+# pylint: disable=wildcard-import,unused-wildcard-import
+from tests_alpha.protocol import *  # noqa: F401,F403
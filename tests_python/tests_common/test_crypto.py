@@ -0,0 +1,106 @@
+from random import getrandbits
+
+from os import path
+
+import pytest
+
+from Crypto.Hash import keccak, SHA3_256
+import ed25519
+import pyblake2
+
+from tools import constants, utils
+from .contract_paths import OPCODES_CONTRACT_PATH
+
+RANDOM_ITERATIONS = 50
+
+HASH_FUNCTIONS = {
+    "keccak": lambda bytes_to_hash: keccak.new(digest_bits=256)
+    .update(bytes_to_hash)
+    .hexdigest(),
+    "sha3": lambda bytes_to_hash: SHA3_256.new()
+    .update(bytes_to_hash)
+    .hexdigest(),
+}
+
+
+SIGNERS = ['bootstrap1', 'bootstrap2', 'bootstrap3']
+
+
+def signed_operations(seed: int):
+    """Pairs of forged operations and signers, with repetitions. The
+    operations depend on `seed`, so that their signatures are not cached
+    yet."""
+    return [
+        (bytes([seed, index]).hex() * 16, signer)
+        for index in range(8)
+        for signer in SIGNERS
+    ] * 2
+
+
+def secret_key(signer: str) -> str:
+    return constants.IDENTITIES[signer]['secret'][len('unencrypted:') :]
+
+
+@pytest.fixture(params=HASH_FUNCTIONS.keys())
+def hash_fun(request):
+    return request.param
+
+
+@pytest.mark.contract
+class TestHash:
+    @pytest.mark.parametrize(
+        "bytes_to_hash",
+        [b"", b"a"]
+        + [
+            getrandbits(bytes_length * 8).to_bytes(
+                bytes_length, byteorder="little"
+            )
+            for bytes_length in [32]
+            for _ in range(RANDOM_ITERATIONS)
+        ],
+    )
+    def test_hash(self, client, hash_fun, bytes_to_hash):
+        contract = path.join(OPCODES_CONTRACT_PATH, f"{hash_fun}.tz")
+
+        hashed = HASH_FUNCTIONS[hash_fun](bytes_to_hash)
+        arg = f"0x{bytes_to_hash.hex()}"
+        result = client.run_script(contract, "None", arg)
+        assert result.storage == f"(Some 0x{hashed})"
+
+
+class TestSignMany:
+    """Checks the batch signing of operations, over one or several
+    processes, and the signatures kept in the caches of `tools.utils`"""
+
+    @pytest.mark.parametrize("processes", [None, 1, 4])
+    def test_sign_many(self, processes):
+        operations = [
+            (operation, secret_key(signer))
+            for (operation, signer) in signed_operations(processes or 0)
+        ]
+        signed = utils.sign_many(operations, processes)
+        assert signed == [
+            utils.sign_operation(operation, key)
+            for (operation, key) in operations
+        ]
+        # Signed again from the caches
+        assert utils.sign_many(operations, processes) == signed
+
+    def test_signatures(self):
+        operations = signed_operations(255)
+        signed = utils.sign_many(
+            (operation, secret_key(signer))
+            for (operation, signer) in operations
+        )
+        for ((operation, signer), signed_operation) in zip(operations, signed):
+            assert signed_operation.startswith(operation)
+            signature = bytes.fromhex(signed_operation[len(operation) :])
+            public_key = utils.b58_key_to_hex(
+                constants.IDENTITIES[signer]['public']
+            )
+            digest = pyblake2.blake2b(
+                b'\x03' + bytes.fromhex(operation), digest_size=32
+            ).digest()
+            ed25519.VerifyingKey(bytes.fromhex(public_key)).verify(
+                signature, digest
+            )
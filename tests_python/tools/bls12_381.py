@@ -1,10 +1,20 @@
 """Static classes for BLS-381 types, and utility functions for BLS12-381.
 This file is intended to encompass and augment the functionality from py_ecc.
+
+Scalar multiplications use fixed-base window tables when the point is a
+group generator and width-w NAF expansions otherwise, which is
+significantly faster than py_ecc's plain double-and-add. Pairing checks
+run a single Miller loop over all pairs followed by one final
+exponentiation.
 """
-from typing import Iterable, Tuple
+import functools
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 from py_ecc import bls
 from py_ecc import optimized_bls12_381 as bls12_381
+from py_ecc.optimized_bls12_381 import optimized_pairing
+from py_ecc.typing import Optimized_Point3D
 
 from py_ecc.fields import (
     optimized_bls12_381_FQ as FQ,
@@ -14,6 +24,122 @@ from py_ecc.fields import (
 
 G1Point = bls.typing.G1Uncompressed
 G2Point = bls.typing.G2Uncompressed
+FQ12Point = Optimized_Point3D[FQ12]
+
+# Width (in bits) of the windows of fixed-base tables and wNAF expansions
+WINDOW = 4
+
+SCALAR_BITS = bls12_381.curve_order.bit_length()
+
+
+def _zero_like(point):
+    """Return the point at infinity of the group of `point`"""
+    field = point[0]
+    return (field.one(), field.one(), field.zero())
+
+
+def fixed_base_table(point, window: int = WINDOW) -> List[List]:
+    """Precompute the multiples of `point` used by `fixed_base_multiply`.
+
+    Row `i` of the table holds `j * 2^(window * i) * point` for `j` in
+    `[0, 2^window)`, so that multiplying by a scalar of `SCALAR_BITS`
+    bits only costs one addition per window, and no doubling."""
+    table = []
+    base = point
+    for _ in range(0, SCALAR_BITS, window):
+        row = [_zero_like(point)]
+        for _ in range((1 << window) - 1):
+            row.append(bls12_381.add(row[-1], base))
+        table.append(row)
+        base = bls12_381.add(row[-1], base)
+    return table
+
+
+def fixed_base_multiply(table: List[List], nnn: int, window: int = WINDOW):
+    """Multiply the point whose `fixed_base_table` is `table` by `nnn`.
+
+    The point must belong to the prime order subgroup, as `nnn` is
+    reduced modulo the curve order."""
+    nnn %= bls12_381.curve_order
+    mask = (1 << window) - 1
+    acc = table[0][0]
+    for row in table:
+        digit = nnn & mask
+        if digit:
+            acc = bls12_381.add(acc, row[digit])
+        nnn >>= window
+    return acc
+
+
+def wnaf(nnn: int, window: int = WINDOW) -> List[int]:
+    """Width-`window` non-adjacent form of `nnn`, least significant first.
+
+    Non-zero digits are odd and lie in `(-2^(window-1), 2^(window-1))`."""
+    digits = []
+    modulus = 1 << window
+    while nnn:
+        if nnn & 1:
+            digit = nnn % modulus
+            if digit >= modulus >> 1:
+                digit -= modulus
+            nnn -= digit
+        else:
+            digit = 0
+        digits.append(digit)
+        nnn >>= 1
+    return digits
+
+
+def wnaf_multiply(point, nnn: int, window: int = WINDOW):
+    """Multiply an arbitrary `point` by `nnn` using its wNAF expansion"""
+    if nnn < 0:
+        point, nnn = bls12_381.neg(point), -nnn
+    # odd_multiples[k] = (2k + 1) * point
+    double_point = bls12_381.double(point)
+    odd_multiples = [point]
+    for _ in range((1 << (window - 2)) - 1):
+        odd_multiples.append(bls12_381.add(odd_multiples[-1], double_point))
+    acc = _zero_like(point)
+    for digit in reversed(wnaf(nnn, window)):
+        acc = bls12_381.double(acc)
+        if digit > 0:
+            acc = bls12_381.add(acc, odd_multiples[digit >> 1])
+        elif digit < 0:
+            acc = bls12_381.add(acc, bls12_381.neg(odd_multiples[-digit >> 1]))
+    return acc
+
+
+def batch_normalize(points: Sequence) -> List[Optional[Tuple]]:
+    """Convert points to affine coordinates with a single field inversion.
+
+    Uses Montgomery's trick: the inverse of every `z` coordinate is
+    recovered from the inverse of their product. Points at infinity are
+    mapped to `None`."""
+    finite = [point for point in points if not bls12_381.is_inf(point)]
+    if not finite:
+        return [None] * len(points)
+    prefixes = []
+    acc = finite[0][2].one()
+    for point in finite:
+        prefixes.append(acc)
+        acc = acc * point[2]
+    inv = acc.one() / acc
+    inverses = [None] * len(finite)
+    for i in range(len(finite) - 1, -1, -1):
+        inverses[i] = inv * prefixes[i]
+        inv = inv * finite[i][2]
+    affine = iter(
+        (point[0] * z_inv, point[1] * z_inv)
+        for point, z_inv in zip(finite, inverses)
+    )
+    return [
+        None if bls12_381.is_inf(point) else next(affine) for point in points
+    ]
+
+
+@functools.lru_cache(maxsize=None)
+def _generator_table(group) -> List[List]:
+    return fixed_base_table(group.one)
 
 
 class Fr:
@@ -61,7 +187,13 @@ class G1:
 
     @staticmethod
     def mul(xxx: G1Point, nnn: int) -> G1Point:
-        return bls12_381.multiply(xxx, nnn)
+        if xxx is G1.one:
+            return G1.mul_generator(nnn)
+        return _multiply(G1, xxx, nnn)
+
+    @staticmethod
+    def mul_generator(nnn: int) -> G1Point:
+        return fixed_base_multiply(_generator_table(G1), nnn)
 
     @staticmethod
     def neg(xxx: G1Point) -> G1Point:
@@ -77,14 +209,20 @@ class G1:
 
     @staticmethod
     def to_hex(g1_point: G1Point) -> str:
-        if bls12_381.is_inf(g1_point):
-            xxx, yyy = bls.constants.POW_2_382, 0
-        else:
-            xxx_pt, yyy_pt = bls12_381.normalize(g1_point)
-            xxx, yyy = xxx_pt.n, yyy_pt.n
-        xxx_bytes = xxx.to_bytes(48, byteorder='big')
-        yyy_bytes = yyy.to_bytes(48, byteorder='big')
-        return f'0x{(xxx_bytes + yyy_bytes).hex()}'
+        return G1.to_hex_many([g1_point])[0]
+
+    @staticmethod
+    def to_hex_many(g1_points: Sequence[G1Point]) -> List[str]:
+        res = []
+        for affine in batch_normalize(g1_points):
+            if affine is None:
+                xxx, yyy = bls.constants.POW_2_382, 0
+            else:
+                xxx, yyy = affine[0].n, affine[1].n
+            xxx_bytes = xxx.to_bytes(48, byteorder='big')
+            yyy_bytes = yyy.to_bytes(48, byteorder='big')
+            res.append(f'0x{(xxx_bytes + yyy_bytes).hex()}')
+        return res
 
     @staticmethod
     def of_hex(hexstr: str) -> G1Point:
@@ -98,9 +236,7 @@ class G1:
     # Generate a random non-infinity point on G1
     def random(gen) -> G1Point:
         # Get a random point by multiplying a random Fr by the generator
-        g1_point = G1.mul(G1.one, Fr.random(gen))
-        assert G1.is_on_curve(g1_point)
-        return g1_point
+        return _random_point(G1, Fr.random(gen))
 
 
 class G2:
@@ -117,7 +253,13 @@ class G2:
 
     @staticmethod
     def mul(xxx: G2Point, nnn: int) -> G2Point:
-        return bls12_381.multiply(xxx, nnn)
+        if xxx is G2.one:
+            return G2.mul_generator(nnn)
+        return _multiply(G2, xxx, nnn)
+
+    @staticmethod
+    def mul_generator(nnn: int) -> G2Point:
+        return fixed_base_multiply(_generator_table(G2), nnn)
 
     @staticmethod
     def neg(xxx: G2Point) -> G2Point:
@@ -133,19 +275,25 @@ class G2:
 
     @staticmethod
     def to_hex(g2_point: G2Point) -> str:
-        if bls12_381.is_inf(g2_point):
-            x_re, x_im, y_re, y_im = 0, bls.constants.POW_2_382, 0, 0
-        else:
-            xxx, yyy = bls12_381.normalize(g2_point)
-            x_re, x_im = xxx.coeffs
-            y_re, y_im = yyy.coeffs
-        x_re_bytes = x_re.to_bytes(48, byteorder='big')
-        x_im_bytes = x_im.to_bytes(48, byteorder='big')
-        y_re_bytes = y_re.to_bytes(48, byteorder='big')
-        y_im_bytes = y_im.to_bytes(48, byteorder='big')
-        x_bytes = x_im_bytes + x_re_bytes
-        y_bytes = y_im_bytes + y_re_bytes
-        return f'0x{(x_bytes + y_bytes).hex()}'
+        return G2.to_hex_many([g2_point])[0]
+
+    @staticmethod
+    def to_hex_many(g2_points: Sequence[G2Point]) -> List[str]:
+        res = []
+        for affine in batch_normalize(g2_points):
+            if affine is None:
+                x_re, x_im, y_re, y_im = 0, bls.constants.POW_2_382, 0, 0
+            else:
+                x_re, x_im = affine[0].coeffs
+                y_re, y_im = affine[1].coeffs
+            x_re_bytes = x_re.to_bytes(48, byteorder='big')
+            x_im_bytes = x_im.to_bytes(48, byteorder='big')
+            y_re_bytes = y_re.to_bytes(48, byteorder='big')
+            y_im_bytes = y_im.to_bytes(48, byteorder='big')
+            x_bytes = x_im_bytes + x_re_bytes
+            y_bytes = y_im_bytes + y_re_bytes
+            res.append(f'0x{(x_bytes + y_bytes).hex()}')
+        return res
 
     @staticmethod
     def of_hex(hexstr: str) -> G2Point:
@@ -163,13 +311,120 @@ class G2:
     # Generate a random non-infinity point on G2
     def random(gen) -> G2Point:
         # Get a random point by multiplying a random Fr by the generator
-        g2_point = G2.mul(G2.one, Fr.random(gen))
+        return _random_point(G2, Fr.random(gen))
+
+
+# Number of cached generator multiples and pairing check results. The test
+# modules of every protocol draw the same seeded random sequences, so only
+# the first of them pays for the reference computations.
+RANDOM_VECTORS_CACHE_SIZE = 4096
+
+
+# Hex encodings of results loaded from precomputed test vectors, see
+# `preload` and tools/bls12_381_vectors.py
+_KNOWN_POINTS: Dict[Tuple[str, int], str] = {}
+_KNOWN_PRODUCTS: Dict[Tuple[str, str, int], str] = {}
+_KNOWN_PAIRING_CHECKS: Dict[Tuple[Tuple[str, str], ...], bool] = {}
+
+# Pairing check results computed so far, least recently used first
+_PAIRING_CHECKS: 'OrderedDict[Tuple[Tuple[str, str], ...], bool]' = (
+    OrderedDict()
+)
+
+
+def preload(
+    points: Iterable[Tuple[str, int, str]] = (),
+    products: Iterable[Tuple[str, str, int, str]] = (),
+    pairing_checks: Iterable[Tuple[Tuple[Tuple[str, str], ...], bool]] = (),
+) -> None:
+    """Register precomputed results.
+
+    Args:
+        points: (group name, scalar, hex of scalar * generator) triples
+        products: (group name, hex of point, scalar, hex of product)
+        pairing_checks: (tuple of (g1 hex, g2 hex) pairs, result)
+    """
+    for name, nnn, point in points:
+        _KNOWN_POINTS[(name, nnn)] = point
+    for name, point, nnn, product in products:
+        _KNOWN_PRODUCTS[(name, point, nnn)] = product
+    _KNOWN_PAIRING_CHECKS.update(pairing_checks)
+
+
+@functools.lru_cache(maxsize=RANDOM_VECTORS_CACHE_SIZE)
+def _random_point(group, nnn: int):
+    known = _KNOWN_POINTS.get((group.name, nnn))
+    if known is not None:
+        return group.of_hex(known)
+    point = group.mul_generator(nnn)
+    assert group.is_on_curve(point)
+    return point
+
+
+def _multiply(group, point, nnn: int):
+    if _KNOWN_PRODUCTS:
+        known = _KNOWN_PRODUCTS.get((group.name, group.to_hex(point), nnn))
+        if known is not None:
+            return group.of_hex(known)
+    return wnaf_multiply(point, nnn)
+
+
+def multi_miller_loop(points: Iterable[Tuple[G1Point, G2Point]]) -> FQ12:
+    """Product of the Miller loops of all pairs, without final exponentiation.
+
+    The loops of all pairs run in lockstep so that the squaring of the
+    accumulator, and the final division, are shared."""
+    # The twisted G2 point and the G1 point cast to FQ12 of each pair
+    pairs: List[Tuple[FQ12Point, FQ12Point]] = []
+    for g1_point, g2_point in points:
+        assert G1.is_on_curve(g1_point)
         assert G2.is_on_curve(g2_point)
-        return g2_point
+        if bls12_381.is_inf(g1_point) or bls12_381.is_inf(g2_point):
+            continue
+        pairs.append(
+            (
+                bls12_381.twist(g2_point),
+                optimized_pairing.cast_point_to_fq12(g1_point),
+            )
+        )
+    f_num, f_den = FQ12.one(), FQ12.one()
+    if not pairs:
+        return f_num
+    accs = [twisted for twisted, _ in pairs]
+    for bit in optimized_pairing.pseudo_binary_encoding[62::-1]:
+        f_num = f_num * f_num
+        f_den = f_den * f_den
+        for i, (twisted, cast) in enumerate(pairs):
+            acc = accs[i]
+            line_num, line_den = optimized_pairing.linefunc(acc, acc, cast)
+            f_num = f_num * line_num
+            f_den = f_den * line_den
+            acc = bls12_381.double(acc)
+            if bit == 1:
+                line_num, line_den = optimized_pairing.linefunc(
+                    acc, twisted, cast
+                )
+                f_num = f_num * line_num
+                f_den = f_den * line_den
+                acc = bls12_381.add(acc, twisted)
+            accs[i] = acc
+    return f_num / f_den
 
 
 def pairing_check(points: Iterable[Tuple[G1Point, G2Point]]) -> bool:
-    prod = FQ12.one()
-    for g1_point, g2_point in points:
-        prod = prod * bls12_381.pairing(g2_point, g1_point)
-    return FQ12.one() == prod
+    points = list(points)
+    g1_points = G1.to_hex_many([g1_point for g1_point, _ in points])
+    g2_points = G2.to_hex_many([g2_point for _, g2_point in points])
+    key = tuple(zip(g1_points, g2_points))
+    known = _KNOWN_PAIRING_CHECKS.get(key)
+    if known is not None:
+        return known
+    if key in _PAIRING_CHECKS:
+        _PAIRING_CHECKS.move_to_end(key)
+        return _PAIRING_CHECKS[key]
+    product = multi_miller_loop(points)
+    result = FQ12.one() == bls12_381.final_exponentiate(product)
+    _PAIRING_CHECKS[key] = result
+    if len(_PAIRING_CHECKS) > RANDOM_VECTORS_CACHE_SIZE:
+        _PAIRING_CHECKS.popitem(last=False)
+    return result
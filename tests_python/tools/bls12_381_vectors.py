@@ -0,0 +1,185 @@
+"""Precomputed, seeded random test vectors for BLS12-381.
+
+The BLS12-381 contract tests draw random scalars from a seeded generator
+and compute the expected results with py_ecc, one at a time. This module
+replays the same stream of scalars ahead of time, computes the points and
+results the tests need in a process pool, and stores them in a compressed
+file keyed by seed. Loading that file registers the results with
+`tools.bls12_381.preload`, so the tests stay reproducible whether or not
+the vectors are available, but no longer pay for the computations.
+
+For the `i`-th scalar `s_i` of the stream, the vectors record:
+ - the hex encodings of `s_i`, `s_i * G1` and `s_i * G2`,
+ - the products `(s_i * G) * s_(i+1)`,
+ - the pairing check inputs and result for `(s_i * G1, s_(i+1) * G2)`.
+
+Negations and sums are not recorded: they cost a single field negation or
+point addition, less than decoding a precomputed result from hex.
+
+To generate the vectors used by the test suite, run from tests_python:
+
+    poetry run python -m tools.bls12_381_vectors --count 1024
+"""
+import argparse
+import gzip
+import json
+import multiprocessing
+import os
+import random
+from hashlib import blake2b
+from typing import List, Optional
+
+from tools import paths
+from tools.bls12_381 import G1, G2, Fr, pairing_check, preload
+
+VECTORS_DIR = os.environ.get(
+    'TEZOS_BLS12_381_VECTORS',
+    os.path.join(paths.TEZOS_HOME, 'tests_python', '.cache', 'bls12_381'),
+)
+
+# Seed used by the test_contract_bls12_381.py modules
+TEST_SEED = b'seed'
+
+# Number of indices computed by a worker at once
+CHUNK_SIZE = 16
+
+
+def seeded_random(seed: bytes) -> random.Random:
+    """The random generator used by the tests for a given seed."""
+    seed_hash = blake2b()
+    seed_hash.update(seed)
+    gen = random.Random()
+    gen.seed(bytes.fromhex(seed_hash.hexdigest()))
+    return gen
+
+
+def vectors_file(seed: bytes) -> str:
+    seed_hash = blake2b(seed, digest_size=16).hexdigest()
+    return os.path.join(VECTORS_DIR, f'{seed_hash}.json.gz')
+
+
+def _vectors_of_chunk(scalars: List[int]) -> List[dict]:
+    """Compute the vectors of `scalars[:-1]`; the last scalar is only used
+    as the second operand of binary operations."""
+    g1_points = [G1.mul_generator(nnn) for nnn in scalars]
+    g2_points = [G2.mul_generator(nnn) for nnn in scalars]
+    g1_hexes = G1.to_hex_many(g1_points)
+    g2_hexes = G2.to_hex_many(g2_points)
+    res = []
+    for i, nnn in enumerate(scalars[:-1]):
+        nxt = scalars[i + 1]
+        g1_point, g2_point = g1_points[i], g2_points[i]
+        res.append(
+            {
+                'fr': Fr.to_hex(nnn),
+                'g1': g1_hexes[i],
+                'g2': g2_hexes[i],
+                'g1_mul': G1.to_hex(G1.mul(g1_point, nxt)),
+                'g2_mul': G2.to_hex(G2.mul(g2_point, nxt)),
+                'pairing_check': pairing_check([(g1_point, g2_points[i + 1])]),
+            }
+        )
+    return res
+
+
+def generate(seed: bytes, count: int, processes: Optional[int] = None) -> dict:
+    """Compute the vectors of the first `count` scalars drawn from `seed`.
+
+    Chunks of scalars are dispatched to a pool of `processes` workers
+    (defaults to the number of CPUs); results do not depend on it."""
+    gen = seeded_random(seed)
+    scalars = [Fr.random(gen) for _ in range(count + 1)]
+    chunks = [
+        scalars[start : start + CHUNK_SIZE + 1]
+        for start in range(0, count, CHUNK_SIZE)
+    ]
+    with multiprocessing.Pool(processes) as pool:
+        vectors = [
+            vector
+            for chunk in pool.map(_vectors_of_chunk, chunks, 1)
+            for vector in chunk
+        ]
+    return {
+        'seed': seed.hex(),
+        'scalars': [str(nnn) for nnn in scalars],
+        'vectors': vectors,
+    }
+
+
+def save(seed: bytes, data: dict) -> str:
+    filename = vectors_file(seed)
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    tmp_filename = f'{filename}.{os.getpid()}.tmp'
+    with gzip.open(tmp_filename, 'wt') as stream:
+        json.dump(data, stream, separators=(',', ':'))
+    os.replace(tmp_filename, filename)
+    return filename
+
+
+def load(seed: bytes) -> Optional[dict]:
+    """Load the vectors of `seed` from disk, if they have been generated."""
+    try:
+        with gzip.open(vectors_file(seed), 'rt') as stream:
+            data = json.load(stream)
+    except (FileNotFoundError, EOFError, ValueError):
+        return None
+    if data.get('seed') != seed.hex():
+        return None
+    return data
+
+
+def install(seed: bytes = TEST_SEED) -> bool:
+    """Load the vectors of `seed` and register them with
+    `tools.bls12_381.preload`. Returns whether vectors were found."""
+    data = load(seed)
+    if data is None:
+        return False
+    scalars = [int(nnn) for nnn in data['scalars']]
+    vectors = data['vectors']
+    points = []
+    products = []
+    pairing_checks = []
+    for i, vector in enumerate(vectors):
+        nnn, nxt = scalars[i], scalars[i + 1]
+        points.append((G1.name, nnn, vector['g1']))
+        points.append((G2.name, nnn, vector['g2']))
+        products.append((G1.name, vector['g1'], nxt, vector['g1_mul']))
+        products.append((G2.name, vector['g2'], nxt, vector['g2_mul']))
+        next_g2 = vectors[i + 1]['g2'] if i + 1 < len(vectors) else None
+        if next_g2 is not None:
+            pairing_checks.append(
+                (((vector['g1'], next_g2),), vector['pairing_check'])
+            )
+    preload(points, products, pairing_checks)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Generate BLS12-381 random test vectors'
+    )
+    parser.add_argument(
+        '--seed',
+        default=TEST_SEED.decode(),
+        help=f'random seed, default={TEST_SEED.decode()}',
+    )
+    parser.add_argument(
+        '--count',
+        type=int,
+        default=1024,
+        help='number of random scalars, default=1024',
+    )
+    parser.add_argument(
+        '--processes',
+        type=int,
+        default=None,
+        help='number of worker processes, defaults to the number of CPUs',
+    )
+    args = parser.parse_args()
+    seed = args.seed.encode()
+    filename = save(seed, generate(seed, args.count, args.processes))
+    print(f'Wrote {args.count} vectors to {filename}')
+
+
+if __name__ == "__main__":
+    main()
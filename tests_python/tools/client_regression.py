@@ -68,3 +68,9 @@ class ClientRegression(client.Client):
         if caught_exc is not None:
             raise caught_exc
         return output, stderr, retcode
+
+    def replay(self, params: List[str], stdout: str) -> str:
+        output = super().replay(params, stdout)
+        if self.regtest is not None:
+            self.regtest.write(output)
+        return output
@@ -1,14 +1,15 @@
+import copy
+import functools
 import json
 import os.path
+from collections.abc import Mapping
+from typing import Any, Iterator, Optional
 
 from tools import paths
 
 
-def get_parameters(folder: str, network='test') -> dict:
-    """Takes a protocol suffix ('alpha', '005_PsBabyM1'...) and
-    retrieve json test parameters for that protocol. Assertion failure
-    if parameters can't be found."""
-
+@functools.lru_cache(maxsize=None)
+def _load_parameters(folder: str, network: str) -> dict:
     params_file = (
         f'{paths.TEZOS_HOME}/src/{folder}/parameters/'
         f'{network}-parameters.json'
@@ -22,6 +23,75 @@ def get_parameters(folder: str, network='test') -> dict:
         return json.load(params)
 
 
+def get_parameters(folder: str, network='test') -> dict:
+    """Takes a protocol suffix ('alpha', '005_PsBabyM1'...) and
+    retrieve json test parameters for that protocol. Assertion failure
+    if parameters can't be found.
+
+    The file is read once, and a fresh copy is returned."""
+    return copy.deepcopy(_load_parameters(folder, network))
+
+
+class Parameters(Mapping):
+    """The json test parameters of a protocol, read on first access and
+    shared by all users.
+
+    Parameters are immutable: lists and objects are returned by
+    copy. A mutable copy is obtained with `copy()`, `dict(...)` or
+    `copy.deepcopy(...)`, and `updated` gives parameters overriding some
+    items without reading nor copying the file again."""
+
+    def __init__(
+        self,
+        folder: str,
+        network: str = 'test',
+        overrides: Optional[dict] = None,
+    ):
+        self.folder = folder
+        self.network = network
+        self._overrides = dict(overrides or {})
+        self._merged: Optional[dict] = None
+
+    def _data(self) -> dict:
+        if self._merged is None:
+            base = _load_parameters(self.folder, self.network)
+            self._merged = {**base, **self._overrides}
+        return self._merged
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._data()[key]
+        if isinstance(value, (list, dict)):
+            return copy.deepcopy(value)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data())
+
+    def __len__(self) -> int:
+        return len(self._data())
+
+    def __repr__(self) -> str:
+        return (
+            f'Parameters({self.folder!r}, {self.network!r}, '
+            f'overrides={self._overrides!r})'
+        )
+
+    def copy(self) -> dict:
+        return copy.deepcopy(self._data())
+
+    def __copy__(self) -> dict:
+        return self.copy()
+
+    def __deepcopy__(self, memo) -> dict:
+        return self.copy()
+
+    def updated(self, overrides: dict) -> 'Parameters':
+        """These parameters, with the items of `overrides` replaced"""
+        return Parameters(
+            self.folder, self.network, {**self._overrides, **overrides}
+        )
+
+
 # This is the secret key used to activate a protocol from genesis in sandbox
 # mode. The corresponding public key is hard-coded in the tezos node.
 GENESIS_SK = "edsk31vznjHSSpGExDMHYASz45VZqXN4DPxvsa4hAyY8dHM28cZzp6"
@@ -83,17 +153,17 @@ PROTO_DEMO_COUNTER = 'ProtoDemoCounterDemoCounterDemoCounterDemoCou4LSpdT'
 ALPHA = "ProtoALphaALphaALphaALphaALphaALphaALphaALphaDdp3zK"
 ALPHA_DAEMON = "alpha"  # tezos-baker-alpha
 ALPHA_FOLDER = "proto_alpha"
-ALPHA_PARAMETERS = get_parameters(ALPHA_FOLDER)
+ALPHA_PARAMETERS = Parameters(ALPHA_FOLDER)
 
 HANGZHOU = "PtHangz2aRngywmSRGGvrcTyMbbdpWdpFKuS4uMWxg2RaH9i1qx"
 HANGZHOU_DAEMON = "011-PtHangz2"
 HANGZHOU_FOLDER = "proto_011_PtHangz2"
-HANGZHOU_PARAMETERS = get_parameters(HANGZHOU_FOLDER)
+HANGZHOU_PARAMETERS = Parameters(HANGZHOU_FOLDER)
 
 ITHACA = "Psithaca2MLRFYargivpo7YvUr7wUDqyxrdhC5CQq78mRvimz6A"
 ITHACA_DAEMON = "012-Psithaca"
 ITHACA_FOLDER = "proto_012_Psithaca"
-ITHACA_PARAMETERS = get_parameters(ITHACA_FOLDER)
+ITHACA_PARAMETERS = Parameters(ITHACA_FOLDER)
 
 TEZOS_CRT = """
 Certificate:
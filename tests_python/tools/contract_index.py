@@ -0,0 +1,212 @@
+"""Index of the test contracts of a `contracts_<protocol>` directory.
+
+The index records the contracts of each subdirectory and, for each
+contract, its modification time, size and sha256, and its Micheline
+JSON, binary and script hash forms, as computed by the client. It is
+stored in a single file per contracts directory, e.g.
+`.cache/contract_index/contracts_alpha.json` in tests_python, and loaded
+once per process.
+
+Listings are checked against the modification time of their directory,
+and contracts against their modification time and size, then their
+sha256, so that stale entries are never used. Forms are recorded with
+the sha256 of the client binary that computed them, and dropped when
+another client binary is used. Missing or stale forms are computed with
+a client and added to the index, which is then saved. Refreshed
+listings and entries are only saved along with new forms, so that
+sessions that compute no form leave the index file untouched.
+
+The index of a contracts directory can be built beforehand with
+scripts/build_contract_index.py.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional
+
+from client.client import Client
+from tools.typecheck_cache import file_digest
+
+INDEX_DIR = os.environ.get(
+    'TEZOS_CONTRACT_INDEX_DIR',
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        '.cache',
+        'contract_index',
+    ),
+)
+INDEX_VERSION = 2
+
+# The forms of contracts recorded in the index, by name of the client
+# output format
+FORMS = ['json', 'binary']
+
+# The forms computed by the client, hence dropped when it changes
+CLIENT_FORMS = FORMS + ['hash']
+
+
+def _file_sha256(path: str) -> str:
+    with open(path, 'rb') as stream:
+        return hashlib.sha256(stream.read()).hexdigest()
+
+
+class ContractIndex:
+    """The index of the contracts directory `contract_path`, stored in
+    `index_path`, by default in INDEX_DIR"""
+
+    def __init__(self, contract_path: str, index_path: Optional[str] = None):
+        self.contract_path = contract_path
+        if index_path is None:
+            name = os.path.basename(os.path.normpath(contract_path))
+            index_path = os.path.join(INDEX_DIR, name + '.json')
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        self._dirty = False
+        data: Dict[str, Any] = {}
+        try:
+            with open(self.index_path, encoding='utf-8') as stream:
+                data = json.load(stream)
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+        if data.get('version') != INDEX_VERSION:
+            data = {}
+        self.directories: Dict[str, Any] = data.get('directories', {})
+        self.contracts: Dict[str, Any] = data.get('contracts', {})
+        # The sha256 of the client binary that computed the forms
+        self.client: Optional[str] = data.get('client')
+
+    def listing(self, directory: str) -> List[str]:
+        """The names of the files of the subdirectory `directory`, as
+        listed by `os.listdir`"""
+        dir_path = os.path.join(self.contract_path, directory)
+        mtime = os.stat(dir_path).st_mtime
+        entry = self.directories.get(directory)
+        if entry is None or entry['mtime'] != mtime:
+            entry = {'mtime': mtime, 'files': os.listdir(dir_path)}
+            with self._lock:
+                self.directories[directory] = entry
+        return list(entry['files'])
+
+    def entry(self, contract: str) -> Dict[str, Any]:
+        """The up-to-date entry of `contract`, a path relative to the
+        contracts directory"""
+        path = os.path.join(self.contract_path, contract)
+        stat = os.stat(path)
+        entry = self.contracts.get(contract)
+        if (
+            entry is not None
+            and entry['mtime'] == stat.st_mtime
+            and entry['size'] == stat.st_size
+        ):
+            return entry
+        sha256 = _file_sha256(path)
+        with self._lock:
+            if entry is None or entry['sha256'] != sha256:
+                entry = {'sha256': sha256}
+            entry.update({'mtime': stat.st_mtime, 'size': stat.st_size})
+            self.contracts[contract] = entry
+        return entry
+
+    def use_client(self, client: Client) -> None:
+        """Drop the forms computed by another client binary than that of
+        `client`"""
+        client_digest = file_digest(client.client_path)
+        if self.client == client_digest:
+            return
+        with self._lock:
+            if self.client != client_digest:
+                for entry in self.contracts.values():
+                    for form in CLIENT_FORMS:
+                        entry.pop(form, None)
+                self.client = client_digest
+
+    def _form(self, client: Client, contract: str, form: str) -> Any:
+        self.use_client(client)
+        entry = self.entry(contract)
+        if form not in entry:
+            path = os.path.join(self.contract_path, contract)
+            if form == 'hash':
+                [(value, _)] = client.hash_script([path])
+            else:
+                value = client.convert_script(path, 'michelson', form).strip()
+                if form == 'json':
+                    value = json.loads(value)
+            with self._lock:
+                entry[form] = value
+                self._dirty = True
+        return entry[form]
+
+    def json(self, client: Client, contract: str) -> Any:
+        """The Micheline JSON of `contract`"""
+        return self._form(client, contract, 'json')
+
+    def binary(self, client: Client, contract: str) -> str:
+        """The binary form of `contract`, as an hexadecimal string"""
+        return self._form(client, contract, 'binary')
+
+    def script_hash(self, client: Client, contract: str) -> str:
+        """The script hash of `contract`"""
+        return self._form(client, contract, 'hash')
+
+    def build(self, client: Client, contracts: List[str]) -> None:
+        """Compute the missing forms of `contracts`"""
+        self.use_client(client)
+        missing = [
+            contract
+            for contract in contracts
+            if 'hash' not in self.entry(contract)
+        ]
+        if missing:
+            # The client hashes any number of scripts at once
+            hashes = client.hash_script(
+                [os.path.join(self.contract_path, c) for c in missing]
+            )
+            with self._lock:
+                for contract, (value, _) in zip(missing, hashes):
+                    self.contracts[contract]['hash'] = value
+                self._dirty = True
+        for contract in contracts:
+            for form in FORMS:
+                self._form(client, contract, form)
+
+    def save(self) -> None:
+        """Write the index, if forms were added to it"""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {
+                'version': INDEX_VERSION,
+                'client': self.client,
+                'directories': self.directories,
+                'contracts': self.contracts,
+            }
+            # Written then renamed, as several test sessions may save it
+            index_dir = os.path.dirname(self.index_path)
+            os.makedirs(index_dir, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                'w', dir=index_dir, suffix='.tmp', delete=False
+            ) as stream:
+                json.dump(data, stream, indent=1, sort_keys=True)
+            os.chmod(stream.name, 0o644)
+            os.replace(stream.name, self.index_path)
+            self._dirty = False
+
+
+# Indexes loaded by `of_path`, by contracts directory
+_INDEXES: Dict[str, ContractIndex] = {}
+
+
+def of_path(contract_path: str) -> ContractIndex:
+    """The index of `contract_path`, loaded once per process"""
+    if contract_path not in _INDEXES:
+        _INDEXES[contract_path] = ContractIndex(contract_path)
+    return _INDEXES[contract_path]
+
+
+def save_all() -> None:
+    """Write the indexes loaded by `of_path` to which forms were added"""
+    for index in _INDEXES.values():
+        index.save()
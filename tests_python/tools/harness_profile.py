@@ -0,0 +1,147 @@
+"""Profiling of the overhead of the test harness.
+
+`HarnessProfile` breaks down the wall-clock time of each test into the
+time spent in the call sites it instruments, by category:
+
+- `spawn`: running a process and waiting for it, e.g. a client command,
+- `sleep`: sleeping, e.g. between the attempts of `utils.retry`,
+- `rpc`: making an RPC and waiting for its answer,
+- `fixture`: setting up a fixture,
+
+the rest of the duration of the test being `other`. Time is attributed to
+the outermost instrumented call only, e.g. the spawns made by a fixture
+count as fixture time, so that the times of the categories add up to at
+most the duration of the test. Counts include nested calls.
+
+Only calls made by the main thread are profiled.
+"""
+
+import contextlib
+import functools
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+CATEGORIES = ['spawn', 'sleep', 'rpc', 'fixture']
+
+# The breakdown of a test: its duration, and the number of calls and the
+# time of each category
+FIELDS = (
+    ['duration']
+    + [
+        field
+        for category in CATEGORIES
+        for field in (f'{category}s', f'{category}_time')
+    ]
+    + ['other_time']
+)
+
+
+class HarnessProfile:
+    """Breakdown of the wall-clock time of tests"""
+
+    def __init__(self):
+        # The test being run, if any, set by the pytest plugin
+        self.test: Optional[str] = None
+        # Breakdown by test
+        self.tests: Dict[str, Dict[str, float]] = {}
+        # The category of the outermost call being timed, if any
+        self._timed: Optional[str] = None
+        # The original attributes replaced by `instrument`
+        self._originals: List[Tuple[Any, str, Callable]] = []
+
+    def breakdown(self, test: str) -> Dict[str, float]:
+        return self.tests.setdefault(test, dict.fromkeys(FIELDS, 0))
+
+    @contextlib.contextmanager
+    def timing(self, category: str) -> Iterator[None]:
+        """Attribute the time of the context to `category`, unless it is
+        nested in another timed context"""
+        assert category in CATEGORIES
+        if self.test is None or threading.current_thread() is not (
+            threading.main_thread()
+        ):
+            yield
+            return
+        breakdown = self.breakdown(self.test)
+        breakdown[f'{category}s'] += 1
+        if self._timed is not None:
+            yield
+            return
+        self._timed = category
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            breakdown[f'{category}_time'] += time.perf_counter() - start
+            self._timed = None
+
+    def instrument(self, owner: Any, name: str, category: str) -> None:
+        """Time the calls to the function `name` of the class or module
+        `owner` as `category`, until `restore`"""
+        original = getattr(owner, name)
+
+        @functools.wraps(original)
+        def wrapper(*args, **kwargs):
+            with self.timing(category):
+                return original(*args, **kwargs)
+
+        setattr(owner, name, wrapper)
+        self._originals.append((owner, name, original))
+
+    def restore(self) -> None:
+        """Undo the instrumentation of all call sites"""
+        for (owner, name, original) in reversed(self._originals):
+            setattr(owner, name, original)
+        self._originals = []
+
+    def add_duration(self, test: str, duration: float) -> None:
+        """Add `duration`, e.g. of the set-up of `test`, to its duration"""
+        breakdown = self.breakdown(test)
+        breakdown['duration'] += duration
+        breakdown['other_time'] = max(
+            0.0,
+            breakdown['duration']
+            - sum(breakdown[f'{category}_time'] for category in CATEGORIES),
+        )
+
+    def summary(self, limit: int = 20) -> List[str]:
+        """The lines of a table of the breakdown of the `limit` longest
+        tests, followed by the total of all tests"""
+        columns = (
+            ['duration', 'spawns']
+            + [f'{category}_time' for category in CATEGORIES]
+            + ['other_time']
+        )
+        headers = ['duration', 'spawns'] + CATEGORIES + ['other']
+        totals = {
+            field: sum(breakdown[field] for breakdown in self.tests.values())
+            for field in columns
+        }
+        ranked = sorted(
+            self.tests.items(),
+            key=lambda item: item[1]['duration'],
+            reverse=True,
+        )
+        width = max([len(test) for test in self.tests] + [len('test')])
+        width = min(width, 60)
+
+        def line(name: str, breakdown: Dict[str, float]) -> str:
+            if len(name) > width:
+                name = '...' + name[len(name) - width + 3 :]
+            cells = [f'{name:<{width}}', f"{breakdown['duration']:>9.2f}s"]
+            cells.append(f"{int(breakdown['spawns']):>7}")
+            for field in columns[2:]:
+                cells.append(f"{breakdown[field]:>8.2f}s")
+            return ' '.join(cells)
+
+        lines = [
+            ' '.join(
+                [f"{'test':<{width}}", f"{headers[0]:>10}"]
+                + [f"{headers[1]:>7}"]
+                + [f"{header:>9}" for header in headers[2:]]
+            )
+        ]
+        lines += [line(test, breakdown) for (test, breakdown) in ranked[:limit]]
+        lines.append(line('total', totals))
+        return lines
@@ -0,0 +1,728 @@
+"""Micheline parser and printer, and expansion of Michelson macros.
+
+Expressions are represented as in the JSON encoding of Micheline used by
+the client and the RPCs: `{'int': '1'}`, `{'string': 'a'}`,
+`{'bytes': '00'}`, `{'prim': 'Pair', 'args': [...], 'annots': [...]}`,
+without empty `args` and `annots`, and lists for sequences. Expressions
+can thus be compared with each other, and with the JSON outputs of the
+client and of the RPCs, without running the client.
+
+The parser, the printer and the expansion of macros follow
+`src/lib_micheline/micheline_parser.ml`,
+`src/lib_micheline/micheline_printer.ml` and
+`src/proto_alpha/lib_client/michelson_v1_macros.ml`, and are checked
+against the client by `TestMicheline`. Unlike the client, the parser
+does not check indentation nor recover from errors: it raises
+`InvalidMicheline` on the first one.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+Node = Union[Dict[str, Any], List[Any]]
+
+
+class InvalidMicheline(Exception):
+    """Raised on ill-formed Micheline or ill-formed macros"""
+
+
+_TOKEN_RE = re.compile(
+    r'''
+    (?P<space>[ \n]+)
+    | (?P<eol_comment>\#[^\n]*)
+    | (?P<comment>/\*)
+    | (?P<bytes>0x[0-9a-fA-F]*)
+    | (?P<int>-?[0-9]+)
+    | (?P<string>"(?:[^"\\\n\r]|\\[\\"nrtb])*")
+    | (?P<ident>[a-zA-Z][a-zA-Z_0-9]*)
+    | (?P<annot>[@:$&%!?][a-zA-Z_.%@0-9]*)
+    | (?P<punct>[;{}()])
+    ''',
+    re.VERBOSE,
+)
+
+_COMMENT_RE = re.compile(r'/\*|\*/')
+
+_ESCAPES = {'"': '"', 'r': '\r', 'n': '\n', 't': '\t', 'b': '\b', '\\': '\\'}
+
+_UNESCAPE_RE = re.compile(r'\\(.)')
+
+_MAX_ANNOT_LENGTH = 255
+
+
+def _tokenize(source: str) -> List[Tuple[str, str]]:
+    tokens = []
+    pos = 0
+    while pos < len(source):
+        match = _TOKEN_RE.match(source, pos)
+        if match is None:
+            raise InvalidMicheline(f'unexpected character at {pos}')
+        kind = match.lastgroup
+        assert kind is not None
+        value = match.group()
+        pos = match.end()
+        if kind == 'comment':
+            # Comments can be nested
+            level = 1
+            while level:
+                match = _COMMENT_RE.search(source, pos)
+                if match is None:
+                    raise InvalidMicheline('unterminated comment')
+                level += 1 if match.group() == '/*' else -1
+                pos = match.end()
+            continue
+        if kind in ('space', 'eol_comment'):
+            continue
+        if kind in ('int', 'bytes') and re.match('[a-zA-Z]', source[pos:]):
+            raise InvalidMicheline(f'missing break after number at {pos}')
+        tokens.append(_token(kind, value))
+    return tokens
+
+
+def _token(kind: str, value: str) -> Tuple[str, str]:
+    """The token of kind `kind` whose source is `value`"""
+    if kind == 'int':
+        value = str(int(value))
+    elif kind == 'bytes':
+        if len(value) % 2:
+            raise InvalidMicheline(f'invalid hex bytes {value}')
+        value = value[2:].lower()
+    elif kind == 'string':
+        value = _UNESCAPE_RE.sub(
+            lambda match: _ESCAPES[match.group(1)], value[1:-1]
+        )
+    elif kind == 'annot' and len(value) > _MAX_ANNOT_LENGTH:
+        raise InvalidMicheline(f'annotation too long: {value}')
+    elif kind == 'punct':
+        # Punctuation tokens are their own kind
+        kind = value
+    return (kind, value)
+
+
+def prim(
+    name: str, args: List[Node] = None, annots: List[str] = None
+) -> Dict[str, Any]:
+    """The primitive application `name` of `args`, with `annots`"""
+    node: Dict[str, Any] = {'prim': name}
+    if args:
+        node['args'] = args
+    if annots:
+        node['annots'] = annots
+    return node
+
+
+class _Parser:
+    def __init__(self, source: str):
+        self.tokens = _tokenize(source)
+        self.pos = 0
+
+    def _peek(self) -> Tuple[Optional[str], str]:
+        """The next token, of kind None at the end of the input"""
+        if self.pos < len(self.tokens):
+            return self.tokens[self.pos]
+        return (None, '')
+
+    def _next(self) -> Tuple[Optional[str], str]:
+        token = self._peek()
+        self.pos += 1
+        return token
+
+    def _unexpected(self) -> InvalidMicheline:
+        (kind, value) = self._peek()
+        if kind is None:
+            return InvalidMicheline('unexpected end of input')
+        return InvalidMicheline(f'unexpected token {value!r}')
+
+    def _atom(self, kind: Optional[str], value: str) -> Node:
+        assert kind is not None
+        return {kind: value}
+
+    def _annots(self) -> List[str]:
+        annots = []
+        while self._peek()[0] == 'annot':
+            annots.append(self._next()[1])
+        return annots
+
+    def _application(self, name: str, closing: List[Optional[str]]) -> Node:
+        """The arguments of `name` until a token of `closing`"""
+        annots = self._annots()
+        args = []
+        while self._peek()[0] not in closing:
+            (kind, value) = self._next()
+            if kind in ('int', 'string', 'bytes'):
+                args.append(self._atom(kind, value))
+            elif kind == 'ident':
+                args.append(prim(value))
+            elif kind == '{':
+                args.append(self._sequence('}'))
+            elif kind == '(' and self._peek()[0] == 'ident':
+                args.append(self._application(self._next()[1], [')']))
+                self._next()
+            else:
+                self.pos -= 1
+                raise self._unexpected()
+        return prim(name, args, annots)
+
+    def _sequence(self, closing: Optional[str]) -> List[Node]:
+        """The items of a sequence, until `closing`, which is consumed"""
+        items: List[Node] = []
+        # Whether an item can start at the next token
+        separated = True
+        after_semi = False
+        while True:
+            (kind, value) = self._next()
+            if kind == closing:
+                return items
+            if kind == ';' and not after_semi:
+                (separated, after_semi) = (True, True)
+                continue
+            if not separated:
+                self.pos -= 1
+                raise self._unexpected()
+            if kind in ('int', 'string', 'bytes'):
+                items.append(self._atom(kind, value))
+            elif kind == 'ident':
+                items.append(self._application(value, [';', closing]))
+            elif kind == '{':
+                items.append(self._sequence('}'))
+            else:
+                self.pos -= 1
+                raise self._unexpected()
+            # As in the client, only atoms must be followed by a separator
+            separated = kind in ('ident', '{')
+            after_semi = False
+
+    def expression(self) -> Node:
+        (kind, value) = self._next()
+        if kind in ('int', 'string', 'bytes'):
+            node = self._atom(kind, value)
+        elif kind == 'ident':
+            node = self._application(value, [None])
+        elif kind == '{':
+            node = self._sequence('}')
+        elif kind == '(' and self._peek()[0] == 'ident':
+            node = self._application(self._next()[1], [')'])
+            self._next()
+        else:
+            self.pos -= 1
+            raise self._unexpected()
+        if self._peek()[0] is not None:
+            raise self._unexpected()
+        return node
+
+    def toplevel(self) -> List[Node]:
+        items = self._sequence(None)
+        if len(items) == 1 and isinstance(items[0], list):
+            return items[0]
+        return items
+
+
+def parse_expression(source: str) -> Node:
+    """Parse an expression, e.g. data or a type, without expanding
+    macros"""
+    return _Parser(source).expression()
+
+
+def parse_script(source: str) -> List[Node]:
+    """Parse a script, i.e. a toplevel sequence, possibly without braces,
+    without expanding macros"""
+    return _Parser(source).toplevel()
+
+
+def _args(node: Node) -> List[Node]:
+    assert isinstance(node, dict)
+    return node.get('args', [])
+
+
+def _annots(node: Node) -> List[str]:
+    assert isinstance(node, dict)
+    return node.get('annots', [])
+
+
+def _arity(name: str, args: List[Node], expected: int) -> InvalidMicheline:
+    return InvalidMicheline(
+        f'macro {name} expects {expected} arguments, was given {len(args)}'
+    )
+
+
+def _check_no_args(name: str, args: List[Node]) -> None:
+    if args:
+        raise _arity(name, args, 0)
+
+
+def _sequence_arg(name: str, args: List[Node]) -> List[Node]:
+    if len(args) != 1:
+        raise _arity(name, args, 1)
+    if not isinstance(args[0], list):
+        raise InvalidMicheline(f'macro {name} expects a sequence')
+    return args[0]
+
+
+def _field_annot(name: str, annots: List[str]) -> Tuple[Optional[str], list]:
+    fields = [annot for annot in annots if annot.startswith('%')]
+    others = [annot for annot in annots if not annot.startswith('%')]
+    if len(fields) > 1:
+        raise InvalidMicheline(f'unexpected annotation on macro {name}')
+    return (fields[0] if fields else None, others)
+
+
+def _dip(depth: int, instr: Node, annots: List[str] = None) -> Node:
+    if depth == 1:
+        return prim('DIP', [instr], annots)
+    return prim('DIP', [{'int': str(depth)}, instr], annots)
+
+
+def _expand_carn_cdrn(name: str, args: List[Node], annots: List[str]):
+    if name not in ('CAR', 'CDR') or len(args) != 1:
+        return None
+    arg = args[0]
+    if isinstance(arg, dict) and 'int' in arg:
+        index = 2 * int(arg['int']) + (name == 'CAR')
+        return [prim('GET', [{'int': str(index)}], annots)]
+    return None
+
+
+def _expand_caddadr(name: str, args: List[Node], annots: List[str]):
+    if not re.fullmatch('C[AD]{2,}R', name):
+        return None
+    _check_no_args(name, args)
+    path_annots = [annot for annot in annots if annot in ('@%', '@%%')]
+    steps = name[1:-1]
+    return [
+        prim(
+            'CAR' if step == 'A' else 'CDR',
+            [],
+            annots if i == len(steps) - 1 else path_annots,
+        )
+        for (i, step) in enumerate(steps)
+    ]
+
+
+def _wrap_caddadr(path: str, acc: List[Node], annots: List[str]):
+    """The updates of the pairs of `path`, innermost last, around `acc`,
+    the update of the innermost one"""
+    for (i, step) in reversed(list(enumerate(path))):
+        last_annots = annots if i == 0 else []
+        if step == 'A':
+            acc = [
+                prim('DUP'),
+                prim('DIP', [[prim('CAR', [], ['@%%']), acc]]),
+                prim('CDR', [], ['@%%']),
+                prim('SWAP'),
+                prim('PAIR', [], ['%@', '%@'] + last_annots),
+            ]
+        else:
+            acc = [
+                prim('DUP'),
+                prim('DIP', [[prim('CDR', [], ['@%%']), acc]]),
+                prim('CAR', [], ['@%%']),
+                prim('PAIR', [], ['%@', '%@'] + last_annots),
+            ]
+    return acc
+
+
+def _expand_set_caddadr(name: str, args: List[Node], annots: List[str]):
+    if not re.fullmatch('SET_C[AD]+R', name):
+        return None
+    _check_no_args(name, args)
+    (field, annots) = _field_annot(name, annots)
+    path = name[5:-1]
+    access: List[Node]
+    init: List[Node]
+    if path[-1] == 'A':
+        access = (
+            [prim('DUP'), prim('CAR', [], [field]), prim('DROP')]
+            if field
+            else []
+        )
+        init = access + [
+            prim('CDR', [], ['@%%']),
+            prim('SWAP'),
+            prim('PAIR', [], [field or '%', '%@']),
+        ]
+    else:
+        access = (
+            [prim('DUP'), prim('CDR', [], [field]), prim('DROP')]
+            if field
+            else []
+        )
+        init = access + [
+            prim('CAR', [], ['@%%']),
+            prim('PAIR', [], ['%@', field or '%']),
+        ]
+    return _wrap_caddadr(path[:-1], init, annots)
+
+
+def _expand_map_caddadr(name: str, args: List[Node], annots: List[str]):
+    if not re.fullmatch('MAP_C[AD]+R', name):
+        return None
+    code = _sequence_arg(name, args)
+    (field, annots) = _field_annot(name, annots)
+    path = name[5:-1]
+    cr_annots = ['@' + field[1:]] if field else []
+    init: List[Node]
+    if path[-1] == 'A':
+        init = [
+            prim('DUP'),
+            prim('CDR', [], ['@%%']),
+            prim('DIP', [[prim('CAR', [], cr_annots), code]]),
+            prim('SWAP'),
+            prim('PAIR', [], [field or '%', '%@']),
+        ]
+    else:
+        init = [
+            prim('DUP'),
+            prim('CDR', [], cr_annots),
+            code,
+            prim('SWAP'),
+            prim('CAR', [], ['@%%']),
+            prim('PAIR', [], ['%@', field or '%']),
+        ]
+    return _wrap_caddadr(path[:-1], init, annots)
+
+
+_ROMAN = {'M': 1000, 'D': 500, 'C': 100, 'L': 50, 'X': 10, 'V': 5, 'I': 1}
+
+
+def _expand_dxiiivp(name: str, args: List[Node], annots: List[str]):
+    if not re.fullmatch('D[MDCLXVI]{2,}P', name):
+        return None
+    depth = 0
+    last = 0
+    for letter in reversed(name[1:-1]):
+        value = _ROMAN[letter]
+        depth += -value if value < last else value
+        last = value
+    return _dip(depth, _sequence_arg(name, args), annots)
+
+
+def _parse_pair_macro(name: str, start: int) -> Optional[tuple]:
+    """The tree of the pairs of the `P[PAI]*R` part of `name` from
+    `start`, made of `('P', index, left, right)`, `'A'` and `'I'`"""
+
+    def parse(i: int, left: Optional[bool]) -> Tuple[int, Any]:
+        if i == len(name) - 1:
+            raise ValueError(name)
+        if name[i] == 'P':
+            (i_left, tree_left) = parse(i + 1, True)
+            (i_right, tree_right) = parse(i_left, False)
+            return (i_right, ('P', i, tree_left, tree_right))
+        if name[i] == 'A' and left is True:
+            return (i + 1, 'A')
+        if name[i] == 'I' and left is not True:
+            return (i + 1, 'I')
+        raise ValueError(name)
+
+    try:
+        (last, tree) = parse(start, None)
+    except ValueError:
+        return None
+    return tree if last == len(name) - 1 else None
+
+
+def _pair_field_annots(tree: Any, fields: List[str]) -> Dict[int, tuple]:
+    """The field annotations of the pairs of `tree`, by index, as the
+    field annotations of their left and right components"""
+    positions: Dict[int, tuple] = {}
+
+    def find(pair_index: int, tree: Any) -> None:
+        if not fields:
+            return
+        if isinstance(tree, tuple):
+            find(tree[1], tree[2])
+            find(tree[1], tree[3])
+            return
+        (car, cdr) = positions.get(pair_index, ([], []))
+        if tree == 'A':
+            positions[pair_index] = ([fields.pop(0)], cdr)
+        else:
+            positions[pair_index] = (car, [fields.pop(0)])
+
+    find(0, tree)
+    return positions
+
+
+def _expand_pappaiir(name: str, args: List[Node], annots: List[str]):
+    if not re.fullmatch('P[PAI]{3,}R', name):
+        return None
+    fields = [annot for annot in annots if annot.startswith('%')]
+    annots = [annot for annot in annots if not annot.startswith('%')]
+    tree = _parse_pair_macro(name, 0)
+    if tree is None:
+        return None
+    positions = _pair_field_annots(tree, fields)
+    expanded: List[Node] = []
+
+    def parse(tree: Any, depth: int) -> int:
+        if not isinstance(tree, tuple):
+            return depth + 1
+        (_, index, left, right) = tree
+        pair_annots: List[str] = []
+        if index in positions:
+            (car, cdr) = positions[index]
+            pair_annots = (car or ['%']) + cdr
+        if index == 0:
+            pair_annots = pair_annots + annots
+        if depth == 0:
+            expanded.insert(0, prim('PAIR', [], pair_annots))
+        else:
+            expanded.insert(0, _dip(depth, [prim('PAIR', [], pair_annots)]))
+        return parse(right, parse(left, depth))
+
+    parse(tree, 0)
+    _check_no_args(name, args)
+    return expanded
+
+
+def _expand_unpappaiir(name: str, args: List[Node], annots: List[str]):
+    # pylint: disable=unused-argument
+    # Annotations are ignored by the client too
+    if not re.fullmatch('UNP[PAI]{3,}R', name):
+        return None
+    tree = _parse_pair_macro(name, 2)
+    if tree is None:
+        return None
+    expanded: List[Node] = []
+
+    def parse(tree: Any, depth: int) -> int:
+        if not isinstance(tree, tuple):
+            return depth + 1
+        if depth == 0:
+            expanded.append(prim('UNPAIR'))
+        else:
+            expanded.append(_dip(depth, [prim('UNPAIR')]))
+        return parse(tree[3], parse(tree[2], depth))
+
+    parse(tree, 0)
+    _check_no_args(name, args)
+    return expanded
+
+
+def _expand_duuuuup(name: str, args: List[Node], annots: List[str]):
+    if not re.fullmatch('DU+P', name) or name == 'DUP':
+        return None
+    _check_no_args(name, args)
+    return prim('DUP', [{'int': str(len(name) - 2)}], annots)
+
+
+_COMPARISONS = ['EQ', 'NEQ', 'LT', 'GT', 'LE', 'GE']
+
+
+def _expand_compare(name: str, args: List[Node], annots: List[str]):
+    if name in ['CMP' + op for op in _COMPARISONS]:
+        if not args:
+            return [prim('COMPARE'), prim(name[3:], [], annots)]
+        if not annots:
+            raise _arity(name, args, 0)
+        return None
+    if name.startswith('IFCMP'):
+        ops = ['COMPARE', name[5:]]
+    elif name.startswith('IF'):
+        ops = [name[2:]]
+    else:
+        return None
+    if ops[-1] not in _COMPARISONS:
+        return None
+    if len(args) == 2:
+        return [prim(op) for op in ops] + [prim('IF', args, annots)]
+    if not annots:
+        raise _arity(name, args, 2)
+    if not args:
+        raise InvalidMicheline(f'unexpected annotation on macro {name}')
+    return None
+
+
+def _rename(annots: List[str]) -> Node:
+    return [prim('RENAME', [], annots)] if annots else []
+
+
+def _fail_false(annots: List[str] = None) -> List[Node]:
+    return [_rename(annots or []), [prim('FAIL')]]
+
+
+def _fail_true(annots: List[str] = None) -> List[Node]:
+    return [[prim('FAIL')], _rename(annots or [])]
+
+
+def _expand_asserts(name: str, args: List[Node], annots: List[str]):
+    simple = {
+        'ASSERT': lambda: [prim('IF', _fail_false())],
+        'ASSERT_NONE': lambda: [prim('IF_NONE', _fail_false())],
+        'ASSERT_SOME': lambda: [prim('IF_NONE', _fail_true(annots))],
+        'ASSERT_LEFT': lambda: [prim('IF_LEFT', _fail_false(annots))],
+        'ASSERT_RIGHT': lambda: [prim('IF_LEFT', _fail_true(annots))],
+    }
+    if name in simple and not args:
+        if annots and name in ('ASSERT', 'ASSERT_NONE'):
+            raise InvalidMicheline(f'unexpected annotation on macro {name}')
+        return simple[name]()
+    if name in simple and not annots:
+        raise _arity(name, args, 0)
+    if not (len(name) > 7 and name.startswith('ASSERT_')):
+        return None
+    _check_no_args(name, args)
+    if annots:
+        raise InvalidMicheline(f'unexpected annotation on macro {name}')
+    remaining = name[7:]
+    if remaining in _COMPARISONS:
+        return [prim(remaining), prim('IF', _fail_false())]
+    compare = _expand_compare(remaining, [], [])
+    if compare is None:
+        return None
+    return [compare, prim('IF', _fail_false())]
+
+
+def _expand_if_some_right(name: str, args: List[Node], annots: List[str]):
+    if name not in ('IF_SOME', 'IF_RIGHT'):
+        return None
+    if len(args) != 2:
+        raise _arity(name, args, 2)
+    instr = 'IF_NONE' if name == 'IF_SOME' else 'IF_LEFT'
+    return [prim(instr, [args[1], args[0]], annots)]
+
+
+def _expand_fail(name: str, args: List[Node], annots: List[str]):
+    if name == 'FAIL' and not args and not annots:
+        return [prim('UNIT'), prim('FAILWITH')]
+    return None
+
+
+# In the order in which the client tries them
+_EXPANDERS = [
+    _expand_carn_cdrn,
+    _expand_caddadr,
+    _expand_set_caddadr,
+    _expand_map_caddadr,
+    _expand_dxiiivp,
+    _expand_pappaiir,
+    _expand_unpappaiir,
+    _expand_duuuuup,
+    _expand_compare,
+    _expand_asserts,
+    _expand_if_some_right,
+    _expand_fail,
+]
+
+
+def expand(node: Node) -> Node:
+    """Expand the macros of `node`, as the client does"""
+    if isinstance(node, dict) and 'prim' in node:
+        for expander in _EXPANDERS:
+            expanded = expander(node['prim'], _args(node), _annots(node))
+            if expanded is not None:
+                node = expanded
+                break
+    if isinstance(node, list):
+        return [expand(item) for item in node]
+    if 'prim' in node:
+        return prim(
+            node['prim'], [expand(arg) for arg in _args(node)], _annots(node)
+        )
+    return node
+
+
+def fold_combs(node: Node) -> Node:
+    """`node` with right combs of `Pair` and `pair` written as a single
+    primitive application, e.g. `Pair 1 2 3` for `Pair 1 (Pair 2 3)`, as
+    in the readable outputs of the client"""
+    if isinstance(node, list):
+        return [fold_combs(item) for item in node]
+    if 'prim' not in node:
+        return node
+    args = [fold_combs(arg) for arg in _args(node)]
+    if node['prim'] in ('Pair', 'pair') and len(args) >= 2:
+        last = args[-1]
+        if (
+            isinstance(last, dict)
+            and last.get('prim') == node['prim']
+            and not _annots(last)
+        ):
+            args = args[:-1] + _args(last)
+    return prim(node['prim'], args, _annots(node))
+
+
+def _quote(value: str) -> str:
+    escaped = value.translate(
+        {ord(char): '\\' + escape for (escape, char) in _ESCAPES.items()}
+    )
+    return f'"{escaped}"'
+
+
+def _size(node: Node) -> int:
+    """The width of `node` on a single line, without parentheses, as
+    estimated by the printer of the client to choose its layout"""
+    if isinstance(node, list):
+        return 4 + sum(3 + _size(item) for item in node)
+    if 'int' in node:
+        return len(node['int'])
+    if 'string' in node:
+        return len(node['string'].encode())
+    if 'bytes' in node:
+        return len(node['bytes']) + 2
+    annots = _annots(node)
+    annots_size = len(' '.join(annots)) + 2 if annots else 0
+    return (
+        len(node['prim'])
+        + annots_size
+        + sum(1 + _size(arg) for arg in _args(node))
+    )
+
+
+def _indent(lines: List[str], width: int) -> List[str]:
+    return [lines[0]] + [' ' * width + line for line in lines[1:]]
+
+
+def _surround(lines: List[str], left: str, right: str) -> List[str]:
+    lines = [left + lines[0]] + lines[1:]
+    lines[-1] += right
+    return lines
+
+
+def _application_lines(node: Dict[str, Any], wrapped: bool) -> List[str]:
+    if wrapped and (_args(node) or _annots(node)):
+        return _surround(_indent(_lines(node, False), 1), '(', ')')
+    name = ' '.join([node['prim']] + _annots(node))
+    args = [_lines(arg, True) for arg in _args(node)]
+    if _size(node) < 80:
+        return [' '.join([name] + [arg[0] for arg in args])]
+    if not args:
+        return [name]
+    if len(name) <= 4:
+        lines = [name + ' ' + args[0][0]] + args[0][1:]
+        lines += [line for arg in args[1:] for line in arg]
+        return _indent(lines, len(name) + 1)
+    return [name] + ['  ' + line for arg in args for line in arg]
+
+
+def _sequence_lines(node: List[Any]) -> List[str]:
+    if not node:
+        return ['{}']
+    items = [_lines(item, False) for item in node]
+    if _size(node) < 80:
+        return ['{ ' + ' ; '.join(item[0] for item in items) + ' }']
+    lines: List[str] = []
+    for item in items:
+        if lines:
+            lines[-1] += ' ;'
+        lines += item
+    return _surround(_indent(lines, 2), '{ ', ' }')
+
+
+def _lines(node: Node, wrapped: bool) -> List[str]:
+    if isinstance(node, list):
+        return _sequence_lines(node)
+    if 'prim' in node:
+        return _application_lines(node, wrapped)
+    if 'int' in node:
+        return [node['int']]
+    if 'string' in node:
+        return [_quote(node['string'])]
+    return ['0x' + node['bytes']]
+
+
+def format_expression(node: Node, wrapped: bool = False) -> str:
+    """Print `node` as the client does, within parentheses if `wrapped`
+    and it is an application with arguments or annotations (e.g. the
+    storage output by `run script`), without them otherwise (e.g. the
+    output of `get contract storage` or `expand macros`)"""
+    return '\n'.join(_lines(node, wrapped))
@@ -2,6 +2,8 @@ from os import path
 import os
 from typing import List
 
+from tools import contract_index
+
 
 def all_contracts(
     contract_path: str, directories: List[str] = None
@@ -14,9 +16,10 @@ def all_contracts(
             'mini_scenarios',
             'non_regression',
         ]
+    index = contract_index.of_path(contract_path)
     contracts = []
     for directory in directories:
-        for contract in os.listdir(path.join(contract_path, directory)):
+        for contract in index.listing(directory):
             contracts.append(path.join(directory, contract))
     return contracts
 
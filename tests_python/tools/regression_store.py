@@ -0,0 +1,334 @@
+"""Compressed, content-addressed storage of regression test outputs.
+
+A store is a directory, shared by the test directories of tests_python,
+holding:
+ - `objects/`, the distinct bodies of outputs, gzipped and named by the
+   sha256 of their contents, so that identical bodies are stored once,
+ - `index.json`, mapping each regression key (the test directory and the
+   name of the corresponding pytest-regtest output file, without `.out`,
+   e.g. `tests_alpha/test_contract.TestFoo.test_foo`) to the header and
+   the digest of the body of its output.
+
+The outputs of a test start with its id, e.g.
+`tests_alpha/test_contract.py::TestFoo::test_foo`, which differs between
+otherwise identical outputs, e.g. of the same test in several protocol
+directories. This header is kept in the index, and only the rest of the
+output, its body, is stored as an object.
+
+Outputs are compared as pytest-regtest compares them: trailing
+whitespaces are ignored, unless `ignore_line_endings` is False, as with
+`--regtest-regard-line-endings`. The index holds the digests of the
+bodies both as they are and with trailing whitespaces stripped. Hence,
+equal digests imply equal outputs, and outputs are only decompressed,
+line by line, when they differ.
+
+The store can be created from, or exported to, the `_regtest_outputs`
+directories of test directories. From tests_python:
+
+    poetry run python -m tools.regression_store import tests_alpha
+    poetry run python -m tools.regression_store export tests_alpha
+"""
+import argparse
+import difflib
+import glob
+import gzip
+import hashlib
+import itertools
+import json
+import os
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+STORE_DIR = '_regtest_store'
+OUTPUTS_DIR = '_regtest_outputs'
+OUTPUT_EXT = '.out'
+
+# Version of the format of the index
+INDEX_VERSION = 2
+
+# The first line of an output, when it is the id of its test
+_HEADER_RE = re.compile(r'[\w./-]+\.py::\S')
+
+
+def normalize(output: str, ignore_line_endings: bool = True) -> str:
+    """`output` as pytest-regtest compares it: without trailing whitespaces
+    on lines, unless `ignore_line_endings` is False"""
+    if not ignore_line_endings:
+        return output
+    return '\n'.join(line.rstrip() for line in output.split('\n'))
+
+
+def split_header(output: str) -> Tuple[Optional[str], str]:
+    """The test id heading `output`, if any, and the rest of `output`"""
+    (first, newline, body) = output.partition('\n')
+    if newline and _HEADER_RE.match(first):
+        return (first, body)
+    return (None, output)
+
+
+def digest(output: str) -> str:
+    return hashlib.sha256(output.encode('utf-8')).hexdigest()
+
+
+def store_dir_of_test_dir(test_dir: str) -> str:
+    """The store shared by `test_dir` and its sibling test directories"""
+    return os.path.join(os.path.dirname(os.path.abspath(test_dir)), STORE_DIR)
+
+
+def key_of_output(test_dir: str, output_name: str) -> str:
+    """The key of the output of `test_dir` named `output_name`, without
+    extension"""
+    return f'{os.path.basename(os.path.abspath(test_dir))}/{output_name}'
+
+
+def _write_atomically(filename: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    tmp_filename = f'{filename}.{os.getpid()}.tmp'
+    with open(tmp_filename, 'wb') as stream:
+        stream.write(data)
+    os.replace(tmp_filename, filename)
+
+
+class RegressionStore:
+    """The regression outputs stored in `directory`."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.entries: Dict[str, dict] = {}
+        self.dirty = False
+        try:
+            with open(self.index_file, encoding='utf-8') as stream:
+                index = json.load(stream)
+            if index.get('version') == INDEX_VERSION:
+                self.entries = index['entries']
+        except FileNotFoundError:
+            pass
+
+    @classmethod
+    def of_test_dir(cls, test_dir: str) -> 'RegressionStore':
+        return cls(store_dir_of_test_dir(test_dir))
+
+    @property
+    def index_file(self) -> str:
+        return os.path.join(self.directory, 'index.json')
+
+    def object_file(self, output_digest: str) -> str:
+        return os.path.join(
+            self.directory,
+            'objects',
+            output_digest[:2],
+            output_digest[2:] + '.gz',
+        )
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.entries
+
+    def keys(self, test_dir: Optional[str] = None) -> List[str]:
+        """The keys of the store, or those of `test_dir`"""
+        if test_dir is None:
+            return sorted(self.entries)
+        prefix = key_of_output(test_dir, '')
+        return sorted(key for key in self.entries if key.startswith(prefix))
+
+    def lines(self, key: str) -> Iterator[str]:
+        """Stream the lines of the output of `key`, without line endings"""
+        entry = self.entries.get(key)
+        if entry is None:
+            yield ''
+            return
+        if entry['header'] is not None:
+            yield entry['header']
+        object_file = self.object_file(entry['digest'])
+        with gzip.open(
+            object_file, 'rt', encoding='utf-8', newline=''
+        ) as stream:
+            last = None
+            for line in stream:
+                last = line
+                yield line.rstrip('\n')
+            # `str.split` yields a last empty line after a final newline
+            if last is None or last.endswith('\n'):
+                yield ''
+
+    def read(self, key: str) -> str:
+        return '\n'.join(self.lines(key))
+
+    def _matches(
+        self, key: str, output: str, ignore_line_endings: bool
+    ) -> bool:
+        """Whether `output` matches the stored output of `key`, judging by
+        their headers and digests only"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return False
+        (header, body) = split_header(output)
+        if entry['header'] is None or header is None:
+            if entry['header'] != header:
+                return False
+        elif normalize(entry['header'], ignore_line_endings) != normalize(
+            header, ignore_line_endings
+        ):
+            return False
+        if ignore_line_endings:
+            return entry['normalized'] == digest(normalize(body))
+        return entry['digest'] == digest(body)
+
+    def diff(
+        self, key: str, output: str, ignore_line_endings: bool = True
+    ) -> Optional[List[str]]:
+        """Compare `output` with the stored output of `key`.
+
+        Returns None if they match, and their unified diff otherwise."""
+        if self._matches(key, output, ignore_line_endings):
+            return None
+        current = normalize(output, ignore_line_endings).split('\n')
+        stored = (
+            normalize(line, ignore_line_endings) for line in self.lines(key)
+        )
+        matching = 0
+        for (line, expected) in zip(current, stored):
+            if expected != line:
+                break
+            matching += 1
+        else:
+            # One of the outputs is a prefix of the other one
+            if next(stored, None) is None and matching == len(current):
+                return None
+        # Only the lines from the first difference on are diffed
+        context = max(0, matching - 3)
+        tobe = [
+            normalize(line, ignore_line_endings)
+            for line in itertools.islice(self.lines(key), context, None)
+        ]
+        if not ignore_line_endings:
+            # Show trailing whitespaces, as pytest-regtest does
+            tobe = [repr(line) for line in tobe]
+            current = [repr(line) for line in current]
+        return list(
+            difflib.unified_diff(
+                tobe,
+                current[context:],
+                'tobe',
+                'current',
+                lineterm='',
+                n=3,
+            )
+        )
+
+    def put(self, key: str, output: str) -> bool:
+        """Record `output` for `key`. Returns whether it changed."""
+        (header, body) = split_header(output)
+        body_digest = digest(body)
+        entry = {
+            'header': header,
+            'digest': body_digest,
+            'normalized': digest(normalize(body)),
+        }
+        if self.entries.get(key) == entry:
+            return False
+        object_file = self.object_file(body_digest)
+        if not os.path.exists(object_file):
+            data = gzip.compress(body.encode('utf-8'), mtime=0)
+            _write_atomically(object_file, data)
+        self.entries[key] = entry
+        self.dirty = True
+        return True
+
+    def remove(self, key: str) -> None:
+        if self.entries.pop(key, None) is not None:
+            self.dirty = True
+
+    def save(self) -> None:
+        """Write the index, if it changed since it was loaded"""
+        if not self.dirty:
+            return
+        index = {'version': INDEX_VERSION, 'entries': self.entries}
+        data = json.dumps(index, indent=1, sort_keys=True) + '\n'
+        _write_atomically(self.index_file, data.encode('utf-8'))
+        self.dirty = False
+
+    def collect_garbage(self) -> int:
+        """Remove the objects no longer referenced by the index.
+
+        Returns the number of removed objects."""
+        referenced = {entry['digest'] for entry in self.entries.values()}
+        removed = 0
+        pattern = os.path.join(self.directory, 'objects', '*', '*.gz')
+        for object_file in glob.glob(pattern):
+            (prefix, name) = os.path.split(object_file)
+            output_digest = os.path.basename(prefix) + name[: -len('.gz')]
+            if output_digest not in referenced:
+                os.remove(object_file)
+                removed += 1
+        return removed
+
+    def import_outputs(self, test_dir: str) -> int:
+        """Record the `.out` files of the outputs directory of `test_dir`,
+        and forget the keys of `test_dir` without such a file.
+
+        Returns the number of changed entries."""
+        outputs_dir = os.path.join(test_dir, OUTPUTS_DIR)
+        changed = 0
+        keys = set()
+        for filename in sorted(os.listdir(outputs_dir)):
+            if filename.endswith(OUTPUT_EXT):
+                key = key_of_output(test_dir, filename[: -len(OUTPUT_EXT)])
+                keys.add(key)
+                path = os.path.join(outputs_dir, filename)
+                with open(path, encoding='utf-8') as stream:
+                    changed += self.put(key, stream.read())
+        for key in self.keys(test_dir):
+            if key not in keys:
+                self.remove(key)
+                changed += 1
+        return changed
+
+    def export_outputs(self, test_dir: str) -> int:
+        """Write the outputs of `test_dir` in the store as `.out` files in
+        its outputs directory.
+
+        Returns the number of written outputs."""
+        outputs_dir = os.path.join(test_dir, OUTPUTS_DIR)
+        os.makedirs(outputs_dir, exist_ok=True)
+        keys = self.keys(test_dir)
+        for key in keys:
+            output_name = key.split('/', 1)[1]
+            path = os.path.join(outputs_dir, output_name + OUTPUT_EXT)
+            with open(path, 'w', encoding='utf-8') as stream:
+                stream.write(self.read(key))
+        return len(keys)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Manage the regression store of test directories'
+    )
+    parser.add_argument(
+        'command',
+        choices=['import', 'export', 'gc'],
+        help=f'import: record {OUTPUTS_DIR} in {STORE_DIR}, '
+        + f'export: write {STORE_DIR} to {OUTPUTS_DIR}, '
+        + 'gc: remove unused objects',
+    )
+    parser.add_argument(
+        'test_dirs', nargs='+', metavar='test_dir', help='test directories'
+    )
+    args = parser.parse_args()
+    stores: Dict[str, RegressionStore] = {}
+    for test_dir in args.test_dirs:
+        store_dir = store_dir_of_test_dir(test_dir)
+        store = stores.setdefault(store_dir, RegressionStore(store_dir))
+        if args.command == 'import':
+            changed = store.import_outputs(test_dir)
+            print(f'{test_dir}: {changed} changed')
+        elif args.command == 'export':
+            exported = store.export_outputs(test_dir)
+            print(f'{test_dir}: exported {exported} outputs')
+    for (store_dir, store) in stores.items():
+        store.save()
+        if args.command != 'export':
+            print(f'{store_dir}: {store.collect_garbage()} removed objects')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""Benchmark of the latency of the RPCs made by tests.
+
+`RpcBenchmark.bench` runs an RPC a number of times with a given
+concurrency, and records the latency and response size of each run. The
+RPCs are those made by tests, recorded with `RpcBenchmark.record` (see
+`pytest_plugins/rpc_bench.py`), so that the benchmark has the same
+catalogue of paths and the same chain as the tests.
+
+The RPCs of clients in client mode are served by their node: they are
+run as HTTP requests to the node's RPC port, as `utils.rpc` does, so
+that their latency is that of the node, not that of starting a client.
+They are reported under the mode `node`. The RPCs of clients in other
+modes, e.g. proxy, are partly served by the client itself: they are run
+as client `rpc` commands, under the mode of the client.
+
+Results are aggregated by mode, verb and path, the path of an RPC being
+normalized as in `tools.rpc_trace`, so that the results of runs of
+different binaries, whose blocks and peers have different hashes, can be
+compared with `compare`.
+"""
+
+import concurrent.futures
+import json
+import math
+import statistics
+import subprocess
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import requests
+
+from client.client import Client
+from tools.rpc_trace import path_of_uri
+
+# The latency percentiles of the report
+PERCENTILES = [50, 95, 99]
+
+# The mode under which RPCs run over HTTP against a node are reported
+NODE_MODE = 'node'
+
+
+class RpcCall(NamedTuple):
+    """An RPC made by a test"""
+
+    client: Client
+    verb: str
+    path: str
+    data: Any
+    test: str
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """The `pct`-th percentile of `values`, by the nearest-rank method"""
+    assert values, 'no value'
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class RpcBenchmark:
+    """Latencies and response sizes of RPCs, by client mode, verb and
+    path"""
+
+    def __init__(self, repeat: int, concurrency: int):
+        assert repeat >= 1 and concurrency >= 1
+        self.repeat = repeat
+        self.concurrency = concurrency
+        # HTTP sessions, one per thread, whose connections are reused
+        # across runs as a client of the node would
+        self._sessions = threading.local()
+        # The RPCs recorded since the last call to `take_calls`
+        self._calls: List[RpcCall] = []
+        # Latencies, response sizes and number of failed runs, and the
+        # first test making the RPC, by mode, verb and path
+        self.results: Dict[Tuple[str, str, str], dict] = {}
+        # Version of the client binary, or of the node, by mode
+        self.versions: Dict[str, str] = {}
+
+    def record(
+        self, client: Client, verb: str, path: str, data: Any, test: str
+    ) -> None:
+        self._calls.append(RpcCall(client, verb, path, data, test))
+
+    def take_calls(self) -> List[RpcCall]:
+        """The RPCs recorded so far, without duplicates, which are
+        forgotten"""
+        calls: Dict[tuple, RpcCall] = {}
+        for call in self._calls:
+            key = (id(call.client), call.verb, call.path, json.dumps(call.data))
+            calls.setdefault(key, call)
+        self._calls = []
+        return list(calls.values())
+
+    @staticmethod
+    def mode(call: RpcCall) -> str:
+        """The mode `call` is run and reported in"""
+        return NODE_MODE if call.client.mode == 'client' else call.client.mode
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._sessions, 'session', None)
+        if session is None:
+            session = requests.Session()
+            self._sessions.session = session
+        return session
+
+    def _run_once_http(self, call: RpcCall) -> Tuple[float, Optional[int]]:
+        """The latency of a run of `call` as an HTTP request to the node
+        of its client, and the size of its response, None if it failed"""
+        url = call.client.endpoint + call.path
+        session = self._session()
+        start = time.perf_counter()
+        try:
+            res = session.request(call.verb, url, json=call.data)
+            size: Optional[int] = len(res.content) if res.ok else None
+        except requests.RequestException:
+            size = None
+        latency = time.perf_counter() - start
+        return (latency, size)
+
+    def _run_once(self, call: RpcCall) -> Tuple[float, Optional[int]]:
+        """The latency of a run of `call` and the size of its response,
+        None if it failed"""
+        if self.mode(call) == NODE_MODE:
+            return self._run_once_http(call)
+        params = ['rpc', call.verb, call.path]
+        if call.data is not None:
+            params += ['with', json.dumps(call.data)]
+        start = time.perf_counter()
+        (stdout, _, returncode) = call.client.run_generic(params, check=False)
+        latency = time.perf_counter() - start
+        return (latency, len(stdout.encode()) if returncode == 0 else None)
+
+    def bench(self, call: RpcCall) -> None:
+        """Run `call` `repeat` times, by `concurrency` at a time, and
+        record the results"""
+        mode = self.mode(call)
+        if mode not in self.versions:
+            self.versions[mode] = self._version(call)
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.concurrency
+        ) as executor:
+            runs = list(executor.map(self._run_once, [call] * self.repeat))
+        key = (mode, call.verb, path_of_uri(call.path))
+        result = self.results.setdefault(
+            key,
+            {'test': call.test, 'latencies': [], 'sizes': [], 'errors': 0},
+        )
+        for (latency, size) in runs:
+            if size is None:
+                result['errors'] += 1
+            else:
+                result['latencies'].append(latency)
+                result['sizes'].append(size)
+
+    def _version(self, call: RpcCall) -> str:
+        """The version of the node, or of the client, running `call`"""
+        try:
+            if self.mode(call) == NODE_MODE:
+                res = self._session().get(call.client.endpoint + '/version')
+                res.raise_for_status()
+                return json.dumps(res.json()['version'], sort_keys=True)
+            return call.client.run(['--version']).strip()
+        except (
+            requests.RequestException,
+            subprocess.CalledProcessError,
+            KeyError,
+            ValueError,
+        ):
+            return 'unknown'
+
+    def rows(self) -> List[dict]:
+        """The statistics of the RPCs, by mode, verb and path"""
+        rows = []
+        for ((mode, verb, path), result) in sorted(self.results.items()):
+            row = {
+                'mode': mode,
+                'verb': verb,
+                'path': path,
+                'test': result['test'],
+                'runs': len(result['latencies']) + result['errors'],
+                'errors': result['errors'],
+            }
+            latencies = result['latencies']
+            for pct in PERCENTILES:
+                row[f'p{pct}'] = (
+                    round(percentile(latencies, pct), 6) if latencies else None
+                )
+            row['mean'] = (
+                round(statistics.mean(latencies), 6) if latencies else None
+            )
+            row['response_bytes'] = (
+                max(result['sizes']) if result['sizes'] else None
+            )
+            rows.append(row)
+        return rows
+
+    def write_json(self, path: str) -> None:
+        report = {
+            'repeat': self.repeat,
+            'concurrency': self.concurrency,
+            'versions': self.versions,
+            'rpcs': self.rows(),
+        }
+        with open(path, 'w') as stream:
+            json.dump(report, stream, indent=2)
+
+
+def compare(
+    old: dict, new: dict, metric: str = 'p95', threshold: float = 0.2
+) -> List[str]:
+    """The regressions of the report `new` with respect to the report
+    `old`: the RPCs whose `metric` increased by more than `threshold`,
+    relatively, or which failed in `new` only"""
+    assert (old['repeat'], old['concurrency']) == (
+        new['repeat'],
+        new['concurrency'],
+    ), 'reports with different --rpc-bench-repeat or concurrency'
+    old_rows = {
+        (row['mode'], row['verb'], row['path']): row for row in old['rpcs']
+    }
+    regressions = []
+    for row in new['rpcs']:
+        key = (row['mode'], row['verb'], row['path'])
+        old_row = old_rows.get(key)
+        if old_row is None:
+            continue
+        name = ' '.join(key)
+        if row['errors'] > old_row['errors']:
+            regressions.append(
+                f"{name}: {row['errors']} failed runs "
+                f"instead of {old_row['errors']}"
+            )
+        elif old_row[metric] is not None and row[metric] is not None:
+            if row[metric] > old_row[metric] * (1 + threshold):
+                regressions.append(
+                    f"{name}: {metric} {row[metric] * 1000:.1f}ms "
+                    f"instead of {old_row[metric] * 1000:.1f}ms"
+                )
+    return regressions
@@ -0,0 +1,279 @@
+"""Profiling of the RPCs made by client commands.
+
+With `-l`, the client logs the RPCs it makes on its standard error, as
+a request line followed by the request body, if any, then a response
+line followed by the response body, bodies being indented by two
+spaces:
+
+    >>>>3: http://localhost:18731/chains/main/blocks/head/header
+    <<<<3: 200 OK
+      { "protocol": "ProtoALphaALphaALphaALphaALphaALphaALphaALphaDdp3zK",
+        ...
+
+`RpcRecorder.run` runs a client command with `-l`, timestamping the
+lines of its standard error as they are written, and records its RPCs,
+which it removes from the standard error returned to the caller.
+
+RPCs are aggregated by test, client mode, command and path. The command
+is made of the leading keywords of the client parameters, e.g.
+`transfer` or `rpc get`. The path is the path of the RPC without its
+query, with integers and hashes replaced by `<int>` and `<hash>`. The
+latency of an RPC is the time between its request and response lines,
+i.e. as seen by the client, and its sizes are those of the logged
+bodies. An RPC is redundant if the same command made it before, with the
+same body.
+"""
+
+import collections
+import csv
+import re
+import subprocess
+import threading
+import time
+import urllib.parse
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+_TRACE_RE = re.compile(r'(>>>>|<<<<)(\d+): (.*)\n?')
+
+_KEYWORD_RE = re.compile('[a-z][a-z_]*')
+
+_HASH_RE = re.compile('[1-9A-HJ-NP-Za-km-z]{20,}')
+
+# Number of leading keywords of client parameters making a command
+COMMAND_WORDS = 3
+
+# The orders of the summary, by name of the column sorted in
+# decreasing order
+SORT_KEYS = ['rpcs', 'redundant', 'bytes', 'latency', 'invocations']
+
+CSV_FIELDS = [
+    'test',
+    'mode',
+    'command',
+    'path',
+    'invocations',
+    'rpcs',
+    'redundant',
+    'request_bytes',
+    'response_bytes',
+    'latency',
+    'max_latency',
+]
+
+
+class Rpc(NamedTuple):
+    """An RPC logged by the client"""
+
+    uri: str
+    body: str
+    status: Optional[str]
+    response_bytes: int
+    latency: Optional[float]
+
+
+def parse_trace(lines: List[Tuple[float, str]]) -> Tuple[List[Rpc], str]:
+    """The RPCs logged in `lines`, the lines of the standard error of a
+    client with their timestamps, and the rest of the standard error"""
+    requests: Dict[str, dict] = {}
+    others = []
+    # The request or response whose body is being read, if `reading`
+    current: dict = {}
+    reading = False
+    for (timestamp, line) in lines:
+        match = _TRACE_RE.fullmatch(line)
+        if match is not None:
+            (direction, rpc_id, value) = match.groups()
+            if direction == '>>>>':
+                current = {'uri': value, 'start': timestamp, 'body': []}
+                requests[rpc_id] = current
+            else:
+                current = requests.setdefault(
+                    rpc_id, {'uri': '', 'start': None, 'body': []}
+                )
+                current.update(status=value, stop=timestamp, response=[])
+            reading = True
+        elif reading and line.startswith('  '):
+            key = 'response' if 'status' in current else 'body'
+            current[key].append(line[2:])
+        else:
+            reading = False
+            others.append(line)
+    rpcs = []
+    for request in requests.values():
+        latency = None
+        if request['start'] is not None and 'stop' in request:
+            latency = request['stop'] - request['start']
+        rpcs.append(
+            Rpc(
+                uri=request['uri'],
+                body=''.join(request['body']),
+                status=request.get('status'),
+                response_bytes=len(''.join(request.get('response', []))),
+                latency=latency,
+            )
+        )
+    return (rpcs, ''.join(others))
+
+
+def command_of_params(params: List[str]) -> str:
+    """The command of the client parameters `params`: their leading
+    keywords, after the options that precede them, if any"""
+    words: List[str] = []
+    i = 0
+    # Options before the command, assumed to take a value
+    while i < len(params) and params[i].startswith('-'):
+        i += 1 if i + 1 == len(params) or params[i + 1][:1] == '-' else 2
+    for param in params[i:]:
+        if not _KEYWORD_RE.fullmatch(param) or len(words) == COMMAND_WORDS:
+            break
+        words.append(param)
+    return ' '.join(words) or '<none>'
+
+
+def path_of_uri(uri: str) -> str:
+    """The path of `uri`, with integers and hashes replaced"""
+    segments = []
+    for segment in urllib.parse.urlsplit(uri).path.split('/'):
+        if segment.isdigit():
+            segment = '<int>'
+        elif _HASH_RE.fullmatch(segment):
+            segment = '<hash>'
+        segments.append(segment)
+    return '/'.join(segments)
+
+
+class RpcRecorder:
+    """Records of the RPCs of client commands, by test"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # The test being run, set by the pytest plugin
+        self.test = ''
+        # Statistics by test, mode, command and path
+        self.stats: Dict[
+            Tuple[str, str, str, str], List[float]
+        ] = collections.defaultdict(lambda: [0, 0, 0, 0, 0.0, 0.0])
+        # Number of commands by test, mode and command
+        self.invocations: Dict[
+            Tuple[str, str, str], int
+        ] = collections.Counter()
+
+    def record(self, params: List[str], mode: str, rpcs: List[Rpc]) -> None:
+        """Record `rpcs`, made by the client command `params` in `mode`"""
+        command = command_of_params(params)
+        seen = set()
+        with self._lock:
+            self.invocations[(self.test, mode, command)] += 1
+            for rpc in rpcs:
+                stats = self.stats[
+                    (self.test, mode, command, path_of_uri(rpc.uri))
+                ]
+                stats[0] += 1
+                if (rpc.uri, rpc.body) in seen:
+                    stats[1] += 1
+                seen.add((rpc.uri, rpc.body))
+                stats[2] += len(rpc.body)
+                stats[3] += rpc.response_bytes
+                if rpc.latency is not None:
+                    stats[4] += rpc.latency
+                    stats[5] = max(stats[5], rpc.latency)
+
+    def run(
+        self,
+        cmd: List[str],
+        params: List[str],
+        mode: str,
+        stdin: str,
+        env: Dict[str, str],
+        keep_trace: bool = False,
+    ) -> Tuple[str, str, int]:
+        """Run the client command `cmd`, with `-l`, made of the parameters
+        `params` in `mode`, and record its RPCs. Returns its stdout, its
+        stderr, without the trace unless `keep_trace`, and its return
+        code."""
+        process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=env,
+        )
+        assert process.stdin and process.stdout and process.stderr
+        stderr_stream = process.stderr
+        lines: List[Tuple[float, str]] = []
+
+        def read_stderr() -> None:
+            for line in iter(stderr_stream.readline, b''):
+                lines.append((time.perf_counter(), line.decode('utf-8')))
+
+        reader = threading.Thread(target=read_stderr)
+        reader.start()
+        try:
+            process.stdin.write(stdin.encode())
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+        stdout = process.stdout.read().decode('utf-8')
+        process.wait()
+        reader.join()
+        (rpcs, stderr) = parse_trace(lines)
+        self.record(params, mode, rpcs)
+        if keep_trace:
+            stderr = ''.join(line for (_, line) in lines)
+        return (stdout, stderr, process.returncode)
+
+    def rows(self) -> List[dict]:
+        """The statistics of the RPCs, by test, mode, command and path"""
+        rows = []
+        with self._lock:
+            for (key, stats) in sorted(self.stats.items()):
+                values: List[Any] = list(key)
+                values.append(self.invocations[key[:3]])
+                values += stats[:4]
+                values += [round(stats[4], 6), round(stats[5], 6)]
+                rows.append(dict(zip(CSV_FIELDS, values)))
+        return rows
+
+    def write_csv(self, path: str) -> None:
+        with open(path, 'w', newline='') as stream:
+            writer = csv.DictWriter(stream, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+            writer.writerows(self.rows())
+
+    def summary(self, sort: str = 'rpcs', limit: int = 20) -> List[str]:
+        """The lines of a table of the statistics of the RPCs by mode and
+        command, sorted by decreasing `sort`, one of `SORT_KEYS`"""
+        assert sort in SORT_KEYS
+        commands: Dict[Tuple[str, str], dict] = collections.defaultdict(
+            lambda: dict.fromkeys(SORT_KEYS + ['paths'], 0)
+        )
+        paths = collections.defaultdict(set)
+        for row in self.rows():
+            totals = commands[(row['mode'], row['command'])]
+            totals['rpcs'] += row['rpcs']
+            totals['redundant'] += row['redundant']
+            totals['bytes'] += row['request_bytes'] + row['response_bytes']
+            totals['latency'] += row['latency']
+            paths[(row['mode'], row['command'])].add(row['path'])
+        with self._lock:
+            for ((_, mode, command), count) in self.invocations.items():
+                commands[(mode, command)]['invocations'] += count
+        for (key, path_set) in paths.items():
+            commands[key]['paths'] = len(path_set)
+        lines = [
+            f"{'mode':<8} {'command':<28} {'invocations':>11} {'rpcs':>7} "
+            f"{'rpcs/inv':>8} {'redundant':>9} {'paths':>5} "
+            f"{'bytes':>10} {'latency':>9}"
+        ]
+        ranked = sorted(
+            commands.items(), key=lambda item: item[1][sort], reverse=True
+        )
+        for ((mode, command), totals) in ranked[:limit]:
+            per_invocation = totals['rpcs'] / max(totals['invocations'], 1)
+            lines.append(
+                f"{mode:<8} {command:<28} {totals['invocations']:>11} "
+                f"{totals['rpcs']:>7} {per_invocation:>8.1f} "
+                f"{totals['redundant']:>9} {totals['paths']:>5} "
+                f"{totals['bytes']:>10} {totals['latency']:>8.3f}s"
+            )
+        return lines
@@ -0,0 +1,127 @@
+"""Cache of the output of `tezos-client typecheck script`.
+
+The typechecking of a script only depends on the protocol, its
+parameters, the client binary, the node binary, which runs the protocol
+the client asks to typecheck, the script and the options of the
+command. Its output is stored in a directory, in a file named by the
+hash of these, so that unchanged scripts are typechecked once across
+test classes, protocol directories and test sessions.
+
+Only the output of successful typechecks is stored.
+"""
+
+import concurrent.futures
+import functools
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+from typing import Any, List, Mapping, Optional
+
+from client.client import Client
+
+CACHE_EXT = '.out'
+
+
+@functools.lru_cache(maxsize=None)
+def _file_digest(path: str, mtime: float, size: int) -> str:
+    # pylint: disable=unused-argument
+    # mtime and size only invalidate the cache when the file changes
+    digest = hashlib.sha256()
+    with open(path, 'rb') as stream:
+        for block in iter(lambda: stream.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_digest(path: str) -> str:
+    """The sha256 of the content of the file at `path`"""
+    stat = os.stat(path)
+    return _file_digest(path, stat.st_mtime, stat.st_size)
+
+
+class TypecheckCache:
+    """Outputs of typechecks, stored in `directory`, for a protocol, its
+    parameters, a client binary and a node binary"""
+
+    def __init__(
+        self,
+        directory: str,
+        protocol: str,
+        parameters: Mapping[str, Any],
+        client_path: str,
+        node_path: str,
+    ):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.context = json.dumps(
+            {
+                'protocol': protocol,
+                'parameters': dict(parameters),
+                'client': file_digest(client_path),
+                'node': file_digest(node_path),
+            },
+            sort_keys=True,
+        )
+
+    def key(self, contract: str, params: List[str]) -> str:
+        """The key of the typecheck of the script file `contract` with the
+        client parameters `params`"""
+        options = [param for param in params if param != contract]
+        digest = hashlib.sha256(self.context.encode())
+        digest.update(file_digest(contract).encode())
+        digest.update(json.dumps(options).encode())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + CACHE_EXT)
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            with open(self._path(key), encoding='utf-8') as stream:
+                return stream.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, output: str) -> None:
+        # Written then renamed, so that concurrent readers never read a
+        # partial output
+        with tempfile.NamedTemporaryFile(
+            'w', dir=self.directory, suffix='.tmp', delete=False
+        ) as stream:
+            stream.write(output)
+        os.replace(stream.name, self._path(key))
+
+    def run(self, client: Client, contract: str, params: List[str]) -> str:
+        """The output of `client` with the typecheck parameters `params`
+        for the script file `contract`, run if it is not cached"""
+        key = self.key(contract, params)
+        output = self.get(key)
+        if output is not None:
+            return client.replay(params, output)
+        output = client.run(params)
+        self.put(key, output)
+        return output
+
+    def prefetch(
+        self,
+        client: Client,
+        contracts: List[str],
+        workers: int = 8,
+        **kwargs,
+    ) -> None:
+        """Typecheck concurrently the script files of `contracts` with
+        `client`, whose cache is this one, and `kwargs` as arguments of
+        `Client.typecheck`, so that the outputs of well-typed ones are
+        cached"""
+        assert client.typecheck_cache is self
+
+        def typecheck(contract: str) -> None:
+            try:
+                client.typecheck(contract, **kwargs)
+            except subprocess.CalledProcessError:
+                pass
+
+        with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+            list(executor.map(typecheck, contracts))
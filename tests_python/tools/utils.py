@@ -2,10 +2,12 @@
 Assertions are retried to avoid using arbitrary time constants in test.
 """
 import datetime
-from typing import Any, List, Tuple, Pattern, Callable
+from typing import Any, Iterable, List, Optional, Tuple, Pattern, Callable
+import functools
 import hashlib
 import contextlib
 import json
+import multiprocessing
 import os
 import re
 import subprocess
@@ -23,7 +25,7 @@ from client.client_output import (
     InvalidClientOutput,
 )
 
-from . import constants
+from . import constants, micheline
 
 
 def retry(timeout: float, attempts: float):  # pylint: disable=unused-argument
@@ -328,12 +330,32 @@ def rpc(
     return res
 
 
+# Ed25519 signatures are deterministic, so a (digest, key) pair always
+# yields the same signature and can be memoised safely.
+SIGNATURE_CACHE_SIZE = 4096
+
+
+@functools.lru_cache(maxsize=None)
+def _signing_key(secret_key: bytes) -> ed25519.SigningKey:
+    """Parse a signing key once per secret and keep it for the session."""
+    return ed25519.SigningKey(secret_key)
+
+
+@functools.lru_cache(maxsize=SIGNATURE_CACHE_SIZE)
+def _sign_digest(digest: bytes, secret_key: bytes) -> str:
+    return _signing_key(secret_key).sign(digest).hex()
+
+
 def sign(data: bytes, secret_key: bytes) -> str:
     """Sign digest of data with secret key
 
     Uses blake2b hash function (32 bytes digest)
     Ed25519 signing scheme
 
+    Parsed signing keys are cached per secret and signatures are kept
+    in an LRU cache indexed by digest, so re-signing the same data is
+    free.
+
     Parameters:
         data (bytes): data to be signed
         secret_key (bytes): secret key
@@ -341,11 +363,8 @@ def sign(data: bytes, secret_key: bytes) -> str:
     Returns:
         str: signature of digest of data (hex string)
     """
-    blake_hash = pyblake2.blake2b(digest_size=32)
-    blake_hash.update(data)
-    digest = blake_hash.digest()
-    res = ed25519.SigningKey(secret_key)
-    return res.sign(digest).hex()
+    digest = pyblake2.blake2b(data, digest_size=32).digest()
+    return _sign_digest(digest, secret_key)
 
 
 def b58_key_to_hex(b58_key: str) -> str:
@@ -399,15 +418,46 @@ def hex_sig_to_b58(hexsig: str) -> str:
     return b58_sig.decode('ascii')
 
 
+@functools.lru_cache(maxsize=None)
+def _b58_secret_key_to_bin(secret_key: str) -> bytes:
+    return bytes.fromhex(b58_key_to_hex(secret_key))
+
+
 def sign_operation(encoded_operation: str, secret_key: str) -> str:
     watermarked_operation = b'\x03' + bytes.fromhex(encoded_operation)
-    sender_sk_hex = b58_key_to_hex(secret_key)
-    sender_sk_bin = bytes.fromhex(sender_sk_hex)
+    sender_sk_bin = _b58_secret_key_to_bin(secret_key)
     sig_hex = sign(watermarked_operation, sender_sk_bin)
     signed_op = encoded_operation + sig_hex
     return signed_op
 
 
+def _sign_operation_pair(operation: Tuple[str, str]) -> str:
+    return sign_operation(*operation)
+
+
+def sign_many(
+    operations: Iterable[Tuple[str, str]], processes: Optional[int] = None
+) -> List[str]:
+    """Sign a batch of forged operations.
+
+    Parameters:
+        operations: pairs of (hex encoded forged operation,
+            b58check encoded secret key), as expected by `sign_operation`
+        processes (int): if given, spread signing over a pool of that
+            many worker processes. Sequential signing is usually faster
+            for small batches as keys and signatures are cached.
+
+    Returns:
+        List[str]: the signed operations, in the order of `operations`
+    """
+    operations = list(operations)
+    if not processes or processes <= 1:
+        return [_sign_operation_pair(operation) for operation in operations]
+    chunksize = max(1, len(operations) // (4 * processes))
+    with multiprocessing.Pool(processes) as pool:
+        return pool.map(_sign_operation_pair, operations, chunksize)
+
+
 def mutez_of_tez(tez: float):
     return int(tez * 1000000)
 
@@ -455,11 +505,30 @@ def assert_run_failure(pattern: str, mode: str = 'stderr'):
         assert False, assert_msg
 
 
+def michelson_eq(data1: str, data2: str) -> bool:
+    """Whether the Michelson expressions `data1` and `data2` are equal, up
+    to their layout and the notation of combs, without running the
+    client"""
+    nodes = [
+        micheline.fold_combs(micheline.parse_expression(data))
+        for data in [data1, data2]
+    ]
+    return nodes[0] == nodes[1]
+
+
+def assert_michelson_eq(actual: str, expected: str) -> None:
+    assert michelson_eq(actual, expected), (
+        f"failed: actual == expected\n"
+        f"Actual: {actual}\n"
+        f"Expected: {expected}"
+    )
+
+
 def assert_storage_contains(
     client: Client, contract: str, expected_storage: str
 ) -> None:
     actual_storage = client.get_storage(contract)
-    equal = actual_storage == expected_storage
+    equal = michelson_eq(actual_storage, expected_storage)
     assert equal, (
         f"failed: actual_storage == expected_storage\n"
         f"Actual storage: {actual_storage}\n"